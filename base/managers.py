@@ -1,12 +1,19 @@
 from django.db import models
+from django.utils import timezone
 
 
 class BaseModelQuerySet(models.query.QuerySet):
     def archive(self):
-        self.update(is_archived=True)
+        """
+        Archives every row of the queryset in a single UPDATE.
+        """
+        return self.update(is_archived=True, updated_at=timezone.now())
+
+    def unarchive(self):
+        return self.update(is_archived=False, updated_at=timezone.now())
 
     def archived(self):
-        self.update(is_archived=True)
+        return self.filter(is_archived=True)
 
     def active(self):
         return self.filter(is_archived=False)
@@ -17,11 +24,13 @@ class BaseManager(models.Manager):
     Manager to enable archiving.
     """
 
+    queryset_class = BaseModelQuerySet
+
     def get_queryset(self):
-        return BaseModelQuerySet(self.model, using=self._db)
+        return self.queryset_class(self.model, using=self._db)
 
     def active(self):
-        return self.get_query_set().active()
+        return self.get_queryset().active()
 
     def archived(self):
-        return self.get_query_set().archived()
+        return self.get_queryset().archived()
@@ -29,6 +29,8 @@ class Countable(models.Model):
 
     @property
     def next_number(self):
-        self.counter += 1
-        self.save()
+        # Incremented in the database so concurrent callers never share a number.
+        # Use ``dynamic_forms.sequences`` for numbers needed at high volume.
+        type(self).objects.filter(pk=self.pk).update(counter=models.F("counter") + 1)
+        self.refresh_from_db(fields=["counter"])
         return self.counter
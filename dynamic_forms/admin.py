@@ -1,7 +1,24 @@
 from django.contrib import admin
+from django.utils.translation import gettext_lazy as _
 
-from dynamic_forms.forms import FieldPropertyForm, FieldForm
-from dynamic_forms.models import Form, Field, FieldProperty
+from dynamic_forms.forms import (
+    FieldPropertyForm,
+    FieldPropertyInlineFormSet,
+    FieldForm,
+    FormForm,
+)
+from dynamic_forms.models import (
+    Form,
+    Field,
+    FieldProperty,
+    OptionSet,
+    OutboxEvent,
+    Submission,
+    SubmissionEvaluation,
+    SubmissionSegment,
+    Webhook,
+)
+from dynamic_forms.outbox import requeue_events
 
 
 class InlineFormFieldsOrder(admin.TabularInline):
@@ -11,12 +28,21 @@ class InlineFormFieldsOrder(admin.TabularInline):
         "field",
         "required",
         "hidden",
+        "conditions",
         "validation",
         "options",
+        "option_set",
         "style",
     )
     extra = 1
     form = FieldPropertyForm
+    formset = FieldPropertyInlineFormSet
+
+
+class InlineWebhook(admin.TabularInline):
+    model = Webhook
+    fields = ("url", "secret", "is_archived")
+    extra = 0
 
 
 @admin.register(Field)
@@ -61,9 +87,36 @@ class FormAdmin(admin.ModelAdmin):
     ]
     search_fields = ["name", "id"]
     readonly_fields = ["slug", "metadata"]
+    form = FormForm
+    list_per_page = 50
+    save_on_top = True
+    inlines = [InlineFormFieldsOrder, InlineWebhook]
+    actions = ["archive_forms"]
+
+    @admin.action(description=_("Archive selected forms and their unused fields"))
+    def archive_forms(self, request, queryset):
+        archived = queryset.archive()
+        self.message_user(request, _("%d forms archived.") % archived)
+
+
+@admin.register(OptionSet)
+class OptionSetAdmin(admin.ModelAdmin):
+    list_display = [
+        "name",
+        "slug",
+        "version",
+        "created_at",
+        "updated_at",
+    ]
+    list_filter = [
+        "is_archived",
+        "created_at",
+        "updated_at",
+    ]
+    search_fields = ["name", "id"]
+    readonly_fields = ["slug", "version", "metadata"]
     list_per_page = 50
     save_on_top = True
-    inlines = [InlineFormFieldsOrder]
 
 
 @admin.register(FieldProperty)
@@ -84,3 +137,86 @@ class FormFieldsOrderAdmin(admin.ModelAdmin):
     ]
     list_per_page = 50
     save_on_top = True
+
+
+class InlineSubmissionEvaluation(admin.TabularInline):
+    model = SubmissionEvaluation
+    fields = ("field_name", "status", "attempts", "result", "error", "updated_at")
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+
+@admin.register(Submission)
+class SubmissionAdmin(admin.ModelAdmin):
+    list_display = [
+        "id",
+        "reference",
+        "form",
+        "form_version",
+        "created_at",
+    ]
+    list_filter = [
+        "form",
+        "created_at",
+    ]
+    search_fields = ["id", "reference"]
+    readonly_fields = ["form", "form_version", "reference", "data", "metadata"]
+    list_per_page = 50
+    inlines = [InlineSubmissionEvaluation]
+
+
+@admin.register(SubmissionSegment)
+class SubmissionSegmentAdmin(admin.ModelAdmin):
+    list_display = [
+        "form",
+        "month",
+        "count",
+        "size",
+        "created_at",
+    ]
+    list_filter = [
+        "form",
+        "month",
+    ]
+    search_fields = ["path"]
+    readonly_fields = ["form", "month", "path", "count", "size", "index", "metadata"]
+    list_per_page = 50
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = [
+        "event",
+        "webhook",
+        "status",
+        "attempts",
+        "next_attempt_at",
+        "created_at",
+    ]
+    list_filter = [
+        "status",
+        "event",
+        "created_at",
+    ]
+    search_fields = ["id", "webhook__url"]
+    readonly_fields = [
+        "webhook",
+        "event",
+        "payload",
+        "status",
+        "attempts",
+        "next_attempt_at",
+        "error",
+        "metadata",
+    ]
+    list_per_page = 50
+    actions = ["requeue"]
+
+    @admin.action(description=_("Requeue selected dead events"))
+    def requeue(self, request, queryset):
+        requeued = requeue_events(queryset)
+        self.message_user(request, _("%d events requeued.") % requeued)
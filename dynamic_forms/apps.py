@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class DynamicFormsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "dynamic_forms"
+
+    def ready(self):
+        from dynamic_forms import checks, signals  # noqa: F401
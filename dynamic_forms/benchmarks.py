@@ -0,0 +1,315 @@
+"""
+Benchmarks run by ``manage.py benchmark``.
+
+Each suite is a function registered with ``@benchmark`` taking the number of
+repeats and returning rows of ``(label, value)`` to report.
+"""
+
+import io
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import timeit
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+SUITES = {}
+
+HEAVY_MODULES = (
+    "requests",
+    "djmoney.contrib.django_rest_framework",
+    "phonenumbers",
+    "django_countries.serializer_fields",
+)
+IMPORTTIME_PATTERN = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)")
+
+
+def benchmark(name):
+    def register(function):
+        SUITES[name] = function
+        return function
+
+    return register
+
+
+IMPORT_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+setup_done = time.perf_counter()
+loaded_by_setup = set(sys.modules)
+import dynamic_forms.urls
+print(json.dumps({
+    "setup": setup_done - started,
+    "app": time.perf_counter() - setup_done,
+    "added": sorted(set(sys.modules) - loaded_by_setup),
+}))
+"""
+
+
+def importtime():
+    """
+    Imports the app in a fresh interpreter under ``-X importtime``.
+
+    Returns the wall times of ``django.setup()`` and of importing the app's
+    views on top of it, the modules the app added and the cumulative import
+    time of every module in microseconds.
+    """
+    env = dict(os.environ)
+    env.setdefault("DJANGO_SETTINGS_MODULE", "project.settings")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_SCRIPT],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_PATTERN.match(line)
+        if match:
+            modules[match.group(3)] = int(match.group(2))
+    return json.loads(result.stdout), modules
+
+
+@benchmark("importtime")
+def benchmark_importtime(repeat):
+    """
+    Cold start cost of the app on top of ``django.setup()``.
+
+    Heavy field type dependencies are reported as loaded by ``django.setup()``
+    when another installed app imports them, the app only pays for the others.
+    """
+    setup, app = [], []
+    for _i in range(repeat):
+        timings, modules = importtime()
+        setup.append(timings["setup"] * 1000)
+        app.append(timings["app"] * 1000)
+    rows = [
+        ("django.setup() (ms)", statistics.median(setup)),
+        ("dynamic_forms views on top of it (ms)", statistics.median(app)),
+        (
+            "dynamic_forms.utils cumulative (ms)",
+            modules.get("dynamic_forms.utils", 0) / 1000,
+        ),
+    ]
+    for name in HEAVY_MODULES:
+        if name in timings["added"]:
+            loaded = "by dynamic_forms"
+        elif name in modules:
+            loaded = "by django.setup()"
+        else:
+            loaded = "no"
+        rows.append((f"{name} loaded", loaded))
+    return rows
+
+
+def large_schema(fields=300, options=200, nesting=3):
+    """
+    A form detail payload shaped like ``FormSerializer`` output.
+    """
+    schema = None
+    for depth in range(nesting):
+        schema = {
+            "id": str(uuid.uuid4()),
+            "name": f"Form {depth}",
+            "slug": f"form-{depth}",
+            "fields": [
+                {
+                    "name": f"field_{depth}_{index}",
+                    "field_type": "dropdown_select",
+                    "label": f"Field {index}",
+                    "options": [f"Option {option}" for option in range(options)],
+                    "required": index % 2 == 0,
+                    "validation": ["min_length:1", "max_length:255"],
+                    "style": "",
+                    "hidden": False,
+                    "conditions": {},
+                    "index": index,
+                    "nested_form": schema if index == 0 else None,
+                }
+                for index in range(fields)
+            ],
+        }
+    return schema
+
+
+def large_payload(rows=2000):
+    """
+    Validated submission rows holding the values forms produce natively.
+    """
+    from djmoney.money import Money
+    from phonenumber_field.phonenumber import PhoneNumber
+
+    phone_number = PhoneNumber.from_string("+254712345678")
+    return [
+        {
+            "id": uuid.uuid4(),
+            "amount": Decimal("1234.50"),
+            "fee": Money("10.00", "KES"),
+            "phone": phone_number,
+            "date": date(2024, 1, 1),
+            "created_at": datetime(2024, 1, 1, 8, 30, tzinfo=timezone.utc),
+            "name": f"Row {row}",
+            "codes": list(range(20)),
+        }
+        for row in range(rows)
+    ]
+
+
+def best_of(function, repeat, number=5):
+    return min(timeit.repeat(function, repeat=repeat, number=number)) / number * 1000
+
+
+@benchmark("json")
+def benchmark_json(repeat):
+    """
+    DRF's stdlib JSON renderer and parser against ``FastJSONRenderer``/``Parser``.
+    """
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from dynamic_forms.parsers import FastJSONParser
+    from dynamic_forms.renderers import FastJSONRenderer, JSONEncoder, orjson
+
+    stdlib_renderer = JSONRenderer()
+    stdlib_renderer.encoder_class = JSONEncoder
+    fast_renderer = FastJSONRenderer()
+    rows = [("orjson installed", orjson is not None)]
+    for label, data in (("schema", large_schema()), ("payload", large_payload())):
+        stdlib = best_of(lambda: stdlib_renderer.render(data), repeat)
+        fast = best_of(lambda: fast_renderer.render(data), repeat)
+        rendered = fast_renderer.render(data)
+        rows += [
+            (f"{label} size (kB)", len(rendered) / 1024),
+            (f"render {label} stdlib (ms)", stdlib),
+            (f"render {label} fast (ms)", fast),
+            (f"render {label} speedup", stdlib / fast),
+        ]
+        stdlib = best_of(lambda: JSONParser().parse(io.BytesIO(rendered)), repeat)
+        fast = best_of(lambda: FastJSONParser().parse(io.BytesIO(rendered)), repeat)
+        rows += [
+            (f"parse {label} stdlib (ms)", stdlib),
+            (f"parse {label} fast (ms)", fast),
+            (f"parse {label} speedup", stdlib / fast),
+        ]
+    return rows
+
+
+def draw_numbers(name, count, block_size):
+    from django.db import connection
+
+    from dynamic_forms.sequences import next_number
+
+    try:
+        return [next_number(name, block_size) for _i in range(count)]
+    finally:
+        connection.close()
+
+
+def draw_in_threads(name, count, block_size, threads):
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(threads) as executor:
+        futures = [
+            executor.submit(draw_numbers, name, count, block_size)
+            for _i in range(threads)
+        ]
+        return [number for future in futures for number in future.result()]
+
+
+def draw_concurrently(name, count, block_size, threads, processes):
+    """
+    Draws ``count`` numbers of sequence ``name`` per worker, in ``threads``
+    threads of each of ``processes`` forked processes.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    from django.db import connections
+
+    if processes == 1:
+        return draw_in_threads(name, count, block_size, threads)
+    # Children must open their own connections rather than share the parent's.
+    connections.close_all()
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(processes, mp_context=context) as executor:
+        futures = [
+            executor.submit(draw_in_threads, name, count, block_size, threads)
+            for _i in range(processes)
+        ]
+        return [number for future in futures for number in future.result()]
+
+
+@benchmark("sequences")
+def benchmark_sequences(repeat):
+    """
+    Stress test of block allocated sequence numbers against one write per number.
+
+    Runs against the default database, which must be migrated. Every number
+    drawn by concurrent threads and processes must be unique.
+    """
+    import multiprocessing
+
+    from dynamic_forms.conf import get_setting
+    from dynamic_forms.models import Sequence
+
+    count, threads = 50 * repeat, 8
+    layouts = [(threads, 1)]
+    if "fork" in multiprocessing.get_all_start_methods():
+        layouts.append((threads // 4, 4))
+    rows = []
+    for block_size in (1, get_setting("SEQUENCE_BLOCK_SIZE")):
+        for threads_per_process, processes in layouts:
+            name = f"benchmark:{uuid.uuid4()}"
+            started = timeit.default_timer()
+            numbers = draw_concurrently(
+                name, count, block_size, threads_per_process, processes
+            )
+            elapsed = timeit.default_timer() - started
+            label = f"block {block_size}, {processes}x{threads_per_process} workers"
+            rows += [
+                (f"{label}: numbers drawn", len(numbers)),
+                (f"{label}: duplicates", len(numbers) - len(set(numbers))),
+                (f"{label}: numbers per second", len(numbers) / elapsed),
+                (
+                    f"{label}: numbers reserved",
+                    Sequence.objects.values_list("last", flat=True).get(name=name),
+                ),
+            ]
+            Sequence.objects.filter(name=name).delete()
+    return rows
+
+
+@benchmark("arrays")
+def benchmark_arrays(repeat):
+    """
+    DRF's ``ListField`` against ``ArrayField`` validating large ARRAY values.
+    """
+    from rest_framework import serializers
+
+    from dynamic_forms.fields import ArrayField
+
+    count = 10000
+    cases = (
+        ("int", serializers.IntegerField(), list(range(count))),
+        ("float", serializers.FloatField(), [row / 7 for row in range(count)]),
+        ("string", serializers.CharField(), [f"item {row}" for row in range(count)]),
+    )
+    rows = []
+    for item_type, child, data in cases:
+        list_field = serializers.ListField(child=child)
+        array_field = ArrayField(item_type=item_type, item_min_value=0)
+        before = best_of(lambda: list_field.run_validation(data), repeat)
+        after = best_of(lambda: array_field.run_validation(data), repeat)
+        rows += [
+            (f"{count} {item_type} items ListField (ms)", before),
+            (f"{count} {item_type} items ArrayField (ms)", after),
+            (f"{count} {item_type} items speedup", before / after),
+        ]
+    return rows
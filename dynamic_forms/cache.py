@@ -0,0 +1,443 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F, Prefetch
+from django.utils import timezone
+
+from dynamic_forms.conf import get_setting
+from dynamic_forms.models import Form, OptionSet
+from dynamic_forms.plans import (
+    PLAN_FORMAT,
+    compile_admission,
+    compile_form_plan,
+    compile_option_set,
+)
+from dynamic_forms.routers import use_primary, use_replica
+
+KEY_PREFIX = "dynamic_forms"
+
+
+class LocalCache:
+    """
+    A small thread safe LRU kept by each process in front of the shared cache.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+local_cache = LocalCache(get_setting("LOCAL_CACHE_SIZE"))
+
+
+def get_cache():
+    return caches[get_setting("CACHE_ALIAS")]
+
+
+def version_key(model, slug):
+    return f"{KEY_PREFIX}:{model._meta.model_name}:{slug}:version"
+
+
+def versioned_key(model, kind, slug, version):
+    return (
+        f"{KEY_PREFIX}:{model._meta.model_name}:{slug}:{version}:{kind}:{PLAN_FORMAT}"
+    )
+
+
+def form_version_key(slug):
+    return version_key(Form, slug)
+
+
+def form_cache_key(kind, slug, version):
+    return versioned_key(Form, kind, slug, version)
+
+
+def get_version(model, slug):
+    """
+    Returns the current version of a versioned model instance, or ``None`` if
+    it does not exist or is archived.
+
+    This is the only lookup made on a warm cache: a single shared cache read.
+    """
+    cache = get_cache()
+    version = cache.get(version_key(model, slug))
+    if version is None:
+        # Versions decide what is current, so they are never read from a replica.
+        with use_primary():
+            version = (
+                model.objects.active()
+                .filter(slug=slug)
+                .values_list("version", flat=True)
+                .first()
+            )
+        if version is None:
+            return None
+        # ``add`` never overwrites a newer version published after a commit.
+        cache.add(version_key(model, slug), version, get_setting("VERSION_TIMEOUT"))
+    return version
+
+
+def get_form_version(slug):
+    return get_version(Form, slug)
+
+
+def get_versions(model, slugs):
+    """
+    Returns ``{slug: version}`` for the active instances among ``slugs``.
+
+    Like ``get_version`` with a single cache read and at most one query.
+    """
+    cache = get_cache()
+    keys = {version_key(model, slug): slug for slug in slugs}
+    versions = {keys[key]: version for key, version in cache.get_many(keys).items()}
+    missing = set(slugs) - set(versions)
+    if missing:
+        with use_primary():
+            loaded = dict(
+                model.objects.active()
+                .filter(slug__in=missing)
+                .values_list("slug", "version")
+            )
+        for slug, version in loaded.items():
+            cache.add(version_key(model, slug), version, get_setting("VERSION_TIMEOUT"))
+        versions.update(loaded)
+    return versions
+
+
+def get_versioned(kind, slug, builder, model=Form):
+    """
+    Returns the ``kind`` artifact of the current version of a form.
+
+    Lookups go through the process local cache, then the shared cache and only
+    then call ``builder(form)``, storing the result under the version of the
+    form it was built from. Concurrent misses are coalesced by ``rebuild``.
+    Other versioned models, such as option sets, are cached the same way.
+    """
+    version = get_version(model, slug)
+    if version is None:
+        return None
+    local_key = (model._meta.model_name, kind, slug)
+    cached = local_cache.get(local_key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    value = get_cache().get(versioned_key(model, kind, slug, version))
+    if value is None:
+        built = rebuild(kind, slug, version, builder, model, stale=cached)
+        if built is None:
+            return None
+        version, value = built
+    local_cache.set(local_key, (version, value))
+    return value
+
+
+class Flight:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = 0
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def get_flight(key):
+    with _flights_lock:
+        return _flights.setdefault(key, Flight())
+
+
+def is_fresh_enough(stale, started_at):
+    window = get_setting("STALE_WHILE_REVALIDATE")
+    return stale is not None and time.time() - started_at <= window
+
+
+@contextmanager
+def cache_lock(key, timeout):
+    """
+    Takes a lock shared by every process using the cache, without waiting.
+
+    Yields the time the lock was acquired, or ``None`` if another caller holds it.
+    """
+    cache = get_cache()
+    token = time.time()
+    acquired = cache.add(key, token, timeout)
+    try:
+        yield token if acquired else None
+    finally:
+        if acquired and cache.get(key) == token:
+            cache.delete(key)
+
+
+def rebuild(kind, slug, version, builder, model, stale=None):
+    """
+    Rebuilds a missing artifact with at most one builder per key.
+
+    One thread per process races for the key and, among processes, one holder
+    of the shared cache lock builds while the others poll for its result. Callers
+    arriving within ``STALE_WHILE_REVALIDATE`` seconds of the rebuild starting
+    are served ``stale``, the last version built, instead of waiting.
+    """
+    cache = get_cache()
+    key = versioned_key(model, kind, slug, version)
+    stale_key = versioned_key(model, kind, slug, "stale")
+    if stale is None:
+        stale = cache.get(stale_key)
+
+    flight = get_flight((model._meta.model_name, kind, slug))
+    if not flight.lock.acquire(blocking=False):
+        if is_fresh_enough(stale, flight.started_at):
+            return stale
+        if not flight.lock.acquire(timeout=get_setting("SINGLE_FLIGHT_WAIT")):
+            return build(kind, slug, builder, model)
+    try:
+        flight.started_at = time.time()
+        value = cache.get(key)
+        if value is not None:
+            return version, value
+        lock_timeout = get_setting("SINGLE_FLIGHT_LOCK_TIMEOUT")
+        with cache_lock(f"{key}:lock", lock_timeout) as acquired_at:
+            if acquired_at is not None:
+                return build(kind, slug, builder, model)
+
+        deadline = time.time() + get_setting("SINGLE_FLIGHT_WAIT")
+        interval = get_setting("SINGLE_FLIGHT_POLL_INTERVAL")
+        while time.time() < deadline:
+            started_at = cache.get(f"{key}:lock")
+            if started_at is not None and is_fresh_enough(stale, started_at):
+                return stale
+            time.sleep(interval)
+            value = cache.get(key)
+            if value is not None:
+                return version, value
+        return build(kind, slug, builder, model)
+    finally:
+        flight.lock.release()
+
+
+def build(kind, slug, builder, model):
+    """
+    Builds the artifact from a replica when one is configured.
+
+    A replica lagging behind stores the artifact of the version it has, under
+    that version; forms it does not have yet are loaded from the primary.
+    """
+    with use_replica():
+        instance = model.objects.active().filter(slug=slug).first()
+        if instance is None:
+            with use_primary():
+                instance = model.objects.active().filter(slug=slug).first()
+        if instance is None:
+            return None
+        built = instance.version, builder(instance)
+    timeout = get_setting("PLAN_TIMEOUT")
+    get_cache().set_many(
+        {
+            versioned_key(model, kind, slug, instance.version): built[1],
+            versioned_key(model, kind, slug, "stale"): built,
+        },
+        timeout,
+    )
+    return built
+
+
+def get_form_plan(slug):
+    return get_versioned("plan", slug, compile_form_plan)
+
+
+def get_form_admission(slug):
+    return get_versioned("admission", slug, compile_admission)
+
+
+def get_form_detail(slug):
+    return get_versioned("detail", slug, render_form_detail)
+
+
+def get_form_details(slugs):
+    """
+    Returns ``{slug: (version, detail)}`` for the active forms among ``slugs``.
+
+    Details are read like ``get_form_detail`` with one lookup per cache for all
+    of them, and the missing ones are built together by ``build_form_details``.
+    """
+    versions = get_versions(Form, slugs)
+    details = {}
+    keys = {}
+    for slug, version in versions.items():
+        cached = local_cache.get(("form", "detail", slug))
+        if cached is not None and cached[0] == version:
+            details[slug] = cached
+        else:
+            keys[form_cache_key("detail", slug, version)] = slug
+    for key, detail in get_cache().get_many(keys).items():
+        details[keys[key]] = (versions[keys[key]], detail)
+    missing = set(versions) - set(details)
+    if missing:
+        details.update(build_form_details(missing))
+    for slug, cached in details.items():
+        local_cache.set(("form", "detail", slug), cached)
+    return details
+
+
+def get_form_schema(slug):
+    return get_versioned("schema", slug, render_form_schema)
+
+
+def get_option_set(slug):
+    return get_versioned("compiled", slug, compile_option_set, model=OptionSet)
+
+
+def render_form_detail(form):
+    from dynamic_forms.serializers import FormSerializer
+
+    return FormSerializer(form, context={"rendered_forms": {}}).data
+
+
+def load_form_trees(slugs):
+    """
+    Loads the active forms ``slugs`` and every form nested in them, by id.
+
+    Forms are loaded with their field properties a nesting level at a time,
+    so shared nested forms are loaded once and the queries made only depend
+    on how deep forms are nested.
+    """
+    from dynamic_forms.models import FieldProperty
+
+    field_properties = Prefetch(
+        "form_field_property",
+        queryset=FieldProperty.objects.select_related("field", "option_set"),
+    )
+    forms = {}
+    queryset = Form.objects.active().filter(slug__in=slugs)
+    while True:
+        loaded = list(queryset.prefetch_related(field_properties))
+        forms.update((form.pk, form) for form in loaded)
+        nested_ids = {
+            field_property.field.nested_form_id
+            for form in loaded
+            for field_property in form.form_field_property.all()
+        } - {None, *forms}
+        if not nested_ids:
+            return forms
+        queryset = Form.objects.filter(pk__in=nested_ids)
+
+
+def build_form_details(slugs):
+    """
+    Renders and caches the details of many forms at once, like ``build``.
+
+    Returns ``{slug: (version, detail)}`` for the active forms among ``slugs``.
+    """
+    from dynamic_forms.serializers import FormSerializer
+
+    slugs = set(slugs)
+    with use_replica():
+        forms = load_form_trees(slugs)
+        lagging = slugs - {form.slug for form in forms.values()}
+        if lagging:
+            with use_primary():
+                forms.update(load_form_trees(lagging))
+        context = {"forms": forms, "rendered_forms": {}}
+        built = {
+            form.slug: (form.version, FormSerializer(form, context=context).data)
+            for form in forms.values()
+            if form.slug in slugs and not form.is_archived
+        }
+    values = {}
+    for slug, (version, detail) in built.items():
+        values[form_cache_key("detail", slug, version)] = detail
+        values[form_cache_key("detail", slug, "stale")] = (version, detail)
+    get_cache().set_many(values, get_setting("PLAN_TIMEOUT"))
+    return built
+
+
+def render_form_schema(form):
+    from dynamic_forms.schema import compile_json_schema, option_sets_of
+
+    form_plan = compile_form_plan(form)
+    return {
+        "schema": compile_json_schema(form_plan),
+        "option_sets": sorted(option_sets_of(form_plan)),
+    }
+
+
+def with_parent_forms(form_ids):
+    """
+    Adds every form embedding one of ``form_ids`` as a nested form, transitively.
+    """
+    form_ids = set(form_ids)
+    pending = set(form_ids)
+    while pending:
+        parents = set(
+            Form.objects.filter(
+                form_field_property__field__nested_form__in=pending
+            ).values_list("pk", flat=True)
+        )
+        pending = parents - form_ids
+        form_ids |= pending
+    return form_ids
+
+
+def bump_form_versions(form_ids):
+    """
+    Increments the version of the forms and of every form nesting them.
+
+    The increment is part of the current transaction, so it is rolled back
+    together with the edit. The new versions are published to the shared cache
+    once the transaction commits, which is when other workers pick them up.
+    """
+    form_ids = with_parent_forms(form_ids)
+    if not form_ids:
+        return
+    bump_versions(Form, form_ids)
+
+
+def bump_versions(model, ids):
+    model.objects.filter(pk__in=ids).update(
+        version=F("version") + 1, updated_at=timezone.now()
+    )
+    transaction.on_commit(lambda: publish_versions(model, ids))
+
+
+def publish_versions(model, ids):
+    versions = model.objects.filter(pk__in=ids).values_list("slug", "version")
+    get_cache().set_many(
+        {version_key(model, slug): version for slug, version in versions},
+        get_setting("VERSION_TIMEOUT"),
+    )
+
+
+def forget(model, slug):
+    transaction.on_commit(lambda: get_cache().delete(version_key(model, slug)))
+
+
+def forget_form(slug):
+    forget(Form, slug)
+
+
+def forget_forms(slugs):
+    keys = [form_version_key(slug) for slug in slugs]
+    transaction.on_commit(lambda: get_cache().delete_many(keys))
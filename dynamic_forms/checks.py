@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+from dynamic_forms.conf import get_setting
+
+# Backends whose add() and incr() are atomic across processes. The plan
+# rebuild lock, admission control, idempotency keys and the draft log rely
+# on them to hold with more than one worker.
+ATOMIC_CACHE_BACKENDS = (
+    "django.core.cache.backends.redis.RedisCache",
+    "django.core.cache.backends.memcached.PyMemcacheCache",
+    "django.core.cache.backends.memcached.PyLibMCCache",
+    "django_redis.cache.RedisCache",
+)
+
+
+@register(Tags.caches)
+def check_cache_backend(app_configs, **kwargs):
+    alias = get_setting("CACHE_ALIAS")
+    backend = settings.CACHES.get(alias, {}).get("BACKEND")
+    if backend in ATOMIC_CACHE_BACKENDS:
+        return []
+    return [
+        Warning(
+            f"The {alias!r} cache uses {backend}, whose add() and incr() are "
+            "not atomic across processes.",
+            hint=(
+                "Locks, admission control, idempotency keys and draft autosaves "
+                "only hold in a single process. Point DYNAMIC_FORMS['CACHE_ALIAS'] "
+                "at a redis or memcached cache before running several workers."
+            ),
+            id="dynamic_forms.W001",
+        )
+    ]
@@ -31,3 +31,17 @@ class FormFieldChoices(TextChoices):
     TEXT = "text", _("Text")
     URL = "url", _("URL")
     UUID = "uuid_text", _("UUID")
+
+
+class EvaluationStatusChoices(TextChoices):
+    PENDING = "pending", _("Pending")
+    RUNNING = "running", _("Running")
+    SUCCEEDED = "succeeded", _("Succeeded")
+    FAILED = "failed", _("Failed")
+
+
+class OutboxStatusChoices(TextChoices):
+    PENDING = "pending", _("Pending")
+    DELIVERING = "delivering", _("Delivering")
+    DELIVERED = "delivered", _("Delivered")
+    DEAD = "dead", _("Dead")
@@ -0,0 +1,216 @@
+"""
+Conditions deciding whether a field of a form applies to a given payload.
+
+``FieldProperty.conditions`` holds ``visible_when`` and ``enabled_when``, each
+a condition such as::
+
+    {"field": "has_car", "equals": "yes"}
+    {"all": [{"field": "age", "in": ["18", "19"]}, {"not": {"field": "x"}}]}
+
+A leaf names a field and at most one operator out of ``OPERATORS``; a leaf with
+no operator holds when the field was submitted with a non empty value.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+
+def is_empty(value):
+    return value is MISSING or value in (None, "", [], {})
+
+
+OPERATORS = {
+    "equals": lambda value, expected: value == expected,
+    "not_equals": lambda value, expected: value != expected,
+    "in": lambda value, expected: value in expected,
+    "not_in": lambda value, expected: value not in expected,
+    "present": lambda value, expected: (not is_empty(value)) == expected,
+}
+CONDITION_KEYS = ("visible_when", "enabled_when")
+
+
+def check_condition(condition):
+    """
+    Raises ``ValueError`` if ``condition`` is not a valid condition.
+    """
+    if not isinstance(condition, dict):
+        raise ValueError(f"A condition must be an object, not {condition!r}.")
+    if "all" in condition or "any" in condition:
+        conditions = condition.get("all", condition.get("any"))
+        if not isinstance(conditions, list) or not conditions:
+            raise ValueError("'all' and 'any' take a non empty list of conditions.")
+        for nested in conditions:
+            check_condition(nested)
+    elif "not" in condition:
+        check_condition(condition["not"])
+    elif "field" in condition:
+        operators = set(condition) - {"field"}
+        if len(operators) > 1 or not operators <= set(OPERATORS):
+            raise ValueError(
+                f"A condition takes one operator out of {', '.join(OPERATORS)}."
+            )
+    else:
+        raise ValueError("A condition needs 'field', 'all', 'any' or 'not'.")
+
+
+def condition_fields(condition):
+    """
+    Returns the names of the fields ``condition`` depends on.
+    """
+    if "all" in condition or "any" in condition:
+        conditions = condition.get("all", condition.get("any"))
+        return set().union(*(condition_fields(nested) for nested in conditions))
+    if "not" in condition:
+        return condition_fields(condition["not"])
+    return {condition["field"]}
+
+
+def compile_condition(condition):
+    """
+    Compiles ``condition`` into a closure taking the payload of a form.
+    """
+    if "all" in condition:
+        checks = [compile_condition(nested) for nested in condition["all"]]
+        return lambda data: all(check(data) for check in checks)
+    if "any" in condition:
+        checks = [compile_condition(nested) for nested in condition["any"]]
+        return lambda data: any(check(data) for check in checks)
+    if "not" in condition:
+        check = compile_condition(condition["not"])
+        return lambda data: not check(data)
+
+    name = condition["field"]
+    for operator, expected in condition.items():
+        if operator in OPERATORS:
+            compare = OPERATORS[operator]
+            return lambda data: compare(data.get(name, MISSING), expected)
+    return lambda data: not is_empty(data.get(name, MISSING))
+
+
+class ConditionGraph:
+    """
+    The dependency graph of the conditions of a form, in topological order.
+
+    ``nodes`` is a list of ``(name, conditions, depends_on)`` where a field
+    comes after every field its conditions refer to. Conditions are compiled
+    into closures on first use, in each process.
+    """
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self._checks = None
+
+    def __getstate__(self):
+        return {"nodes": self.nodes, "_checks": None}
+
+    def __bool__(self):
+        return any(conditions for _name, conditions, _depends_on in self.nodes)
+
+    def get_checks(self):
+        if self._checks is None:
+            self._checks = [
+                (
+                    name,
+                    [compile_condition(conditions[key]) for key in conditions],
+                    depends_on,
+                )
+                for name, conditions, depends_on in self.nodes
+            ]
+        return self._checks
+
+    def active_fields(self, data):
+        """
+        Returns the names of the fields that apply to ``data``.
+
+        A field applies when all its conditions hold on the values of the fields
+        that apply. Values of fields that do not apply are ignored by later
+        conditions, so whole branches are skipped at once.
+        """
+        active = set()
+        values = {}
+        for name, checks, _depends_on in self.get_checks():
+            if all(check(values) for check in checks):
+                active.add(name)
+                if name in data:
+                    values[name] = data.get(name)
+        return active
+
+
+class ConditionCycle(ValueError):
+    def __init__(self, cycle):
+        self.cycle = cycle
+        super().__init__(f"Conditions form a cycle: {' -> '.join(cycle)}.")
+
+
+def field_dependencies(name, conditions, names):
+    """
+    Returns the conditions of field ``name`` and the fields they depend on.
+
+    Raises ``ValueError`` on invalid conditions and on unknown fields.
+    """
+    conditions = {key: conditions[key] for key in CONDITION_KEYS if conditions.get(key)}
+    depends_on = set()
+    for condition in conditions.values():
+        check_condition(condition)
+        depends_on |= condition_fields(condition)
+    unknown = depends_on - names
+    if unknown:
+        raise ValueError(
+            f"Conditions of {name} refer to unknown fields {', '.join(sorted(unknown))}."
+        )
+    return conditions, depends_on
+
+
+def sort_by_dependency(dependencies):
+    nodes = []
+    done = set()
+    visiting = []
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ConditionCycle(visiting[visiting.index(name) :] + [name])
+        visiting.append(name)
+        conditions, depends_on = dependencies[name]
+        for dependency in sorted(depends_on):
+            visit(dependency)
+        visiting.pop()
+        done.add(name)
+        nodes.append((name, conditions, depends_on))
+
+    for name in dependencies:
+        visit(name)
+    return nodes
+
+
+def build_condition_graph(fields, strict=True):
+    """
+    Orders ``fields``, a list of ``(name, conditions)``, by dependency.
+
+    Raises ``ValueError`` on invalid conditions, conditions referring to unknown
+    fields or to each other in a cycle. Unless ``strict``, such conditions are
+    logged and dropped instead, and their fields apply unconditionally, so a
+    form stored with bad conditions keeps being served.
+    """
+    names = {name for name, _conditions in fields}
+    dependencies = {}
+    for name, conditions in fields:
+        try:
+            dependencies[name] = field_dependencies(name, conditions or {}, names)
+        except ValueError as e:
+            if strict:
+                raise
+            logger.warning("Ignoring the conditions of field %s: %s", name, e)
+            dependencies[name] = ({}, set())
+    while True:
+        try:
+            return ConditionGraph(sort_by_dependency(dependencies))
+        except ConditionCycle as e:
+            if strict:
+                raise
+            logger.warning("Ignoring the conditions of field %s: %s", e.cycle[-2], e)
+            dependencies[e.cycle[-2]] = ({}, set())
@@ -0,0 +1,113 @@
+from django.conf import settings
+
+DEFAULTS = {
+    # Cache alias holding compiled plans, rendered details and version counters.
+    # Point it at a backend shared by every worker with atomic add() and incr(),
+    # memcached or redis, which the dynamic_forms.W001 check warns about.
+    "CACHE_ALIAS": "default",
+    # Seconds a version counter may live in the cache before being re-read from
+    # the database. Bounds staleness if a publish after commit is ever lost.
+    "VERSION_TIMEOUT": 300,
+    # Seconds compiled plans and rendered details are kept in the shared cache.
+    "PLAN_TIMEOUT": 60 * 60 * 24,
+    # Number of compiled plans each process keeps in memory.
+    "LOCAL_CACHE_SIZE": 256,
+    # Seconds a caller waits for another worker rebuilding the same plan before
+    # rebuilding it itself.
+    "SINGLE_FLIGHT_WAIT": 5,
+    "SINGLE_FLIGHT_POLL_INTERVAL": 0.05,
+    # Seconds after which a rebuild lock is considered abandoned.
+    "SINGLE_FLIGHT_LOCK_TIMEOUT": 30,
+    # Seconds after a rebuild starts during which other callers are served the
+    # previous version instead of waiting for it. 0 always waits.
+    "STALE_WHILE_REVALIDATE": 0,
+    # Admission control on submissions. ``rate`` is in requests per second,
+    # ``burst`` the bucket size and ``concurrency`` the number of submissions
+    # of a form validated at once. ``None`` disables a limit. Forms override
+    # these through ``metadata["admission"]`` or ``ADMISSION_FORMS[slug]``.
+    "ADMISSION": {"rate": None, "burst": None, "concurrency": None},
+    "ADMISSION_FORMS": {},
+    # Concurrency cap applied to forms calling external validation endpoints,
+    # on top of the default ``concurrency``.
+    "EXTERNAL_VALIDATION_CONCURRENCY": None,
+    # Seconds after which in flight slots leaked by a dead worker are released.
+    "ADMISSION_SLOT_TIMEOUT": 60,
+    # Size of the LRU caches of parsed and formatted phone numbers.
+    "PHONE_NUMBER_CACHE_SIZE": 4096,
+    # Seconds the response to a submission with an Idempotency-Key is replayed.
+    "IDEMPOTENCY_TTL": 60 * 60 * 24,
+    # Seconds a duplicate waits for the response of the request in flight.
+    "IDEMPOTENCY_WAIT": 10,
+    # Seconds after which a request holding an Idempotency-Key is presumed dead.
+    "IDEMPOTENCY_LOCK_TIMEOUT": 60,
+    # Threads of each web process running deferred evaluations right after the
+    # submission is committed. 0 leaves them to "manage.py run_evaluations".
+    "EVALUATION_WORKERS": 2,
+    # Values sent per call to evaluation endpoints with the "batch" rule.
+    "EVALUATION_BATCH_SIZE": 50,
+    # Evaluations whose endpoint cannot be reached are retried after
+    # EVALUATION_RETRY_DELAY * 2 ** (attempts - 1) seconds, up to
+    # EVALUATION_MAX_RETRY_DELAY, until EVALUATION_MAX_ATTEMPTS.
+    "EVALUATION_MAX_ATTEMPTS": 5,
+    "EVALUATION_RETRY_DELAY": 5,
+    "EVALUATION_MAX_RETRY_DELAY": 60 * 10,
+    "EVALUATION_TIMEOUT": 10,
+    # Seconds after which a running evaluation is presumed lost and requeued.
+    "EVALUATION_CLAIM_TIMEOUT": 300,
+    # Numbers of a sequence, such as submission references, each process
+    # reserves at once. Larger blocks mean fewer writes and larger gaps.
+    "SEQUENCE_BLOCK_SIZE": 100,
+    # Delivery of submissions to webhooks by "manage.py deliver_webhooks":
+    # events posted per request, requests in flight at once, and retries,
+    # waiting WEBHOOK_RETRY_DELAY * 2 ** (attempts - 1) seconds up to
+    # WEBHOOK_MAX_RETRY_DELAY before an event is dead lettered.
+    "WEBHOOK_BATCH_SIZE": 100,
+    "WEBHOOK_CONCURRENCY": 4,
+    "WEBHOOK_TIMEOUT": 10,
+    "WEBHOOK_MAX_ATTEMPTS": 8,
+    "WEBHOOK_RETRY_DELAY": 10,
+    "WEBHOOK_MAX_RETRY_DELAY": 60 * 60,
+    # Seconds after which an event being delivered is presumed lost and requeued.
+    "WEBHOOK_CLAIM_TIMEOUT": 300,
+    # Database aliases read only paths read from, with ReplicaRouter. Clients
+    # read from the primary for REPLICA_STICKINESS seconds after writing.
+    "READ_REPLICAS": [],
+    "REPLICA_STICKINESS": 5,
+    # Submissions of months ending more than COLD_AFTER_DAYS ago are moved to
+    # compressed segment files under SEGMENT_ROOT, BASE_DIR/segments by default,
+    # by "manage.py compact_submissions". Segments hold up to
+    # SEGMENT_MAX_RECORDS submissions compressed by blocks of SEGMENT_BLOCK_SIZE.
+    "COLD_AFTER_DAYS": 90,
+    "SEGMENT_ROOT": None,
+    "SEGMENT_BLOCK_SIZE": 256,
+    "SEGMENT_MAX_RECORDS": 100000,
+    # Forms per page of the "forms/" listing, and the most a client may ask for.
+    "FORM_LIST_PAGE_SIZE": 100,
+    "FORM_LIST_MAX_PAGE_SIZE": 1000,
+    # Forms a client may ask for at once from "forms/batch/".
+    "FORM_BATCH_MAX_SIZE": 100,
+    # Profiling of form detail and submission requests: one request out of
+    # PROFILE_EVERY per process (0 for none), every request to PROFILE_FORMS,
+    # and requests whose X-Profile header holds PROFILE_TOKEN. The last
+    # PROFILE_MAX_FILES profiles are kept in PROFILE_DIR, BASE_DIR/profiles
+    # by default.
+    "PROFILE_EVERY": 0,
+    "PROFILE_FORMS": [],
+    "PROFILE_TOKEN": None,
+    "PROFILE_DIR": None,
+    "PROFILE_MAX_FILES": 500,
+    # Seconds of autosaved draft edits that may only be in the cache, and
+    # seconds drafts are kept in the cache after their last autosave.
+    "DRAFT_FLUSH_INTERVAL": 30,
+    "DRAFT_TIMEOUT": 60 * 60 * 24 * 7,
+    # Seconds after which an autosave holding the lock of its draft is
+    # presumed dead, and the longest a concurrent autosave waits for it.
+    "DRAFT_LOCK_TIMEOUT": 5,
+}
+
+
+def get_setting(name):
+    """
+    Returns ``settings.DYNAMIC_FORMS[name]`` falling back to the app default.
+    """
+    return getattr(settings, "DYNAMIC_FORMS", {}).get(name, DEFAULTS[name])
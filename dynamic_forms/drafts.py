@@ -0,0 +1,182 @@
+"""
+Server side drafts of long forms, autosaved by clients every few seconds.
+
+Autosaves only write the draft to the cache. The autosave finding the oldest
+unwritten change of its draft ``DRAFT_FLUSH_INTERVAL`` seconds old writes it
+to the database, and ``manage.py flush_drafts``, run as often, writes the
+drafts left unwritten since. A lost cache or a crash thus loses about that
+many seconds of edits. Submitting the form discards its draft.
+
+Drafts going from written to unwritten are appended to a log in the cache,
+numbered with ``incr``, which ``flush_drafts`` reads from where it stopped.
+Each draft is logged once however many autosaves it gets until it is written.
+"""
+
+import time
+
+from django.db import IntegrityError
+from django.utils import timezone
+
+from dynamic_forms.cache import KEY_PREFIX, cache_lock, get_cache
+from dynamic_forms.conf import get_setting
+from dynamic_forms.models import Draft
+
+LOG_KEY = f"{KEY_PREFIX}:drafts:log"
+LOG_POSITION_KEY = f"{KEY_PREFIX}:drafts:log:flushed"
+
+
+def get_owner(request, create=False):
+    """
+    Returns who drafts of ``request`` belong to: its user, or else its session.
+
+    Anonymous requests get a session when ``create`` is true.
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return f"user:{user.pk}"
+    session = getattr(request, "session", None)
+    if session is None:
+        return None
+    if session.session_key is None and create:
+        session.save()
+    return f"session:{session.session_key}" if session.session_key else None
+
+
+def draft_key(form_id, owner):
+    return f"{KEY_PREFIX}:draft:{form_id}:{owner}"
+
+
+def written_key(key):
+    return f"{key}:written"
+
+
+def get_draft(form_id, owner):
+    """
+    Returns the draft of ``owner``, ``{"data", "revision", "updated_at"}``.
+
+    Drafts missing from the cache are read from the database.
+    """
+    entry = get_cache().get(draft_key(form_id, owner))
+    if entry is not None:
+        return entry
+    draft = Draft.objects.filter(form_id=form_id, owner=owner).first()
+    if draft is None:
+        return {"data": {}, "revision": 0, "updated_at": None}
+    return {
+        "data": draft.data,
+        "revision": draft.revision,
+        "updated_at": draft.updated_at.timestamp(),
+    }
+
+
+def save_draft(form_id, owner, data, replace=False):
+    """
+    Stores the changes ``data`` to the draft, or replaces it, and returns it.
+
+    Autosaves of a draft are serialized by a lock in the shared cache, so
+    concurrent changes are all merged. One still waiting after
+    ``DRAFT_LOCK_TIMEOUT`` seconds goes ahead, as the lock has expired by then.
+    """
+    key = draft_key(form_id, owner)
+    lock_timeout = get_setting("DRAFT_LOCK_TIMEOUT")
+    deadline = time.time() + lock_timeout
+    while time.time() < deadline:
+        with cache_lock(f"{key}:lock", lock_timeout) as acquired_at:
+            if acquired_at is not None:
+                return merge_draft(form_id, owner, data, replace)
+        time.sleep(get_setting("SINGLE_FLIGHT_POLL_INTERVAL"))
+    return merge_draft(form_id, owner, data, replace)
+
+
+def merge_draft(form_id, owner, data, replace):
+    cache = get_cache()
+    key = draft_key(form_id, owner)
+    previous = get_draft(form_id, owner)
+    now = time.time()
+    entry = {
+        "data": dict(data) if replace else {**previous["data"], **data},
+        "revision": previous["revision"] + 1,
+        "updated_at": now,
+    }
+    cache.set(key, entry, get_setting("DRAFT_TIMEOUT"))
+
+    written = cache.get(written_key(key))
+    if written is None or written["revision"] >= previous["revision"]:
+        # First unwritten change since the draft was last written.
+        written = {"revision": previous["revision"], "dirty_since": now}
+        cache.set(written_key(key), written, get_setting("DRAFT_TIMEOUT"))
+        append_to_log(key)
+    if now - written["dirty_since"] >= get_setting("DRAFT_FLUSH_INTERVAL"):
+        write_draft(form_id, owner, entry)
+    return entry
+
+
+def write_draft(form_id, owner, entry):
+    """
+    Writes a draft to the database, unless a later revision already is.
+    """
+    updated = Draft.objects.filter(
+        form_id=form_id, owner=owner, revision__lt=entry["revision"]
+    ).update(data=entry["data"], revision=entry["revision"], updated_at=timezone.now())
+    if not updated and not Draft.objects.filter(form_id=form_id, owner=owner).exists():
+        try:
+            Draft.objects.create(
+                form_id=form_id,
+                owner=owner,
+                data=entry["data"],
+                revision=entry["revision"],
+            )
+        except IntegrityError:
+            # Written by a concurrent flush, with the revision it had.
+            return write_draft(form_id, owner, entry)
+    get_cache().set(
+        written_key(draft_key(form_id, owner)),
+        {"revision": entry["revision"], "dirty_since": None},
+        get_setting("DRAFT_TIMEOUT"),
+    )
+
+
+def discard_draft(form_id, owner):
+    cache = get_cache()
+    key = draft_key(form_id, owner)
+    cache.delete_many([key, written_key(key)])
+    Draft.objects.filter(form_id=form_id, owner=owner).delete()
+
+
+def append_to_log(key):
+    cache = get_cache()
+    cache.add(LOG_KEY, 0, None)
+    position = cache.incr(LOG_KEY)
+    cache.set(f"{LOG_KEY}:{position}", key, get_setting("DRAFT_TIMEOUT"))
+
+
+def flush_drafts():
+    """
+    Writes the drafts changed since they were last written to the database.
+
+    Returns the number of drafts written.
+    """
+    cache = get_cache()
+    start = cache.get(LOG_POSITION_KEY, 0)
+    end = cache.get(LOG_KEY, 0)
+    if end <= start:
+        return 0
+    positions = [f"{LOG_KEY}:{position}" for position in range(start + 1, end + 1)]
+    keys = set(cache.get_many(positions).values())
+    count = 0
+    for key in keys:
+        entry = cache.get(key)
+        written = cache.get(written_key(key))
+        if entry is None or written is None:
+            continue
+        if entry["revision"] > written["revision"]:
+            _prefix, _draft, form_id, owner = key.split(":", 3)
+            write_draft(form_id, owner, entry)
+            count += 1
+            # An autosave racing the write may have seen the draft as unwritten.
+            latest = cache.get(key)
+            if latest is not None and latest["revision"] > entry["revision"]:
+                append_to_log(key)
+    cache.delete_many(positions)
+    cache.set(LOG_POSITION_KEY, end, None)
+    return count
@@ -0,0 +1,224 @@
+"""
+Deferred evaluations of ``evaluation_url`` fields having the ``deferred`` rule.
+
+Accepted submissions queue a ``SubmissionEvaluation`` per deferred field. Jobs
+are run by a small thread pool of the web process once the submission is
+committed, and by ``manage.py run_evaluations`` for anything left over.
+
+Endpoints are called as ``GET <url>/<value>``, or with the ``batch`` rule as
+``POST <url>`` with ``{"values": [...]}``, answering ``{"results": [...]}`` in
+the same order. The JSON (or text) answered is stored as the result.
+"""
+
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from dynamic_forms.choices import EvaluationStatusChoices
+from dynamic_forms.conf import get_setting
+from dynamic_forms.models import SubmissionEvaluation
+from dynamic_forms.plans import BATCH_RULE
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=get_setting("EVALUATION_WORKERS"),
+            thread_name_prefix="dynamic-forms-evaluation",
+        )
+    return _executor
+
+
+def queue_evaluations(submission, form_plan):
+    """
+    Creates the evaluation jobs of a submission and runs them after commit.
+    """
+    evaluations = SubmissionEvaluation.objects.bulk_create(
+        SubmissionEvaluation(
+            submission=submission,
+            field_name=field.name,
+            value=submission.data[field.name],
+            evaluation_url=field.evaluation_url,
+            batch=BATCH_RULE in field.validation,
+        )
+        for field in form_plan.deferred_fields
+        if submission.data.get(field.name) not in (None, "")
+    )
+    if evaluations and get_setting("EVALUATION_WORKERS"):
+        ids = [evaluation.pk for evaluation in evaluations]
+        transaction.on_commit(lambda: get_executor().submit(run_in_thread, ids))
+    return evaluations
+
+
+def run_in_thread(ids):
+    close_old_connections()
+    try:
+        run_evaluations(SubmissionEvaluation.objects.filter(pk__in=ids))
+    finally:
+        close_old_connections()
+
+
+def claim_evaluations(queryset, limit):
+    """
+    Marks up to ``limit`` pending jobs of ``queryset`` as running and returns them.
+
+    Jobs are claimed with a conditional update, so concurrent workers never
+    run the same job. Jobs running for longer than ``EVALUATION_CLAIM_TIMEOUT``
+    are requeued first.
+    """
+    now = timezone.now()
+    SubmissionEvaluation.objects.filter(
+        status=EvaluationStatusChoices.RUNNING,
+        updated_at__lt=now - timedelta(seconds=get_setting("EVALUATION_CLAIM_TIMEOUT")),
+    ).update(status=EvaluationStatusChoices.PENDING, updated_at=now)
+    ids = list(
+        queryset.filter(status=EvaluationStatusChoices.PENDING, run_after__lte=now)
+        .order_by("created_at")
+        .values_list("pk", flat=True)[:limit]
+    )
+    claim = uuid.uuid4()
+    SubmissionEvaluation.objects.filter(
+        pk__in=ids, status=EvaluationStatusChoices.PENDING
+    ).update(
+        status=EvaluationStatusChoices.RUNNING,
+        claim=claim,
+        attempts=F("attempts") + 1,
+        updated_at=now,
+    )
+    return list(SubmissionEvaluation.objects.filter(claim=claim))
+
+
+def run_evaluations(queryset=None, limit=500):
+    """
+    Runs pending jobs, grouping those of batch endpoints into shared calls.
+
+    Returns the number of jobs run.
+    """
+    import requests
+
+    if queryset is None:
+        queryset = SubmissionEvaluation.objects.all()
+    evaluations = claim_evaluations(queryset, limit)
+    groups = defaultdict(list)
+    for evaluation in evaluations:
+        groups[(evaluation.evaluation_url, evaluation.batch)].append(evaluation)
+
+    with requests.Session() as session:
+        for (url, batch), group in groups.items():
+            if batch:
+                size = get_setting("EVALUATION_BATCH_SIZE")
+                for start in range(0, len(group), size):
+                    evaluate_batch(session, url, group[start : start + size])
+            else:
+                for evaluation in group:
+                    evaluate(session, url, evaluation)
+    return len(evaluations)
+
+
+def evaluate(session, url, evaluation):
+    import requests
+
+    try:
+        response = session.get(
+            f"{url}/{evaluation.value}", timeout=get_setting("EVALUATION_TIMEOUT")
+        )
+    except requests.exceptions.RequestException as e:
+        return retry([evaluation], str(e))
+    if response.status_code >= 500:
+        return retry([evaluation], f"HTTP {response.status_code}")
+    finish(evaluation, response.status_code == 200, get_result(response))
+
+
+def evaluate_batch(session, url, evaluations):
+    import requests
+
+    try:
+        response = session.post(
+            url,
+            json={"values": [evaluation.value for evaluation in evaluations]},
+            timeout=get_setting("EVALUATION_TIMEOUT"),
+        )
+    except requests.exceptions.RequestException as e:
+        return retry(evaluations, str(e))
+    if response.status_code >= 500:
+        return retry(evaluations, f"HTTP {response.status_code}")
+    result = get_result(response)
+    results = result.get("results") if isinstance(result, dict) else None
+    if (
+        response.status_code != 200
+        or not isinstance(results, list)
+        or len(results) != len(evaluations)
+    ):
+        for evaluation in evaluations:
+            finish(evaluation, False, result)
+        return
+    for evaluation, result in zip(evaluations, results):
+        finish(evaluation, True, result)
+
+
+def get_result(response):
+    try:
+        return response.json()
+    except ValueError:
+        return response.text
+
+
+def claimed(evaluations):
+    """
+    The jobs among ``evaluations`` still held by the claim they were run under.
+
+    A job requeued after ``EVALUATION_CLAIM_TIMEOUT`` may have been claimed
+    again, and its results then belong to the new run.
+    """
+    return SubmissionEvaluation.objects.filter(
+        pk__in=[evaluation.pk for evaluation in evaluations],
+        claim=evaluations[0].claim,
+        status=EvaluationStatusChoices.RUNNING,
+    )
+
+
+def finish(evaluation, succeeded, result):
+    claimed([evaluation]).update(
+        status=(
+            EvaluationStatusChoices.SUCCEEDED
+            if succeeded
+            else EvaluationStatusChoices.FAILED
+        ),
+        result=result,
+        error="",
+        updated_at=timezone.now(),
+    )
+
+
+def retry_delay(attempts):
+    delay = get_setting("EVALUATION_RETRY_DELAY") * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, get_setting("EVALUATION_MAX_RETRY_DELAY")))
+
+
+def retry(evaluations, error):
+    """
+    Requeues jobs that could not reach their endpoint with exponential backoff,
+    up to the attempt limit.
+    """
+    now = timezone.now()
+    max_attempts = get_setting("EVALUATION_MAX_ATTEMPTS")
+    by_attempts = defaultdict(list)
+    for evaluation in evaluations:
+        by_attempts[evaluation.attempts].append(evaluation)
+    for attempts, group in by_attempts.items():
+        if attempts >= max_attempts:
+            changes = {"status": EvaluationStatusChoices.FAILED}
+        else:
+            changes = {
+                "status": EvaluationStatusChoices.PENDING,
+                "run_after": now + retry_delay(attempts),
+            }
+        claimed(group).update(error=error, updated_at=now, **changes)
@@ -0,0 +1,335 @@
+"""
+Cross-field rules of a form, checked once its fields are validated.
+
+``Form.validation`` holds a list of rules such as::
+
+    {"rule": "end_date > start_date", "field": "end_date",
+     "message": "Must be after the start date."}
+    {"rule": "sum(allocations.amount) == total", "field": "total"}
+    {"rule": "password == confirm_password"}
+
+A rule is an expression over the names of the fields of the form, written
+with Python syntax restricted to literals, arithmetic, comparisons, ``and``,
+``or``, ``not``, ``in`` and the functions of ``FUNCTIONS``. ``rows.name`` is
+the list of the ``name`` values of the rows of the nested field ``rows``.
+Errors go to ``field``, the first field named in the rule by default.
+
+A rule is skipped while a field it names has no value. Rules are parsed when
+the plan is compiled and compiled into closures on first use, in each process.
+"""
+
+import ast
+import logging
+import operator
+from datetime import date
+from numbers import Number
+
+logger = logging.getLogger(__name__)
+
+MAX_LENGTH = 1000
+DEFAULT_MESSAGE = "Does not satisfy {rule}."
+
+
+def safe_multiply(left, right):
+    # Repeating strings or lists would let a rule allocate unbounded memory.
+    if isinstance(left, (str, list)) or isinstance(right, (str, list)):
+        raise TypeError("Only numbers can be multiplied.")
+    return left * right
+
+
+def safe_modulo(left, right):
+    # ``%`` formats strings, which lets a rule build strings of any size.
+    if not isinstance(left, Number) or not isinstance(right, Number):
+        raise TypeError("Only numbers have a remainder.")
+    return left % right
+
+
+OPERATOR_SYMBOLS = {
+    ast.Add: "+",
+    ast.Sub: "-",
+    ast.Mult: "*",
+    ast.Div: "/",
+    ast.Mod: "%",
+    ast.Eq: "==",
+    ast.NotEq: "!=",
+    ast.Lt: "<",
+    ast.LtE: "<=",
+    ast.Gt: ">",
+    ast.GtE: ">=",
+    ast.In: "in",
+    ast.NotIn: "not in",
+}
+BINARY_OPERATORS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": safe_multiply,
+    "/": operator.truediv,
+    "%": safe_modulo,
+}
+COMPARISONS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda left, right: left in right,
+    "not in": lambda left, right: left not in right,
+}
+FUNCTIONS = {
+    "abs": abs,
+    "date": date.fromisoformat,
+    "len": len,
+    "max": max,
+    "min": min,
+    "round": round,
+    "sum": lambda values: sum(value for value in values if value is not None),
+}
+
+
+def parse_expression(source):
+    """
+    Parses ``source`` into a tree of tuples, picklable with the form plan.
+
+    Raises ``ValueError`` if ``source`` is not a valid expression.
+    """
+    if not isinstance(source, str) or not source.strip():
+        raise ValueError("A rule must be a non empty expression.")
+    if len(source) > MAX_LENGTH:
+        raise ValueError(f"A rule is at most {MAX_LENGTH} characters long.")
+    try:
+        node = ast.parse(source.strip(), mode="eval").body
+    except SyntaxError as e:
+        raise ValueError(f"Invalid rule {source!r}: {e.msg}.")
+    return to_tree(node)
+
+
+def to_tree(node):
+    if isinstance(node, ast.Constant) and (
+        node.value is None or isinstance(node.value, (bool, int, float, str))
+    ):
+        return ("constant", node.value)
+    if isinstance(node, ast.Name):
+        if node.id in ("True", "False", "None"):
+            return ("constant", {"True": True, "False": False, "None": None}[node.id])
+        return ("field", node.id)
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+        return ("rows", node.value.id, node.attr)
+    if isinstance(node, (ast.List, ast.Tuple)):
+        return ("list", [to_tree(item) for item in node.elts])
+    if isinstance(node, ast.BoolOp):
+        kind = "and" if isinstance(node.op, ast.And) else "or"
+        return (kind, [to_tree(value) for value in node.values])
+    if isinstance(node, ast.UnaryOp) and isinstance(
+        node.op, (ast.Not, ast.USub, ast.UAdd)
+    ):
+        kind = {ast.Not: "not", ast.USub: "negative", ast.UAdd: "positive"}
+        return (kind[type(node.op)], to_tree(node.operand))
+    if isinstance(node, ast.BinOp) and type(node.op) in OPERATOR_SYMBOLS:
+        return (
+            "binary",
+            OPERATOR_SYMBOLS[type(node.op)],
+            to_tree(node.left),
+            to_tree(node.right),
+        )
+    if isinstance(node, ast.Compare) and all(
+        type(op) in OPERATOR_SYMBOLS for op in node.ops
+    ):
+        return (
+            "compare",
+            to_tree(node.left),
+            [
+                (OPERATOR_SYMBOLS[type(op)], to_tree(comparator))
+                for op, comparator in zip(node.ops, node.comparators)
+            ],
+        )
+    if (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id in FUNCTIONS
+        and not node.keywords
+    ):
+        return ("call", node.func.id, [to_tree(arg) for arg in node.args])
+    raise ValueError(f"Rules cannot use {ast.unparse(node)!r}.")
+
+
+def subtrees(tree):
+    """
+    Yields ``tree`` and every expression within it, depth first.
+    """
+    yield tree
+    kind = tree[0]
+    if kind in ("list", "and", "or"):
+        children = tree[1]
+    elif kind in ("not", "negative", "positive"):
+        children = [tree[1]]
+    elif kind == "binary":
+        children = [tree[2], tree[3]]
+    elif kind == "compare":
+        children = [tree[1]] + [comparator for _op, comparator in tree[2]]
+    elif kind == "call":
+        children = tree[2]
+    else:
+        children = []
+    for child in children:
+        yield from subtrees(child)
+
+
+def expression_fields(tree):
+    """
+    Returns the names of the fields ``tree`` refers to, in order of appearance.
+    """
+    names = []
+    for subtree in subtrees(tree):
+        if subtree[0] in ("field", "rows") and subtree[1] not in names:
+            names.append(subtree[1])
+    return names
+
+
+def compile_expression(tree):
+    """
+    Compiles ``tree`` into a closure taking the validated data of a form.
+    """
+    kind = tree[0]
+    if kind == "constant":
+        value = tree[1]
+        return lambda data: value
+    if kind == "field":
+        name = tree[1]
+        return lambda data: data.get(name)
+    if kind == "rows":
+        name, attribute = tree[1], tree[2]
+        return lambda data: [row.get(attribute) for row in data.get(name) or []]
+    if kind == "list":
+        items = [compile_expression(item) for item in tree[1]]
+        return lambda data: [item(data) for item in items]
+    if kind == "and":
+        operands = [compile_expression(operand) for operand in tree[1]]
+        return lambda data: all(operand(data) for operand in operands)
+    if kind == "or":
+        operands = [compile_expression(operand) for operand in tree[1]]
+        return lambda data: any(operand(data) for operand in operands)
+    if kind == "not":
+        operand = compile_expression(tree[1])
+        return lambda data: not operand(data)
+    if kind == "negative":
+        operand = compile_expression(tree[1])
+        return lambda data: -operand(data)
+    if kind == "positive":
+        return compile_expression(tree[1])
+    if kind == "binary":
+        apply = BINARY_OPERATORS[tree[1]]
+        left, right = compile_expression(tree[2]), compile_expression(tree[3])
+        return lambda data: apply(left(data), right(data))
+    if kind == "compare":
+        first = compile_expression(tree[1])
+        comparisons = [
+            (COMPARISONS[op], compile_expression(comparator))
+            for op, comparator in tree[2]
+        ]
+
+        def compare(data):
+            left = first(data)
+            for apply, comparator in comparisons:
+                right = comparator(data)
+                if not apply(left, right):
+                    return False
+                left = right
+            return True
+
+        return compare
+    function = FUNCTIONS[tree[1]]
+    arguments = [compile_expression(argument) for argument in tree[2]]
+    return lambda data: function(*(argument(data) for argument in arguments))
+
+
+class CrossFieldRules:
+    """
+    The parsed cross-field rules of a form.
+
+    ``rules`` is a list of ``(tree, field, message, depends_on)``. Rules are
+    compiled into closures on first use, in each process.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self._checks = None
+
+    def __getstate__(self):
+        return {"rules": self.rules, "_checks": None}
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def get_checks(self):
+        if self._checks is None:
+            self._checks = [
+                (compile_expression(tree), field, message, depends_on)
+                for tree, field, message, depends_on in self.rules
+            ]
+        return self._checks
+
+    def errors(self, data):
+        """
+        Returns ``{field: [messages]}`` for the rules ``data`` does not satisfy.
+        """
+        errors = {}
+        for check, field, message, depends_on in self.get_checks():
+            if any(data.get(name) in (None, "") for name in depends_on):
+                continue
+            try:
+                satisfied = check(data)
+            except (TypeError, ValueError, ArithmeticError):
+                satisfied = False
+            if not satisfied:
+                errors.setdefault(field, []).append(message)
+        return errors
+
+
+def build_cross_field_rules(rules, fields=None, strict=True):
+    """
+    Parses ``rules``, as stored in ``Form.validation``, for a form whose
+    ``fields`` map each name to the field names of its nested form, or ``None``.
+    With ``fields`` left out, only the syntax of the rules is checked.
+
+    Raises ``ValueError`` on invalid rules and on rules naming unknown fields.
+    Unless ``strict``, such rules are logged and left out instead, so a form
+    keeps working when a field its rules name is removed or renamed.
+    """
+    parsed = []
+    for rule in rules or []:
+        try:
+            parsed.append(build_cross_field_rule(rule, fields))
+        except ValueError as e:
+            if strict:
+                raise
+            logger.warning("Ignoring cross-field rule %r: %s", rule, e)
+    return CrossFieldRules(parsed)
+
+
+def build_cross_field_rule(rule, fields):
+    if not isinstance(rule, dict) or "rule" not in rule:
+        raise ValueError(f"A rule must be an object with a 'rule', not {rule!r}.")
+    tree = parse_expression(rule["rule"])
+    if fields is not None:
+        check_fields(tree, fields)
+    depends_on = expression_fields(tree)
+    if not depends_on:
+        raise ValueError(f"Rule {rule['rule']!r} names no field.")
+    field = rule.get("field") or depends_on[0]
+    if fields is not None and field not in fields:
+        raise ValueError(f"Rule {rule['rule']!r} reports to unknown field {field}.")
+    message = rule.get("message") or DEFAULT_MESSAGE.format(rule=rule["rule"])
+    return tree, field, message, depends_on
+
+
+def check_fields(tree, fields):
+    for subtree in subtrees(tree):
+        kind, name = subtree[0], subtree[1]
+        if kind == "field" and name not in fields:
+            raise ValueError(f"Rules refer to unknown field {name}.")
+        if kind == "rows":
+            if fields.get(name) is None:
+                raise ValueError(f"Rules refer to unknown nested field {name}.")
+            if subtree[2] not in fields[name]:
+                raise ValueError(f"Rules refer to unknown field {name}.{subtree[2]}.")
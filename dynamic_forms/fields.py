@@ -0,0 +1,211 @@
+import math
+from array import array
+from datetime import date
+
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import serializers
+
+
+class OptionField(serializers.Field):
+    """
+    A choice between options, checked by membership in a frozenset.
+
+    Options come from the field itself or, when ``option_set`` is given, from
+    the cached compilation of that shared ``OptionSet``.
+    """
+
+    default_error_messages = {
+        "invalid_choice": _('"{input}" is not a valid choice.'),
+    }
+
+    def __init__(self, members=frozenset(), option_set=None, **kwargs):
+        self.members = members
+        self.option_set = option_set
+        super().__init__(**kwargs)
+
+    def get_members(self):
+        if self.option_set:
+            from dynamic_forms.cache import get_option_set
+
+            option_set = get_option_set(self.option_set)
+            if option_set is not None:
+                return option_set.members
+        return self.members
+
+    def to_internal_value(self, data):
+        value = str(data)
+        if value not in self.get_members():
+            self.fail("invalid_choice", input=data)
+        return value
+
+    def to_representation(self, value):
+        return value
+
+
+MIN_INT, MAX_INT = -(2**63), 2**63 - 1
+
+
+def convert_int(value):
+    if isinstance(value, bool):
+        raise ValueError
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError
+    value = int(value)
+    if not MIN_INT <= value <= MAX_INT:
+        raise ValueError
+    return value
+
+
+def convert_float(value):
+    if isinstance(value, bool):
+        raise ValueError
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError
+    return value
+
+
+def convert_string(value):
+    if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+        raise ValueError
+    value = str(value).strip()
+    if not value:
+        raise ValueError
+    return value
+
+
+def convert_date(value):
+    if not isinstance(value, str):
+        raise ValueError
+    return date.fromisoformat(value)
+
+
+class ArrayField(serializers.Field):
+    """
+    A list of ``item_type`` values, checked in a single pass over the items.
+
+    Lists of ``int`` and ``float`` are first converted to an ``array.array``
+    and checked against their bounds with ``min``/``max``, without a Python
+    call per item. Lists that fail are checked item by item to report the
+    invalid ones by index, as ``ListField`` does.
+    """
+
+    default_error_messages = {
+        "not_a_list": _('Expected a list of items but got type "{input_type}".'),
+        "min_items": _("Ensure this field has at least {count} elements."),
+        "max_items": _("Ensure this field has no more than {count} elements."),
+        "invalid": _("Enter a valid {item_type}."),
+        "invalid_choice": _('"{input}" is not a valid choice.'),
+        "min_value": _("Ensure this value is greater than or equal to {limit}."),
+        "max_value": _("Ensure this value is less than or equal to {limit}."),
+        "min_length": _("Ensure this value has at least {limit} characters."),
+        "max_length": _("Ensure this value has no more than {limit} characters."),
+    }
+    converters = {
+        "string": convert_string,
+        "int": convert_int,
+        "float": convert_float,
+        "date": convert_date,
+        "option": str,
+    }
+    typecodes = {"int": "q", "float": "d"}
+
+    def __init__(
+        self,
+        item_type="string",
+        min_items=None,
+        max_items=None,
+        item_min_value=None,
+        item_max_value=None,
+        item_min_length=None,
+        item_max_length=None,
+        members=frozenset(),
+        option_set=None,
+        **kwargs,
+    ):
+        self.item_type = item_type
+        self.min_items = min_items
+        self.max_items = max_items
+        self.item_min_value = item_min_value
+        self.item_max_value = item_max_value
+        self.item_min_length = item_min_length
+        self.item_max_length = item_max_length
+        self.option_field = OptionField(members=members, option_set=option_set)
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if self.min_items is not None and len(data) < self.min_items:
+            self.fail("min_items", count=self.min_items)
+        if self.max_items is not None and len(data) > self.max_items:
+            self.fail("max_items", count=self.max_items)
+        if self.item_type in self.typecodes:
+            values = self.convert_numbers(data)
+            if values is not None:
+                return values
+        return self.convert_items(data)
+
+    def convert_numbers(self, data):
+        """
+        Returns the numbers of ``data`` if all are valid, or else ``None``.
+        """
+        item_types = set(map(type, data))
+        allowed = {int} if self.item_type == "int" else {int, float}
+        if not item_types <= allowed:
+            return None
+        try:
+            values = array(self.typecodes[self.item_type], data)
+        except (OverflowError, TypeError):
+            return None
+        if self.item_type == "float" and not all(map(math.isfinite, values)):
+            return None
+        if values and self.item_min_value is not None:
+            if min(values) < self.item_min_value:
+                return None
+        if values and self.item_max_value is not None:
+            if max(values) > self.item_max_value:
+                return None
+        return values.tolist()
+
+    def convert_items(self, data):
+        convert = self.converters[self.item_type]
+        if self.item_type == "option":
+            members = self.option_field.get_members()
+        low, high = self.item_min_value, self.item_max_value
+        shortest, longest = self.item_min_length, self.item_max_length
+        values = []
+        errors = {}
+        for index, item in enumerate(data):
+            try:
+                value = convert(item)
+            except (TypeError, ValueError):
+                errors[index] = [self.message("invalid", item_type=self.item_type)]
+                continue
+            if self.item_type == "option":
+                if value not in members:
+                    errors[index] = [self.message("invalid_choice", input=item)]
+            elif self.item_type == "string":
+                if shortest is not None and len(value) < shortest:
+                    errors[index] = [self.message("min_length", limit=shortest)]
+                elif longest is not None and len(value) > longest:
+                    errors[index] = [self.message("max_length", limit=longest)]
+            elif self.item_type != "date":
+                if low is not None and value < low:
+                    errors[index] = [self.message("min_value", limit=low)]
+                elif high is not None and value > high:
+                    errors[index] = [self.message("max_value", limit=high)]
+            values.append(value)
+        if errors:
+            raise serializers.ValidationError(errors)
+        return values
+
+    def message(self, key, **kwargs):
+        return self.error_messages[key].format(**kwargs)
+
+    def to_representation(self, value):
+        if self.item_type == "date":
+            return [item.isoformat() for item in value]
+        return list(value)
@@ -5,9 +5,13 @@ from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
 
 from .choices import FormFieldChoices
-from .models import Field, FieldProperty
+from .conditions import build_condition_graph
+from .expressions import build_cross_field_rules
+from .models import Field, FieldProperty, Form
 
-validation_pattern = r"(\w+:\w+|\w+)"  # "min_length:8" # noqa: B950
+validation_pattern = (
+    r"(\w+:[\w.-]+|\w+)"  # "min_length:8", "item_min_value:-2.5" # noqa: B950
+)
 date_range_validation_pattern = r"^date_range:(\d{4}-\d{2}-\d{2}),(\d{4}-\d{2}-\d{2})$"  # noqa  # "date_range:1980-01-01,2025-12-31" # noqa: B950
 time_range_validation_pattern = r"^time_range:(\d{2}:\d{2}:\d{2}),(\d{2}:\d{2}:\d{2})$"  # noqa  # time_range:08:00:00,18:00:00 # noqa: B950
 date_time_range_validation_pattern = r"^datetime_range:(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}),(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2})$"  # noqa  # datetime_range:2024-01-01T08:00:00,2025-12-31T18:00:00 # noqa: B950
@@ -33,6 +37,56 @@ class FieldForm(forms.ModelForm):
         return self.cleaned_data
 
 
+class FormForm(forms.ModelForm):
+    class Meta:
+        model = Form
+        exclude = ["created_at", "updated_at"]
+
+    def clean_validation(self):
+        # The fields the rules name are checked with the submitted field
+        # properties, by ``FieldPropertyInlineFormSet``.
+        validation = self.cleaned_data.get("validation")
+        try:
+            build_cross_field_rules(validation)
+        except ValueError as e:
+            raise forms.ValidationError(str(e))
+        return validation
+
+
+class FieldPropertyInlineFormSet(forms.BaseInlineFormSet):
+    def clean(self):
+        """
+        Checks the cross-field rules of the form against the fields it has once
+        saved, including those added, changed or deleted along with the rules.
+        """
+        super().clean()
+        if any(self.errors):
+            return
+        fields = {}
+        for form in self.forms:
+            cleaned_data = getattr(form, "cleaned_data", None)
+            if not cleaned_data or cleaned_data.get("DELETE"):
+                continue
+            field = cleaned_data.get("field")
+            if field is None:
+                continue
+            nested_form = field.nested_form
+            if nested_form is None:
+                fields[field.name] = None
+            elif not nested_form.is_archived:
+                fields[field.name] = set(
+                    nested_form.form_field_property.values_list(
+                        "field__name", flat=True
+                    )
+                )
+        try:
+            build_cross_field_rules(self.instance.validation, fields)
+        except ValueError as e:
+            raise forms.ValidationError(
+                _("Invalid cross-field rules: %(error)s"), params={"error": e}
+            )
+
+
 class FieldPropertyForm(forms.ModelForm):
     class Meta:
         model = FieldProperty
@@ -45,13 +99,18 @@ class FieldPropertyForm(forms.ModelForm):
         validation = self.cleaned_data.get("validation")
         validation_endpoint = self.cleaned_data.get("validation_endpoint")
         options = self.cleaned_data.get("options")
+        option_set = self.cleaned_data.get("option_set")
         hidden = self.cleaned_data.get("hidden")
+        conditions = self.cleaned_data.get("conditions")
 
         if (
             field.field_type in [FormFieldChoices.DROPDOWN, FormFieldChoices.RADIO]
             and not options
+            and not option_set
         ):
-            raise forms.ValidationError({"options": _("Options are required.")})
+            raise forms.ValidationError(
+                {"options": _("Options or an option set are required.")}
+            )
         if field.field_type == FormFieldChoices.DATE_RANGE and validation:
             for _s in validation:
                 match = re.fullmatch(date_range_validation_pattern, str(validation[0]))
@@ -117,6 +176,16 @@ class FieldPropertyForm(forms.ModelForm):
                             )
                         }
                     )
+        if conditions and form:
+            siblings = [
+                (sibling.field.name, sibling.conditions)
+                for sibling in form.form_field_property.select_related("field")
+                if sibling.field_id != field.pk
+            ]
+            try:
+                build_condition_graph(siblings + [(field.name, conditions)])
+            except ValueError as e:
+                raise forms.ValidationError({"conditions": str(e)})
         if field.field_type == FormFieldChoices.NESTED and field.nested_form:
             if (
                 field.nested_form.form_field_property.filter(field=field)
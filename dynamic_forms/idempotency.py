@@ -0,0 +1,94 @@
+import hashlib
+import json
+import time
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from dynamic_forms.cache import KEY_PREFIX, cache_lock, get_cache
+from dynamic_forms.conf import get_setting
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+# Headers of the first response replayed with it.
+STORED_HEADERS = ("Location",)
+# Part of every idempotency key. Bump it whenever the stored entries change
+# shape so entries written by another release are never unpacked.
+ENTRY_FORMAT = 2
+
+
+def get_idempotency_key(request, slug, key):
+    """
+    Scopes a client supplied key to the form and to the user sending it.
+    """
+    user = request.user.pk if request.user.is_authenticated else ""
+    digest = hashlib.sha256(f"{slug}:{user}:{key}".encode()).hexdigest()
+    return f"{KEY_PREFIX}:idempotency:{ENTRY_FORMAT}:{digest}"
+
+
+def get_fingerprint(data):
+    return hashlib.sha256(
+        json.dumps(data, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def replay(stored, fingerprint):
+    stored_fingerprint, status_code, data, headers = stored
+    if stored_fingerprint != fingerprint:
+        return Response(
+            {"detail": f"{IDEMPOTENCY_HEADER} was already used with another payload."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    return Response(
+        data, status=status_code, headers={**headers, REPLAYED_HEADER: "true"}
+    )
+
+
+def idempotent(request, slug, key, handler):
+    """
+    Runs ``handler`` once per idempotency key and replays its response.
+
+    Responses other than server errors, validation errors included, are kept
+    for ``IDEMPOTENCY_TTL`` seconds. A duplicate arriving while the first
+    request is in flight waits up to ``IDEMPOTENCY_WAIT`` seconds for its
+    response, then gets a 409.
+    """
+    cache = get_cache()
+    cache_key = get_idempotency_key(request, slug, key)
+    fingerprint = get_fingerprint(request.data)
+    stored = cache.get(cache_key)
+    if stored is not None:
+        return replay(stored, fingerprint)
+
+    lock_timeout = get_setting("IDEMPOTENCY_LOCK_TIMEOUT")
+    with cache_lock(f"{cache_key}:lock", lock_timeout) as acquired_at:
+        if acquired_at is not None:
+            # The first request may have stored its response and released the
+            # lock between the lookup above and taking it.
+            stored = cache.get(cache_key)
+            if stored is not None:
+                return replay(stored, fingerprint)
+            response = handler()
+            if response.status_code < 500:
+                headers = {
+                    header: response[header]
+                    for header in STORED_HEADERS
+                    if header in response
+                }
+                cache.set(
+                    cache_key,
+                    (fingerprint, response.status_code, response.data, headers),
+                    get_setting("IDEMPOTENCY_TTL"),
+                )
+            return response
+
+    deadline = time.time() + get_setting("IDEMPOTENCY_WAIT")
+    while time.time() < deadline:
+        time.sleep(get_setting("SINGLE_FLIGHT_POLL_INTERVAL"))
+        stored = cache.get(cache_key)
+        if stored is not None:
+            return replay(stored, fingerprint)
+    return Response(
+        {"detail": f"A request with this {IDEMPOTENCY_HEADER} is in progress."},
+        status=status.HTTP_409_CONFLICT,
+    )
@@ -0,0 +1,432 @@
+"""
+Replays form detail and submission requests against the project's WSGI or ASGI
+application, in process, as run by ``manage.py loadtest``.
+
+A request file holds one JSON object per line::
+
+    {"method": "GET", "path": "/api/forms/kyc/"}
+    {"method": "POST", "path": "/api/forms/kyc/submit/", "body": {"name": "x"}}
+
+``headers`` may be given too. ``generate_requests`` writes such requests for
+existing forms, with a valid looking value for every field.
+"""
+
+import asyncio
+import contextvars
+import json
+import multiprocessing
+import statistics
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from urllib.parse import urlsplit, urlunsplit
+
+from dynamic_forms.choices import FormFieldChoices
+
+SAMPLE_VALUES = {
+    FormFieldChoices.TEXT: "loadtest",
+    FormFieldChoices.PASSWORD: "loadtest-password",
+    FormFieldChoices.EMAIL: "loadtest@example.com",
+    FormFieldChoices.CHECKBOX: True,
+    FormFieldChoices.ARRAY: ["loadtest"],
+    FormFieldChoices.COUNTRY: "KE",
+    FormFieldChoices.CURRENCY: "100.00",
+    FormFieldChoices.DATE: "2024-01-01",
+    FormFieldChoices.DATE_RANGE: "2024-01-01",
+    FormFieldChoices.TIME: "08:00:00",
+    FormFieldChoices.DATE_TIME: "2024-01-01 08:00:00",
+    FormFieldChoices.DATE_TIME_RANGE: "2024-01-01 08:00:00",
+    FormFieldChoices.EXTERNAL_VALIDATION_ENDPOINT: "loadtest",
+    FormFieldChoices.EXTERNAL_EVALUATION_ENDPOINT: "loadtest",
+    FormFieldChoices.FLOAT: 1.5,
+    FormFieldChoices.INTEGER: 1,
+    FormFieldChoices.URL: "https://example.com/",
+    FormFieldChoices.PHONE_NUMBER: "+254712345678",
+}
+
+
+def sample_value(field):
+    if field.field_type == FormFieldChoices.NESTED and field.nested is not None:
+        return [sample_payload(field.nested)]
+    if field.field_type in (FormFieldChoices.DROPDOWN, FormFieldChoices.RADIO):
+        if field.option_set:
+            from dynamic_forms.cache import get_option_set
+
+            option_set = get_option_set(field.option_set)
+            options = option_set.options if option_set is not None else ()
+        else:
+            options = field.options
+        return options[0] if options else None
+    if field.field_type == FormFieldChoices.UUID:
+        return str(uuid.uuid4())
+    value = SAMPLE_VALUES.get(field.field_type)
+    for rule in field.validation:
+        if isinstance(value, str) and str(rule).startswith("min_length:"):
+            value = value.ljust(int(rule.split(":")[1]), "x")
+    return value
+
+
+def sample_payload(form_plan):
+    payload = {}
+    for field in form_plan:
+        if field.hidden:
+            continue
+        value = sample_value(field)
+        if value is not None:
+            payload[field.name] = value
+    return payload
+
+
+def generate_requests(slugs, count):
+    """
+    Returns ``count`` requests alternating between the detail and a submission
+    of each form of ``slugs``.
+    """
+    from django.urls import reverse
+
+    from dynamic_forms.cache import get_form_plan
+
+    templates = []
+    for slug in slugs:
+        form_plan = get_form_plan(slug)
+        if form_plan is None:
+            raise ValueError(f"Form {slug} does not exist.")
+        templates += [
+            {"method": "GET", "path": reverse("form_detail", kwargs={"slug": slug})},
+            {
+                "method": "POST",
+                "path": reverse("form_submission", kwargs={"slug": slug}),
+                "body": sample_payload(form_plan),
+            },
+        ]
+    return [templates[index % len(templates)] for index in range(count)]
+
+
+def read_requests(file):
+    return [json.loads(line) for line in file if line.strip()]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Answers every external validation and evaluation call with a 200.
+
+    Batch evaluations get one result per value sent.
+    """
+
+    latency = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def reply(self, body):
+        time.sleep(self.latency)
+        content = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        self.reply({"valid": True})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        values = body.get("values") if isinstance(body, dict) else None
+        if values is not None:
+            self.reply({"results": [{"valid": True} for _value in values]})
+        else:
+            self.reply({"valid": True})
+
+
+@contextmanager
+def stub_external_calls(latency=0):
+    """
+    Serves a stub on a local port and sends every ``requests`` call to it.
+
+    The scheme and host of outgoing URLs are replaced, their path is kept.
+    """
+    import requests
+
+    handler = type("StubHandler", (StubHandler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stub = urlsplit(f"http://127.0.0.1:{server.server_port}")
+    send = requests.Session.request
+
+    def request(session, method, url, *args, **kwargs):
+        parts = urlsplit(url)._replace(scheme=stub.scheme, netloc=stub.netloc)
+        return send(session, method, urlunsplit(parts), *args, **kwargs)
+
+    requests.Session.request = request
+    try:
+        yield stub.geturl()
+    finally:
+        requests.Session.request = send
+        server.shutdown()
+        server.server_close()
+
+
+current_queries = contextvars.ContextVar("current_queries", default=None)
+
+
+def count_queries(execute, sql, params, many, context):
+    counter = current_queries.get()
+    if counter is not None:
+        counter[0] += 1
+    return execute(sql, params, many, context)
+
+
+def install_query_counter(connection, **kwargs):
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_queries)
+
+
+def count_all_queries():
+    """
+    Counts the queries of every connection, including those opened later by
+    the threads running sync views under ASGI, in ``current_queries``.
+    """
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+
+    connection_created.connect(install_query_counter)
+    for connection in connections.all():
+        install_query_counter(connection)
+
+
+def endpoint(path):
+    from django.urls import Resolver404, resolve
+
+    try:
+        return resolve(urlsplit(path).path).url_name
+    except Resolver404:
+        return "unknown"
+
+
+def encode_request(request):
+    body = request.get("body")
+    content = b"" if body is None else json.dumps(body).encode()
+    headers = {"Content-Type": "application/json", **request.get("headers", {})}
+    return request.get("method", "GET").upper(), request["path"], headers, content
+
+
+def call_wsgi(application, request):
+    method, path, headers, content = encode_request(request)
+    parts = urlsplit(path)
+    environ = {
+        "REQUEST_METHOD": method,
+        "PATH_INFO": parts.path,
+        "QUERY_STRING": parts.query,
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "REMOTE_ADDR": "127.0.0.1",
+        "CONTENT_LENGTH": str(len(content)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": BytesIO(content),
+        "wsgi.errors": BytesIO(),
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in headers.items():
+        key = name.upper().replace("-", "_")
+        if key not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            key = f"HTTP_{key}"
+        environ[key] = value
+    status = []
+    response = application(environ, lambda code, headers, *args: status.append(code))
+    try:
+        for _chunk in response:
+            pass
+    finally:
+        if hasattr(response, "close"):
+            response.close()
+    return int(status[0].split()[0])
+
+
+async def call_asgi(application, request):
+    method, path, headers, content = encode_request(request)
+    parts = urlsplit(path)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": parts.path,
+        "raw_path": parts.path.encode(),
+        "query_string": parts.query.encode(),
+        "headers": [
+            (name.lower().encode(), str(value).encode())
+            for name, value in {
+                **headers,
+                "Host": "localhost",
+                "Content-Length": len(content),
+            }.items()
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    messages = [{"type": "http.request", "body": content, "more_body": False}]
+    status = []
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await application(scope, receive, send)
+    return status[0]
+
+
+def measure(request, call):
+    counter = [0]
+    token = current_queries.set(counter)
+    started = time.perf_counter()
+    try:
+        status = call()
+    except Exception:
+        status = 599
+    finally:
+        current_queries.reset(token)
+    return endpoint(request["path"]), status, time.perf_counter() - started, counter[0]
+
+
+async def ameasure(request, call):
+    counter = [0]
+    token = current_queries.set(counter)
+    started = time.perf_counter()
+    try:
+        status = await call()
+    except Exception:
+        status = 599
+    finally:
+        current_queries.reset(token)
+    return endpoint(request["path"]), status, time.perf_counter() - started, counter[0]
+
+
+def replay_wsgi(requests, threads):
+    from django.db import connection
+
+    from project.wsgi import application
+
+    count_all_queries()
+
+    def worker(requests):
+        try:
+            return [
+                measure(request, lambda: call_wsgi(application, request))
+                for request in requests
+            ]
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(threads) as executor:
+        futures = [
+            executor.submit(worker, requests[index::threads])
+            for index in range(threads)
+        ]
+        return [sample for future in futures for sample in future.result()]
+
+
+def replay_asgi(requests, concurrency):
+    from project.asgi import application
+
+    count_all_queries()
+
+    async def worker(requests):
+        return [
+            await ameasure(request, lambda: call_asgi(application, request))
+            for request in requests
+        ]
+
+    async def main():
+        results = await asyncio.gather(
+            *(worker(requests[index::concurrency]) for index in range(concurrency))
+        )
+        return [sample for samples in results for sample in samples]
+
+    return asyncio.run(main())
+
+
+def replay(requests, interface, threads):
+    if interface == "asgi":
+        return replay_asgi(requests, threads)
+    return replay_wsgi(requests, threads)
+
+
+def run(requests, interface="wsgi", threads=1, processes=1, stub_latency=0):
+    """
+    Replays ``requests`` split between ``processes`` forked processes running
+    ``threads`` threads each, or as many concurrent tasks under ASGI.
+
+    Returns the wall time and one ``(endpoint, status, seconds, queries)``
+    sample per request.
+    """
+    from django.db import connections
+
+    with stub_external_calls(stub_latency):
+        started = time.perf_counter()
+        if processes == 1:
+            samples = replay(requests, interface, threads)
+        else:
+            # Children must open their own connections rather than share the parent's.
+            connections.close_all()
+            context = multiprocessing.get_context("fork")
+            with ProcessPoolExecutor(processes, mp_context=context) as executor:
+                futures = [
+                    executor.submit(
+                        replay, requests[index::processes], interface, threads
+                    )
+                    for index in range(processes)
+                ]
+                samples = [sample for future in futures for sample in future.result()]
+        return time.perf_counter() - started, samples
+
+
+def percentile(latencies, percent):
+    if len(latencies) == 1:
+        return latencies[0]
+    return statistics.quantiles(latencies, n=100, method="inclusive")[percent - 1]
+
+
+def summarize(elapsed, samples):
+    """
+    Returns one row of statistics per endpoint, then one for all requests.
+    """
+    by_endpoint = defaultdict(list)
+    for sample in samples:
+        by_endpoint[sample[0]].append(sample)
+    rows = []
+    for name, endpoint_samples in sorted(by_endpoint.items()) + [("all", samples)]:
+        latencies = [seconds * 1000 for _e, _s, seconds, _q in endpoint_samples]
+        statuses = defaultdict(int)
+        for _e, status, _seconds, _q in endpoint_samples:
+            statuses[status] += 1
+        rows.append(
+            {
+                "endpoint": name,
+                "requests": len(endpoint_samples),
+                "throughput": len(endpoint_samples) / elapsed,
+                "p50": percentile(latencies, 50),
+                "p95": percentile(latencies, 95),
+                "p99": percentile(latencies, 99),
+                "queries": statistics.mean(q for _e, _s, _t, q in endpoint_samples),
+                "statuses": dict(sorted(statuses.items())),
+            }
+        )
+    return rows
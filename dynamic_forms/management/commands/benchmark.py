@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from dynamic_forms.benchmarks import SUITES
+
+
+class Command(BaseCommand):
+    help = "Runs the dynamic_forms benchmarks and prints their results."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "suites",
+            nargs="*",
+            choices=sorted(SUITES),
+            help="Suites to run, all of them by default.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Number of times each measurement is repeated.",
+        )
+
+    def handle(self, *args, **options):
+        for name in options["suites"] or sorted(SUITES):
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for label, value in SUITES[name](options["repeat"]):
+                if isinstance(value, float):
+                    value = f"{value:.2f}"
+                self.stdout.write(f"  {label:<50} {value}")
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from dynamic_forms.models import Form
+from dynamic_forms.segments import cold_partitions, compact_partition, get_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves the submissions of months older than COLD_AFTER_DAYS out of the "
+        "database into compressed segment files."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            metavar="DAYS",
+            help="Compact months ended this many days ago instead of COLD_AFTER_DAYS.",
+        )
+        parser.add_argument(
+            "--form",
+            metavar="SLUG",
+            help="Only compact the submissions of this form.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List the partitions to compact without compacting them.",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = get_cutoff(options["older_than"])
+        form = None
+        if options["form"]:
+            form = Form.objects.filter(slug=options["form"]).first()
+            if form is None:
+                raise CommandError(f"Unknown form {options['form']!r}.")
+
+        for form_id, month in cold_partitions(cutoff, form=form):
+            if options["dry_run"]:
+                self.stdout.write(f"Would compact {form_id} {month:%Y-%m}.")
+                continue
+            segments = compact_partition(form_id, month)
+            count = sum(segment.count for segment in segments)
+            size = sum(segment.size for segment in segments)
+            self.stdout.write(
+                f"Compacted {count} submissions of {form_id} {month:%Y-%m} "
+                f"into {len(segments)} segments ({size} bytes)."
+            )
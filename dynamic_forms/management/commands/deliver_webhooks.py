@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from dynamic_forms.outbox import deliver_events
+
+
+class Command(BaseCommand):
+    help = "Delivers the outbox events of accepted submissions to their webhooks."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once no event is due instead of polling.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1,
+            help="Seconds to sleep when no event is due.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=1000,
+            help="Events claimed at once.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            count = deliver_events(limit=options["limit"])
+            if count:
+                self.stdout.write(f"Attempted {count} events.")
+            elif options["once"]:
+                return
+            else:
+                time.sleep(options["interval"])
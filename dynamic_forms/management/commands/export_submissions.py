@@ -0,0 +1,55 @@
+import json
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dynamic_forms.models import Form
+from dynamic_forms.routers import use_replica
+from dynamic_forms.segments import iter_submissions
+
+
+def parse_month(value):
+    try:
+        return date.fromisoformat(f"{value}-01" if len(value) == 7 else value)
+    except ValueError:
+        raise CommandError(f"Invalid month {value!r}, expected YYYY-MM.")
+
+
+class Command(BaseCommand):
+    help = (
+        "Exports the submissions of a form as JSON lines, from the database "
+        "and from the segments of compacted months alike."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("slug", help="Slug of the form.")
+        parser.add_argument(
+            "--since",
+            metavar="YYYY-MM",
+            help="First month exported.",
+        )
+        parser.add_argument(
+            "--until",
+            metavar="YYYY-MM",
+            help="Last month exported.",
+        )
+        parser.add_argument(
+            "--output",
+            help="File to write to instead of the standard output.",
+        )
+
+    def handle(self, *args, **options):
+        since = options["since"] and parse_month(options["since"])
+        until = options["until"] and parse_month(options["until"])
+        with use_replica():
+            form = Form.objects.filter(slug=options["slug"]).first()
+            if form is None:
+                raise CommandError(f"Unknown form {options['slug']!r}.")
+            records = iter_submissions(form, since=since, until=until)
+            if not options["output"]:
+                for record in records:
+                    self.stdout.write(json.dumps(record))
+                return
+            with open(options["output"], "w") as output:
+                for record in records:
+                    output.write(json.dumps(record) + "\n")
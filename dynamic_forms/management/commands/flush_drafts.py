@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from dynamic_forms.conf import get_setting
+from dynamic_forms.drafts import flush_drafts
+
+
+class Command(BaseCommand):
+    help = "Writes the drafts autosaved since they were last written to the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Flush once instead of polling.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Seconds between flushes, DRAFT_FLUSH_INTERVAL by default.",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"] or get_setting("DRAFT_FLUSH_INTERVAL")
+        while True:
+            count = flush_drafts()
+            if count:
+                self.stdout.write(f"Wrote {count} drafts.")
+            if options["once"]:
+                return
+            time.sleep(interval)
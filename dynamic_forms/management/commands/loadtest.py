@@ -0,0 +1,101 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dynamic_forms.loadtest import generate_requests, read_requests, run, summarize
+
+
+class Command(BaseCommand):
+    help = (
+        "Replays form detail and submission requests against the WSGI or ASGI "
+        "application and reports throughput, latency and queries per endpoint. "
+        "Submissions are stored in the configured database."
+    )
+
+    def add_arguments(self, parser):
+        source = parser.add_mutually_exclusive_group(required=True)
+        source.add_argument(
+            "--file",
+            help="JSON lines file of requests to replay.",
+        )
+        source.add_argument(
+            "--generate",
+            nargs="+",
+            metavar="SLUG",
+            help="Generate requests for the detail and submission of these forms.",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=1000,
+            help="Number of requests to generate.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the generated requests to this file instead of replaying them.",
+        )
+        parser.add_argument(
+            "--interface",
+            choices=["wsgi", "asgi"],
+            default="wsgi",
+            help="Application the requests are sent to.",
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=4,
+            help="Threads per process, or concurrent tasks per process under ASGI.",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Forked processes the requests are split between.",
+        )
+        parser.add_argument(
+            "--stub-latency",
+            type=float,
+            default=0,
+            help="Milliseconds the stub external validation server waits per call.",
+        )
+
+    def handle(self, *args, **options):
+        if options["file"]:
+            with open(options["file"]) as file:
+                requests = read_requests(file)
+        else:
+            try:
+                requests = generate_requests(options["generate"], options["requests"])
+            except ValueError as e:
+                raise CommandError(e)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                for request in requests:
+                    file.write(json.dumps(request) + "\n")
+            self.stdout.write(f"Wrote {len(requests)} requests.")
+            return
+        if not requests:
+            raise CommandError("No requests to replay.")
+
+        elapsed, samples = run(
+            requests,
+            interface=options["interface"],
+            threads=options["threads"],
+            processes=options["processes"],
+            stub_latency=options["stub_latency"] / 1000,
+        )
+        self.stdout.write(
+            f"{len(samples)} requests in {elapsed:.2f}s over "
+            f"{options['processes']}x{options['threads']} {options['interface']} workers"
+        )
+        self.stdout.write(
+            f"  {'endpoint':<28} {'requests':>8} {'req/s':>9} {'p50 ms':>8} "
+            f"{'p95 ms':>8} {'p99 ms':>8} {'queries':>8}  statuses"
+        )
+        for row in summarize(elapsed, samples):
+            statuses = ", ".join(f"{k}: {v}" for k, v in row["statuses"].items())
+            self.stdout.write(
+                f"  {row['endpoint']:<28} {row['requests']:>8} "
+                f"{row['throughput']:>9.1f} {row['p50']:>8.2f} {row['p95']:>8.2f} "
+                f"{row['p99']:>8.2f} {row['queries']:>8.1f}  {statuses}"
+            )
@@ -0,0 +1,69 @@
+import io
+import pstats
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+
+from dynamic_forms.profiling import get_profile_dir, read_profiles
+
+
+class Command(BaseCommand):
+    help = (
+        "Merges the profiles of sampled requests and prints the functions "
+        "with the highest cumulative time per form and endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dir",
+            help="Directory of the profiles, PROFILE_DIR by default.",
+        )
+        parser.add_argument(
+            "--form",
+            metavar="SLUG",
+            help="Only report the profiles of this form.",
+        )
+        parser.add_argument(
+            "--endpoint",
+            choices=["detail", "submit"],
+            help="Only report the profiles of this endpoint.",
+        )
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=20,
+            help="Number of functions listed per form.",
+        )
+        parser.add_argument(
+            "--sort",
+            default="cumulative",
+            choices=["cumulative", "tottime", "ncalls"],
+            help="Order of the functions listed.",
+        )
+
+    def handle(self, *args, **options):
+        groups = defaultdict(list)
+        for path, metadata in read_profiles(options["dir"] or get_profile_dir()):
+            if options["form"] and metadata["form"] != options["form"]:
+                continue
+            if options["endpoint"] and metadata["endpoint"] != options["endpoint"]:
+                continue
+            groups[metadata["form"], metadata["endpoint"]].append((path, metadata))
+        if not groups:
+            self.stdout.write("No profiles.")
+            return
+
+        for (form, endpoint), profiles in sorted(groups.items()):
+            durations = sorted(metadata["duration"] for _path, metadata in profiles)
+            payload_sizes = [metadata["payload_size"] for _path, metadata in profiles]
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{form} {endpoint}"))
+            self.stdout.write(
+                f"  {len(profiles)} requests, "
+                f"median {durations[len(durations) // 2] * 1000:.1f} ms, "
+                f"max {durations[-1] * 1000:.1f} ms, "
+                f"mean payload {sum(payload_sizes) // len(payload_sizes)} bytes"
+            )
+            output = io.StringIO()
+            stats = pstats.Stats(*(path for path, _metadata in profiles), stream=output)
+            stats.strip_dirs().sort_stats(options["sort"]).print_stats(options["top"])
+            self.stdout.write(output.getvalue())
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from dynamic_forms.evaluations import run_evaluations
+
+
+class Command(BaseCommand):
+    help = "Runs the pending deferred evaluations of submissions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once no evaluation is pending instead of polling.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to sleep when no evaluation is pending.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=500,
+            help="Evaluations claimed at once.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            count = run_evaluations(limit=options["limit"])
+            if count:
+                self.stdout.write(f"Ran {count} evaluations.")
+            elif options["once"]:
+                return
+            else:
+                time.sleep(options["interval"])
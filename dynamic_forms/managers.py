@@ -0,0 +1,51 @@
+from django.db import transaction
+from django.utils import timezone
+
+from base.managers import BaseManager, BaseModelQuerySet
+
+
+class FormQuerySet(BaseModelQuerySet):
+    def archive(self):
+        """
+        Archives the forms and the fields no active form uses any more.
+
+        Fields are reached through the ``FieldProperty`` rows of the forms, with
+        one UPDATE for the forms and one for their fields whatever their number.
+        Cached versions of the forms are dropped once the transaction commits.
+        """
+        from dynamic_forms.cache import bump_versions, forget_forms, with_parent_forms
+        from dynamic_forms.models import Field
+
+        with transaction.atomic(using=self.db):
+            forms = dict(self.active().values_list("pk", "slug"))
+            form_ids = list(forms)
+            archived = self.model.objects.filter(pk__in=form_ids).update(
+                is_archived=True, updated_at=timezone.now()
+            )
+            Field.objects.active().filter(
+                form_field_property__form__in=form_ids
+            ).exclude(form_field_property__form__is_archived=False).archive()
+            # Forms nesting them stop validating their fields.
+            parent_ids = with_parent_forms(form_ids) - set(form_ids)
+            if parent_ids:
+                bump_versions(self.model, parent_ids)
+            forget_forms(forms.values())
+        return archived
+
+    def unarchive(self):
+        """
+        Unarchives the forms, bumping their versions and those of forms nesting them.
+        """
+        from dynamic_forms.cache import bump_form_versions
+
+        with transaction.atomic(using=self.db):
+            form_ids = list(self.archived().values_list("pk", flat=True))
+            unarchived = self.model.objects.filter(pk__in=form_ids).update(
+                is_archived=False, updated_at=timezone.now()
+            )
+            bump_form_versions(form_ids)
+        return unarchived
+
+
+class FormManager(BaseManager.from_queryset(FormQuerySet)):
+    queryset_class = FormQuerySet
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-19 13:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dynamic_forms", "0006_alter_field_field_type_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="form",
+            name="version",
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-19 13:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dynamic_forms", "0007_form_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fieldproperty",
+            name="conditions",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,118 @@
+# Generated by Django 5.0.7 on 2026-10-19 13:26
+
+import django.core.serializers.json
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dynamic_forms", "0008_fieldproperty_conditions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Submission",
+            fields=[
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "id",
+                    models.UUIDField(
+                        db_index=True,
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("is_archived", models.BooleanField(default=False)),
+                ("metadata", models.JSONField(blank=True, default=dict, null=True)),
+                ("form_version", models.PositiveIntegerField()),
+                (
+                    "data",
+                    models.JSONField(
+                        default=dict,
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                    ),
+                ),
+                (
+                    "form",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="submissions",
+                        to="dynamic_forms.form",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Submission",
+                "verbose_name_plural": "Submissions",
+                "ordering": ("-created_at",),
+                "get_latest_by": ("created_at",),
+            },
+        ),
+        migrations.CreateModel(
+            name="SubmissionEvaluation",
+            fields=[
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "id",
+                    models.UUIDField(
+                        db_index=True,
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("is_archived", models.BooleanField(default=False)),
+                ("metadata", models.JSONField(blank=True, default=dict, null=True)),
+                ("field_name", models.CharField(max_length=100)),
+                (
+                    "value",
+                    models.JSONField(
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        null=True,
+                    ),
+                ),
+                ("evaluation_url", models.CharField(max_length=255)),
+                ("batch", models.BooleanField(default=False)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("succeeded", "Succeeded"),
+                            ("failed", "Failed"),
+                        ],
+                        db_index=True,
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                ("result", models.JSONField(blank=True, null=True)),
+                ("error", models.TextField(blank=True, default="")),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("claim", models.UUIDField(blank=True, editable=False, null=True)),
+                (
+                    "submission",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="evaluations",
+                        to="dynamic_forms.submission",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Submission Evaluation",
+                "verbose_name_plural": "Submission Evaluations",
+                "ordering": ("created_at",),
+                "get_latest_by": ("updated_at",),
+            },
+        ),
+    ]
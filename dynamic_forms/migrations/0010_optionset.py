@@ -0,0 +1,55 @@
+# Generated by Django 5.0.7 on 2026-10-19 13:28
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dynamic_forms", "0009_submission"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OptionSet",
+            fields=[
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "id",
+                    models.UUIDField(
+                        db_index=True,
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("slug", models.SlugField(blank=True, max_length=255, unique=True)),
+                ("is_archived", models.BooleanField(default=False)),
+                ("metadata", models.JSONField(blank=True, default=dict, null=True)),
+                ("name", models.CharField(max_length=100)),
+                ("options", models.JSONField(blank=True, default=list)),
+                ("version", models.PositiveIntegerField(default=1, editable=False)),
+            ],
+            options={
+                "verbose_name": "Option Set",
+                "verbose_name_plural": "Option Sets",
+                "ordering": ("name",),
+                "get_latest_by": ("updated_at",),
+            },
+        ),
+        migrations.AddField(
+            model_name="fieldproperty",
+            name="option_set",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="field_properties",
+                to="dynamic_forms.optionset",
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.7 on 2026-10-19 13:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dynamic_forms", "0010_optionset"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="field",
+            index=models.Index(
+                condition=models.Q(("is_archived", False)),
+                fields=["slug"],
+                name="field_active_slug_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="form",
+            index=models.Index(
+                condition=models.Q(("is_archived", False)),
+                fields=["slug"],
+                name="form_active_slug_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.0.7 on 2026-10-19 13:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dynamic_forms", "0011_active_slug_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Sequence",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+                ("last", models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Sequence",
+                "verbose_name_plural": "Sequences",
+            },
+        ),
+        migrations.AddField(
+            model_name="submission",
+            name="reference",
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name="submission",
+            constraint=models.UniqueConstraint(
+                fields=("form", "reference"), name="unique_submission_reference"
+            ),
+        ),
+    ]
@@ -0,0 +1,118 @@
+# Generated by Django 5.0.7 on 2026-10-19 13:36
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dynamic_forms", "0012_submission_reference"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Webhook",
+            fields=[
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "id",
+                    models.UUIDField(
+                        db_index=True,
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("is_archived", models.BooleanField(default=False)),
+                ("metadata", models.JSONField(blank=True, default=dict, null=True)),
+                ("url", models.URLField(max_length=255)),
+                ("secret", models.CharField(blank=True, default="", max_length=255)),
+                (
+                    "form",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="webhooks",
+                        to="dynamic_forms.form",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Webhook",
+                "verbose_name_plural": "Webhooks",
+                "ordering": ("created_at",),
+                "get_latest_by": ("updated_at",),
+            },
+        ),
+        migrations.CreateModel(
+            name="OutboxEvent",
+            fields=[
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "id",
+                    models.UUIDField(
+                        db_index=True,
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("is_archived", models.BooleanField(default=False)),
+                ("metadata", models.JSONField(blank=True, default=dict, null=True)),
+                ("event", models.CharField(max_length=100)),
+                (
+                    "payload",
+                    models.JSONField(
+                        default=dict,
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("delivering", "Delivering"),
+                            ("delivered", "Delivered"),
+                            ("dead", "Dead"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "next_attempt_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("error", models.TextField(blank=True, default="")),
+                ("claim", models.UUIDField(blank=True, editable=False, null=True)),
+                (
+                    "webhook",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="outbox_events",
+                        to="dynamic_forms.webhook",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Outbox Event",
+                "verbose_name_plural": "Outbox Events",
+                "ordering": ("created_at",),
+                "get_latest_by": ("updated_at",),
+                "indexes": [
+                    models.Index(
+                        fields=["status", "next_attempt_at"], name="outbox_due_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.0.7 on 2026-10-19 13:40
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dynamic_forms", "0013_webhook_outbox"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SubmissionSegment",
+            fields=[
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "id",
+                    models.UUIDField(
+                        db_index=True,
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("is_archived", models.BooleanField(default=False)),
+                ("metadata", models.JSONField(blank=True, default=dict, null=True)),
+                ("month", models.DateField()),
+                ("path", models.CharField(max_length=255, unique=True)),
+                ("count", models.PositiveIntegerField()),
+                ("size", models.PositiveBigIntegerField()),
+                ("index", models.JSONField(default=list)),
+            ],
+            options={
+                "verbose_name": "Submission Segment",
+                "verbose_name_plural": "Submission Segments",
+                "ordering": ("month", "created_at"),
+                "get_latest_by": ("created_at",),
+            },
+        ),
+        migrations.AddIndex(
+            model_name="submission",
+            index=models.Index(
+                fields=["form", "created_at"], name="submission_partition_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="submissionsegment",
+            name="form",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="segments",
+                to="dynamic_forms.form",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="submissionsegment",
+            index=models.Index(fields=["form", "month"], name="segment_partition_idx"),
+        ),
+    ]
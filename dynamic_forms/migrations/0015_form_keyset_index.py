@@ -0,0 +1,17 @@
+# Generated by Django 5.0.7 on 2026-10-19 13:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dynamic_forms", "0014_submission_segments"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="form",
+            index=models.Index(fields=["updated_at", "id"], name="form_keyset_idx"),
+        ),
+    ]
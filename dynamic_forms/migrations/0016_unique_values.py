@@ -0,0 +1,59 @@
+# Generated by Django 5.0.7 on 2026-10-19 13:44
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dynamic_forms", "0015_form_keyset_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UniqueValue",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("field_name", models.CharField(max_length=255)),
+                ("value_hash", models.CharField(max_length=64)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "form",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="dynamic_forms.form",
+                    ),
+                ),
+                (
+                    "submission",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="dynamic_forms.submission",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Unique Value",
+                "verbose_name_plural": "Unique Values",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="uniquevalue",
+            constraint=models.UniqueConstraint(
+                fields=("form", "field_name", "value_hash"), name="unique_field_value"
+            ),
+        ),
+    ]
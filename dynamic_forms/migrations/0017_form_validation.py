@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-19 13:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dynamic_forms", "0016_unique_values"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="form",
+            name="validation",
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
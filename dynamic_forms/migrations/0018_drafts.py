@@ -0,0 +1,57 @@
+# Generated by Django 5.0.7 on 2026-10-19 13:49
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dynamic_forms", "0017_form_validation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Draft",
+            fields=[
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "id",
+                    models.UUIDField(
+                        db_index=True,
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("is_archived", models.BooleanField(default=False)),
+                ("metadata", models.JSONField(blank=True, default=dict, null=True)),
+                ("owner", models.CharField(max_length=255)),
+                ("data", models.JSONField(default=dict)),
+                ("revision", models.PositiveIntegerField(default=0)),
+                (
+                    "form",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="drafts",
+                        to="dynamic_forms.form",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Draft",
+                "verbose_name_plural": "Drafts",
+                "ordering": ("-updated_at",),
+                "get_latest_by": ("updated_at",),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="draft",
+            constraint=models.UniqueConstraint(
+                fields=("form", "owner"), name="unique_draft_owner"
+            ),
+        ),
+    ]
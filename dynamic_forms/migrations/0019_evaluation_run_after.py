@@ -0,0 +1,19 @@
+# Generated by Django 5.0.7 on 2026-10-19 14:04
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dynamic_forms", "0018_drafts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="submissionevaluation",
+            name="run_after",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -1,10 +1,35 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
 from django.utils.text import slugify
 
 from base.models import BaseModel
+from dynamic_forms.managers import FormManager
 from django.utils.translation import gettext as _
 
-from dynamic_forms.choices import FormFieldChoices
+from dynamic_forms.choices import (
+    EvaluationStatusChoices,
+    FormFieldChoices,
+    OutboxStatusChoices,
+)
+
+
+def fields_to_save(instance, update_fields=None):
+    """
+    The fields ``save`` writes to the existing row of a versioned model.
+
+    ``version`` is left out: it only changes by ``F("version") + 1``, so a save
+    never puts back the version the instance was loaded with over a concurrent
+    bump, which would let two plans share a version.
+    """
+    if update_fields is None:
+        update_fields = [
+            field.name
+            for field in instance._meta.concrete_fields
+            if not field.primary_key
+        ]
+    return [name for name in update_fields if name != "version"]
 
 
 class Field(BaseModel):
@@ -27,11 +52,18 @@ class Field(BaseModel):
         get_latest_by = ("updated_at",)
         verbose_name_plural = _("Fields")
         verbose_name = _("Field")
+        indexes = [
+            models.Index(
+                fields=["slug"],
+                name="field_active_slug_idx",
+                condition=Q(is_archived=False),
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
-        return super().save()
+        return super().save(*args, **kwargs)
 
 
 class Form(BaseModel):
@@ -39,6 +71,11 @@ class Form(BaseModel):
     fields = models.ManyToManyField(
         "Field", through="FieldProperty", related_name="form_field_order"
     )
+    version = models.PositiveIntegerField(default=1, editable=False)
+    # Cross-field rules, see ``dynamic_forms.expressions``.
+    validation = models.JSONField(default=list, blank=True)
+
+    objects = FormManager()
 
     def __str__(self):
         return self.name
@@ -48,15 +85,56 @@ class Form(BaseModel):
         get_latest_by = ("updated_at",)
         verbose_name_plural = _("Form")
         verbose_name = _("Forms")
+        indexes = [
+            models.Index(
+                fields=["slug"],
+                name="form_active_slug_idx",
+                condition=Q(is_archived=False),
+            ),
+            # Keyset pagination of the "forms/" listing.
+            models.Index(fields=["updated_at", "id"], name="form_keyset_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
-        return super().save()
+        if self._state.adding:
+            return super().save(*args, **kwargs)
+        kwargs["update_fields"] = fields_to_save(self, kwargs.get("update_fields"))
+        return super().save(*args, **kwargs)
 
     def get_form_field_property(self):
-        if hasattr(self, "form_field_property"):
+        if "form_field_property" in getattr(self, "_prefetched_objects_cache", {}):
             return self.form_field_property.all()
+        if hasattr(self, "form_field_property"):
+            return self.form_field_property.select_related("field", "option_set")
+
+
+class OptionSet(BaseModel):
+    """
+    A list of options shared by the DROPDOWN and RADIO fields referencing it.
+    """
+
+    name = models.CharField(max_length=100)
+    options = models.JSONField(default=list, blank=True, null=False)
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        ordering = ("name",)
+        get_latest_by = ("updated_at",)
+        verbose_name_plural = _("Option Sets")
+        verbose_name = _("Option Set")
+
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = slugify(self.name)
+        if self._state.adding:
+            return super().save(*args, **kwargs)
+        kwargs["update_fields"] = fields_to_save(self, kwargs.get("update_fields"))
+        return super().save(*args, **kwargs)
 
 
 class FieldProperty(BaseModel):
@@ -69,8 +147,16 @@ class FieldProperty(BaseModel):
     required = models.BooleanField(default=False)
     validation = models.JSONField(default=list, blank=True, null=False)
     options = models.JSONField(default=list, blank=True, null=False)
+    option_set = models.ForeignKey(
+        OptionSet,
+        null=True,
+        blank=True,
+        on_delete=models.PROTECT,
+        related_name="field_properties",
+    )
     style = models.TextField(default="", blank=True, null=False)
     hidden = models.BooleanField(default=False, null=False)
+    conditions = models.JSONField(default=dict, blank=True, null=False)
     index = models.IntegerField(default=0, null=False)
 
     slug = None
@@ -101,3 +187,251 @@ class FieldProperty(BaseModel):
     @property
     def field_type(self):
         return self.field.field_type
+
+
+class Sequence(models.Model):
+    """
+    The last number handed out of a named sequence, allocated in blocks.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    last = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} ({self.last})"
+
+    class Meta:
+        verbose_name_plural = _("Sequences")
+        verbose_name = _("Sequence")
+
+
+class Submission(BaseModel):
+    form = models.ForeignKey(Form, on_delete=models.CASCADE, related_name="submissions")
+    form_version = models.PositiveIntegerField()
+    # Human readable number of the submission within its form, with gaps.
+    reference = models.PositiveBigIntegerField(null=True, blank=True, editable=False)
+    data = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+
+    slug = None
+
+    def __str__(self):
+        return f"{self.form} {self.created_at:%Y-%m-%d %H:%M}"
+
+    class Meta:
+        ordering = ("-created_at",)
+        get_latest_by = ("created_at",)
+        verbose_name_plural = _("Submissions")
+        verbose_name = _("Submission")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["form", "reference"], name="unique_submission_reference"
+            ),
+        ]
+        # Submissions are partitioned by form and month, see ``SubmissionSegment``.
+        indexes = [
+            models.Index(
+                fields=["form", "created_at"], name="submission_partition_idx"
+            ),
+        ]
+
+    @property
+    def evaluation_status(self):
+        return combined_evaluation_status(
+            evaluation.status for evaluation in self.evaluations.all()
+        )
+
+
+def combined_evaluation_status(statuses):
+    statuses = set(statuses)
+    for status in (
+        EvaluationStatusChoices.RUNNING,
+        EvaluationStatusChoices.PENDING,
+        EvaluationStatusChoices.FAILED,
+    ):
+        if status in statuses:
+            return status
+    return EvaluationStatusChoices.SUCCEEDED
+
+
+class SubmissionSegment(BaseModel):
+    """
+    Cold submissions of a form and month, moved out of the database into an
+    append only, compressed JSON lines file by ``manage.py compact_submissions``.
+
+    ``index`` lists ``[first_id, offset, length]`` for each block of the file,
+    its records being sorted by id.
+    """
+
+    form = models.ForeignKey(Form, on_delete=models.CASCADE, related_name="segments")
+    month = models.DateField()
+    path = models.CharField(max_length=255, unique=True)
+    count = models.PositiveIntegerField()
+    size = models.PositiveBigIntegerField()
+    index = models.JSONField(default=list)
+
+    slug = None
+
+    def __str__(self):
+        return f"{self.form} {self.month:%Y-%m} ({self.count})"
+
+    class Meta:
+        ordering = ("month", "created_at")
+        get_latest_by = ("created_at",)
+        verbose_name_plural = _("Submission Segments")
+        verbose_name = _("Submission Segment")
+        indexes = [
+            models.Index(fields=["form", "month"], name="segment_partition_idx"),
+        ]
+
+
+class UniqueValue(models.Model):
+    """
+    A value taken by a field with the "unique" rule, as the hash of its
+    normalized form, so uniqueness is enforced by the database constraint.
+
+    Values stay taken when their submission is deleted or compacted.
+    """
+
+    form = models.ForeignKey(Form, on_delete=models.CASCADE, related_name="+")
+    field_name = models.CharField(max_length=255)
+    value_hash = models.CharField(max_length=64)
+    submission = models.ForeignKey(
+        Submission, on_delete=models.SET_NULL, null=True, related_name="+"
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.form} {self.field_name} {self.value_hash[:12]}"
+
+    class Meta:
+        verbose_name_plural = _("Unique Values")
+        verbose_name = _("Unique Value")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["form", "field_name", "value_hash"],
+                name="unique_field_value",
+            ),
+        ]
+
+
+class Draft(BaseModel):
+    """
+    The last written state of a form being filled in by ``owner``, a user or
+    a session. Autosaves are buffered in the cache, see ``dynamic_forms.drafts``.
+    """
+
+    form = models.ForeignKey(Form, on_delete=models.CASCADE, related_name="drafts")
+    owner = models.CharField(max_length=255)
+    data = models.JSONField(default=dict)
+    revision = models.PositiveIntegerField(default=0)
+
+    slug = None
+
+    def __str__(self):
+        return f"{self.form} {self.owner} ({self.revision})"
+
+    class Meta:
+        ordering = ("-updated_at",)
+        get_latest_by = ("updated_at",)
+        verbose_name_plural = _("Drafts")
+        verbose_name = _("Draft")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["form", "owner"], name="unique_draft_owner"
+            ),
+        ]
+
+
+class SubmissionEvaluation(BaseModel):
+    """
+    A deferred call to the evaluation endpoint of a field, queued in the database.
+    """
+
+    submission = models.ForeignKey(
+        Submission, on_delete=models.CASCADE, related_name="evaluations"
+    )
+    field_name = models.CharField(max_length=100)
+    value = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    evaluation_url = models.CharField(max_length=255)
+    batch = models.BooleanField(default=False)
+    status = models.CharField(
+        max_length=20,
+        choices=EvaluationStatusChoices,
+        default=EvaluationStatusChoices.PENDING,
+        db_index=True,
+    )
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(default="", blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    claim = models.UUIDField(null=True, blank=True, editable=False)
+    # Pending jobs are not claimed before, to back off unreachable endpoints.
+    run_after = models.DateTimeField(default=timezone.now)
+
+    slug = None
+
+    def __str__(self):
+        return f"{self.field_name} ({self.status})"
+
+    class Meta:
+        ordering = ("created_at",)
+        get_latest_by = ("updated_at",)
+        verbose_name_plural = _("Submission Evaluations")
+        verbose_name = _("Submission Evaluation")
+
+
+class Webhook(BaseModel):
+    """
+    An endpoint every accepted submission of a form is posted to.
+    """
+
+    form = models.ForeignKey(Form, on_delete=models.CASCADE, related_name="webhooks")
+    url = models.URLField(max_length=255)
+    # Signs deliveries with an HMAC-SHA256 of the body when set.
+    secret = models.CharField(max_length=255, default="", blank=True)
+
+    slug = None
+
+    def __str__(self):
+        return self.url
+
+    class Meta:
+        ordering = ("created_at",)
+        get_latest_by = ("updated_at",)
+        verbose_name_plural = _("Webhooks")
+        verbose_name = _("Webhook")
+
+
+class OutboxEvent(BaseModel):
+    """
+    An event waiting to be delivered to a webhook, written in the transaction
+    that produced it.
+    """
+
+    webhook = models.ForeignKey(
+        Webhook, on_delete=models.CASCADE, related_name="outbox_events"
+    )
+    event = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    status = models.CharField(
+        max_length=20,
+        choices=OutboxStatusChoices,
+        default=OutboxStatusChoices.PENDING,
+    )
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(default="", blank=True)
+    claim = models.UUIDField(null=True, blank=True, editable=False)
+
+    slug = None
+
+    def __str__(self):
+        return f"{self.event} ({self.status})"
+
+    class Meta:
+        ordering = ("created_at",)
+        get_latest_by = ("updated_at",)
+        verbose_name_plural = _("Outbox Events")
+        verbose_name = _("Outbox Event")
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_due_idx"),
+        ]
@@ -0,0 +1,250 @@
+"""
+Delivery of accepted submissions to the webhooks of their form.
+
+Accepting a submission writes an ``OutboxEvent`` per webhook in the same
+transaction, so an event exists if and only if the submission was committed.
+``manage.py deliver_webhooks`` claims due events in batches and posts them to
+their webhook, several events per request::
+
+    POST <url>
+    {"events": [{"id": ..., "event": "submission.created", "created_at": ...,
+                 "data": {...}}]}
+
+Any 2xx answer delivers the whole batch. Other answers and network errors are
+retried with exponential backoff until ``WEBHOOK_MAX_ATTEMPTS``, after which
+the events are dead lettered for an operator to inspect and requeue.
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import threading
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from dynamic_forms.choices import OutboxStatusChoices
+from dynamic_forms.conf import get_setting
+from dynamic_forms.models import OutboxEvent, Webhook
+
+logger = logging.getLogger(__name__)
+
+SUBMISSION_CREATED = "submission.created"
+SIGNATURE_HEADER = "X-Webhook-Signature"
+
+_executor = None
+# One session per delivery thread keeps connections to each webhook alive.
+_sessions = threading.local()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=get_setting("WEBHOOK_CONCURRENCY"),
+            thread_name_prefix="dynamic-forms-webhook",
+        )
+    return _executor
+
+
+def get_session():
+    import requests
+
+    if not hasattr(_sessions, "session"):
+        _sessions.session = requests.Session()
+    return _sessions.session
+
+
+def queue_submission_events(submission, form_plan):
+    """
+    Writes a ``submission.created`` event for every webhook of the form.
+
+    Must be called in the transaction creating ``submission``.
+    """
+    webhook_ids = Webhook.objects.active().filter(form_id=form_plan.id)
+    payload = {
+        "id": submission.pk,
+        "reference": submission.reference,
+        "form": form_plan.slug,
+        "form_version": submission.form_version,
+        "created_at": submission.created_at,
+        "data": submission.data,
+    }
+    return OutboxEvent.objects.bulk_create(
+        OutboxEvent(webhook_id=webhook_id, event=SUBMISSION_CREATED, payload=payload)
+        for webhook_id in webhook_ids.values_list("pk", flat=True)
+    )
+
+
+def claim_events(limit):
+    """
+    Marks up to ``limit`` due events as being delivered and returns them.
+
+    Events are claimed with a conditional update, so concurrent workers never
+    deliver the same event. Events claimed for longer than
+    ``WEBHOOK_CLAIM_TIMEOUT`` are requeued first.
+    """
+    now = timezone.now()
+    OutboxEvent.objects.filter(
+        status=OutboxStatusChoices.DELIVERING,
+        updated_at__lt=now - timedelta(seconds=get_setting("WEBHOOK_CLAIM_TIMEOUT")),
+    ).update(status=OutboxStatusChoices.PENDING, updated_at=now)
+    ids = list(
+        OutboxEvent.objects.filter(
+            status=OutboxStatusChoices.PENDING, next_attempt_at__lte=now
+        )
+        .order_by("next_attempt_at")
+        .values_list("pk", flat=True)[:limit]
+    )
+    claim = uuid.uuid4()
+    OutboxEvent.objects.filter(pk__in=ids, status=OutboxStatusChoices.PENDING).update(
+        status=OutboxStatusChoices.DELIVERING,
+        claim=claim,
+        attempts=F("attempts") + 1,
+        updated_at=now,
+    )
+    return list(
+        OutboxEvent.objects.filter(claim=claim)
+        .select_related("webhook")
+        .order_by("created_at")
+    )
+
+
+def deliver_events(limit=1000):
+    """
+    Delivers due events, ``WEBHOOK_BATCH_SIZE`` per request and at most
+    ``WEBHOOK_CONCURRENCY`` requests at once.
+
+    Returns the number of events attempted.
+    """
+    events = claim_events(limit)
+    batches = []
+    size = get_setting("WEBHOOK_BATCH_SIZE")
+    by_webhook = defaultdict(list)
+    for event in events:
+        by_webhook[event.webhook].append(event)
+    for webhook, webhook_events in by_webhook.items():
+        for start in range(0, len(webhook_events), size):
+            batches.append((webhook, webhook_events[start : start + size]))
+
+    executor = get_executor()
+    for future in [
+        executor.submit(deliver_in_thread, webhook, batch) for webhook, batch in batches
+    ]:
+        try:
+            future.result()
+        except Exception:
+            # The events stay claimed and are requeued after WEBHOOK_CLAIM_TIMEOUT.
+            logger.exception("Delivering a batch of outbox events failed.")
+    return len(events)
+
+
+def deliver_in_thread(webhook, events):
+    close_old_connections()
+    try:
+        deliver(get_session(), webhook, events)
+    except Exception as e:
+        # One failing batch must not keep the others from being delivered.
+        logger.exception("Delivering %d events to %s failed.", len(events), webhook)
+        retry(events, f"{type(e).__name__}: {e}")
+    finally:
+        close_old_connections()
+
+
+def encode_events(events):
+    return json.dumps(
+        {
+            "events": [
+                {
+                    "id": event.pk,
+                    "event": event.event,
+                    "created_at": event.created_at,
+                    "data": event.payload,
+                }
+                for event in events
+            ]
+        },
+        cls=DjangoJSONEncoder,
+    ).encode()
+
+
+def deliver(session, webhook, events):
+    import requests
+
+    body = encode_events(events)
+    headers = {"Content-Type": "application/json"}
+    if webhook.secret:
+        signature = hmac.new(webhook.secret.encode(), body, hashlib.sha256)
+        headers[SIGNATURE_HEADER] = f"sha256={signature.hexdigest()}"
+    try:
+        response = session.post(
+            webhook.url,
+            data=body,
+            headers=headers,
+            timeout=get_setting("WEBHOOK_TIMEOUT"),
+        )
+    except requests.exceptions.RequestException as e:
+        return retry(events, str(e))
+    if not 200 <= response.status_code < 300:
+        return retry(events, f"HTTP {response.status_code}: {response.text[:500]}")
+    claimed(events).update(
+        status=OutboxStatusChoices.DELIVERED, error="", updated_at=timezone.now()
+    )
+
+
+def claimed(events):
+    """
+    The events among ``events`` still held by the claim they were delivered under.
+
+    Events requeued after ``WEBHOOK_CLAIM_TIMEOUT`` may have been claimed again,
+    and their status then belongs to the new delivery.
+    """
+    return OutboxEvent.objects.filter(
+        pk__in=[event.pk for event in events],
+        claim=events[0].claim,
+        status=OutboxStatusChoices.DELIVERING,
+    )
+
+
+def retry_delay(attempts):
+    delay = get_setting("WEBHOOK_RETRY_DELAY") * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, get_setting("WEBHOOK_MAX_RETRY_DELAY")))
+
+
+def retry(events, error):
+    """
+    Schedules the next attempt of undelivered events, or dead letters them.
+    """
+    now = timezone.now()
+    max_attempts = get_setting("WEBHOOK_MAX_ATTEMPTS")
+    by_attempts = defaultdict(list)
+    for event in events:
+        by_attempts[event.attempts].append(event)
+    for attempts, group in by_attempts.items():
+        if attempts >= max_attempts:
+            changes = {"status": OutboxStatusChoices.DEAD}
+        else:
+            changes = {
+                "status": OutboxStatusChoices.PENDING,
+                "next_attempt_at": now + retry_delay(attempts),
+            }
+        claimed(group).update(error=error, updated_at=now, **changes)
+
+
+def requeue_events(queryset):
+    """
+    Gives dead lettered events of ``queryset`` a new round of attempts.
+    """
+    return queryset.filter(status=OutboxStatusChoices.DEAD).update(
+        status=OutboxStatusChoices.PENDING,
+        attempts=0,
+        next_attempt_at=timezone.now(),
+        updated_at=timezone.now(),
+    )
@@ -0,0 +1,32 @@
+import io
+import re
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from dynamic_forms.renderers import FastJSONRenderer, orjson
+
+# Integers of 19 digits or more may not fit in the 64 bits orjson parses
+# them into exactly. Matches in strings too, which only costs the fallback.
+LONG_INTEGER = re.compile(rb"(?<![\d.eE+-])-?\d{19,}(?![\d.eE])")
+
+
+class FastJSONParser(JSONParser):
+    """
+    Parses JSON with orjson when it is installed, and like DRF otherwise.
+
+    Payloads holding integers orjson cannot represent exactly are left to DRF.
+    """
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        content = stream.read()
+        if LONG_INTEGER.search(content):
+            return super().parse(io.BytesIO(content), media_type, parser_context)
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
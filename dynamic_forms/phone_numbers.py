@@ -0,0 +1,46 @@
+"""
+Phone number fields, kept apart so only forms with PHONE_NUMBER fields import
+phonenumbers and phonenumber_field.
+"""
+
+from functools import lru_cache
+
+from phonenumber_field.phonenumber import PhoneNumber, to_python
+from phonenumber_field.serializerfields import (
+    PhoneNumberField as BasePhoneNumberField,
+)
+from phonenumbers.phonenumberutil import PhoneNumberFormat, format_number
+from rest_framework import serializers
+
+from dynamic_forms.conf import get_setting
+
+
+@lru_cache(maxsize=get_setting("PHONE_NUMBER_CACHE_SIZE"))
+def parse_phone_number(value, region):
+    """
+    Returns the phone number parsed from ``value`` and whether it is valid.
+
+    The result is shared between callers and must not be modified.
+    """
+    phone_number = to_python(value, region=region)
+    return phone_number, bool(phone_number) and phone_number.is_valid()
+
+
+@lru_cache(maxsize=get_setting("PHONE_NUMBER_CACHE_SIZE"))
+def format_phone_number(phone_number):
+    return format_number(phone_number, PhoneNumberFormat.INTERNATIONAL)
+
+
+class PhoneNumberField(BasePhoneNumberField):
+    """
+    ``PhoneNumberField`` parsing through a bounded LRU, as payloads repeat numbers.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, PhoneNumber):
+            return super().to_internal_value(data)
+        str_value = serializers.CharField.to_internal_value(self, data)
+        phone_number, is_valid = parse_phone_number(str_value, self.region)
+        if phone_number and not is_valid:
+            raise serializers.ValidationError(self.error_messages["invalid"])
+        return phone_number
@@ -0,0 +1,276 @@
+from dynamic_forms.choices import FormFieldChoices
+from dynamic_forms.conditions import build_condition_graph
+from dynamic_forms.expressions import build_cross_field_rules
+from dynamic_forms.rules import ITEM_RULES, ITEMS_RULE, parse_rules
+
+EXTERNAL_FIELD_TYPES = (
+    FormFieldChoices.EXTERNAL_VALIDATION_ENDPOINT,
+    FormFieldChoices.EXTERNAL_EVALUATION_ENDPOINT,
+)
+EXTERNAL_RULES = ("validation_url:", "evaluation_url:")
+# Rules of evaluation_url fields evaluated after the submission is accepted,
+# and sending the values of several submissions per call.
+DEFERRED_RULE = "deferred"
+BATCH_RULE = "batch"
+# Rule of fields whose value may only be submitted once per form.
+UNIQUE_RULE = "unique"
+# Field types whose validated values are converted for the output.
+OUTPUT_FIELD_TYPES = (FormFieldChoices.CURRENCY, FormFieldChoices.PHONE_NUMBER)
+
+# Part of every cache key holding a plan. Bump it whenever the shape of the
+# plan classes changes so workers never unpickle plans of another release.
+PLAN_FORMAT = 12
+
+
+class FieldPlan:
+    """
+    Everything ``DynamicSerializer`` needs to build one field, detached from the ORM.
+    """
+
+    def __init__(
+        self,
+        name,
+        label,
+        field_type,
+        required=False,
+        hidden=False,
+        index=0,
+        validation=None,
+        options=None,
+        nested=None,
+        conditions=None,
+        option_set=None,
+    ):
+        self.name = name
+        self.label = label
+        self.field_type = field_type
+        self.required = required
+        self.hidden = hidden
+        self.index = index
+        self.validation = list(validation or [])
+        self.rules = parse_rules(self.validation)
+        self.options = list(options or [])
+        self.option_members = frozenset(str(option) for option in self.options)
+        # Slug of the shared ``OptionSet`` replacing ``options``, looked up on use.
+        self.option_set = option_set
+        self.nested = nested
+        self.conditions = dict(conditions or {})
+
+    def __repr__(self):
+        return f"<FieldPlan {self.name} ({self.field_type})>"
+
+    @property
+    def evaluation_url(self):
+        for name, argument in self.rules:
+            if name == "evaluation_url":
+                return argument
+
+    @property
+    def is_deferred(self):
+        """
+        Whether the evaluation endpoint is called after the submission is stored.
+        """
+        return DEFERRED_RULE in self.validation and bool(self.evaluation_url)
+
+    @property
+    def array_options(self):
+        """
+        The ``ArrayField`` arguments given by the rules of an ARRAY field.
+
+        ``min_length`` and ``max_length`` bound the number of items, as
+        ``min_items`` and ``max_items`` do, and ``min_value`` and ``max_value``
+        bound each item, as ``item_min_value`` and ``item_max_value`` do.
+        """
+        options = {}
+        for name, argument in self.rules:
+            if name == ITEMS_RULE:
+                options["item_type"] = argument
+            elif name in ("min_value", "max_value"):
+                options[f"item_{name}"] = argument
+            elif name in ("min_length", "min_items"):
+                options["min_items"] = argument
+            elif name in ("max_length", "max_items"):
+                options["max_items"] = argument
+            elif name in ITEM_RULES:
+                options[name] = argument
+        return options
+
+    @property
+    def is_unique(self):
+        return any(name == UNIQUE_RULE for name, _argument in self.rules)
+
+    @property
+    def has_external_validation(self):
+        """
+        Whether validating the field calls an external endpoint synchronously.
+        """
+        rules = EXTERNAL_RULES[:1] if self.is_deferred else EXTERNAL_RULES
+        if any(str(rule).startswith(rules) for rule in self.validation):
+            return True
+        if self.field_type in EXTERNAL_FIELD_TYPES and not self.is_deferred:
+            return True
+        return self.nested is not None and self.nested.has_external_validation
+
+
+class OptionSetPlan:
+    """
+    A compiled option set: its options and their string forms as a frozenset.
+    """
+
+    def __init__(self, slug, name, version, options):
+        self.slug = slug
+        self.name = name
+        self.version = version
+        self.options = tuple(options)
+        self.members = frozenset(str(option) for option in self.options)
+
+    def __repr__(self):
+        return f"<OptionSetPlan {self.slug} v{self.version}>"
+
+    def __contains__(self, value):
+        return str(value) in self.members
+
+    def __len__(self):
+        return len(self.options)
+
+
+class FormPlan:
+    """
+    A compiled, picklable snapshot of a form and its nested forms.
+
+    Plans are keyed by ``Form.version`` so they can be shared between processes
+    through the cache without ever being invalidated in place.
+    """
+
+    def __init__(
+        self, id, slug, name, version, fields, admission=None, validation=None
+    ):
+        self.id = id
+        self.slug = slug
+        self.name = name
+        self.version = version
+        self.fields = fields
+        self.admission = dict(admission or {})
+        self.deferred_fields = [field for field in fields if field.is_deferred]
+        self.unique_fields = [field.name for field in fields if field.is_unique]
+        self.output_fields = [
+            (field.name, field.field_type)
+            for field in fields
+            if field.field_type in OUTPUT_FIELD_TYPES
+        ]
+        self.condition_graph = build_condition_graph(
+            [(field.name, field.conditions) for field in fields], strict=False
+        )
+        self.cross_field_rules = build_cross_field_rules(
+            validation,
+            {
+                field.name: (
+                    {nested.name for nested in field.nested}
+                    if field.nested is not None
+                    else None
+                )
+                for field in fields
+            },
+            strict=False,
+        )
+
+    def __repr__(self):
+        return f"<FormPlan {self.slug} v{self.version}>"
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __len__(self):
+        return len(self.fields)
+
+    @property
+    def has_external_validation(self):
+        return any(field.has_external_validation for field in self.fields)
+
+
+def compile_form_plan(form, _seen=None):
+    """
+    Loads ``form`` with its field properties and nested forms and compiles it.
+    """
+    seen = set(_seen or ())
+    seen.add(form.pk)
+    field_properties = form.form_field_property.select_related(
+        "field", "field__nested_form", "option_set"
+    ).order_by("index")
+    fields = []
+    for field_property in field_properties:
+        field = field_property.field
+        nested = None
+        if field.field_type == FormFieldChoices.NESTED and field.nested_form:
+            if field.nested_form.is_archived:
+                # Archived nested forms no longer apply to the forms nesting them.
+                continue
+            if field.nested_form.pk not in seen:
+                nested = compile_form_plan(field.nested_form, _seen=seen)
+        fields.append(
+            FieldPlan(
+                name=field.name,
+                label=field.label,
+                field_type=field.field_type,
+                required=field_property.required,
+                hidden=field_property.hidden,
+                index=field_property.index,
+                validation=field_property.validation,
+                options=field_property.options,
+                nested=nested,
+                conditions=field_property.conditions,
+                option_set=(
+                    field_property.option_set.slug
+                    if field_property.option_set
+                    else None
+                ),
+            )
+        )
+    return FormPlan(
+        id=form.pk,
+        slug=form.slug,
+        name=form.name,
+        version=form.version,
+        fields=fields,
+        admission=(form.metadata or {}).get("admission"),
+        validation=form.validation,
+    )
+
+
+def compile_admission(form):
+    """
+    Returns the admission limits set on ``form`` and whether validating it calls
+    an external endpoint, read a nesting level at a time without compiling it.
+    """
+    from dynamic_forms.models import FieldProperty
+
+    seen = set()
+    form_ids = {form.pk}
+    external_validation = False
+    while form_ids and not external_validation:
+        seen |= form_ids
+        rows = (
+            FieldProperty.objects.filter(form_id__in=form_ids)
+            .exclude(field__nested_form__is_archived=True)
+            .values_list("field__field_type", "validation", "field__nested_form_id")
+        )
+        form_ids = set()
+        for field_type, validation, nested_form_id in rows:
+            field = FieldPlan("", "", field_type, validation=validation)
+            external_validation = external_validation or field.has_external_validation
+            if field_type == FormFieldChoices.NESTED and nested_form_id not in seen:
+                form_ids.add(nested_form_id)
+        form_ids.discard(None)
+    return {
+        "limits": dict((form.metadata or {}).get("admission") or {}),
+        "external_validation": external_validation,
+    }
+
+
+def compile_option_set(option_set):
+    return OptionSetPlan(
+        slug=option_set.slug,
+        name=option_set.name,
+        version=option_set.version,
+        options=option_set.options,
+    )
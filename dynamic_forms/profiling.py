@@ -0,0 +1,122 @@
+"""
+Profiling of sampled requests to the form detail and submission endpoints.
+
+A request is profiled with ``cProfile`` when it is one of every
+``PROFILE_EVERY`` requests of the process, when its form is listed in
+``PROFILE_FORMS``, or when its ``X-Profile`` header holds ``PROFILE_TOKEN``.
+Profiles are written to ``PROFILE_DIR``, BASE_DIR/profiles by default, as
+``<name>.prof`` with a ``<name>.json`` of metadata, and only the last
+``PROFILE_MAX_FILES`` are kept. ``manage.py profile_report`` merges
+them into the hottest functions per form.
+"""
+
+import cProfile
+import functools
+import itertools
+import json
+import os
+import time
+from secrets import compare_digest
+
+from django.conf import settings
+
+from dynamic_forms.conf import get_setting
+
+PROFILE_HEADER = "X-Profile"
+
+_counter = itertools.count(1)
+
+
+def get_profile_dir():
+    return get_setting("PROFILE_DIR") or os.path.join(settings.BASE_DIR, "profiles")
+
+
+def should_profile(request, slug):
+    every = get_setting("PROFILE_EVERY")
+    if every and next(_counter) % every == 0:
+        return True
+    if slug in get_setting("PROFILE_FORMS"):
+        return True
+    token = get_setting("PROFILE_TOKEN")
+    header = request.headers.get(PROFILE_HEADER)
+    return bool(token and header and compare_digest(header, token))
+
+
+def profiled(endpoint):
+    """
+    Profiles the sampled calls of a view method taking the form ``slug``.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            slug = kwargs.get("slug")
+            if not should_profile(request, slug):
+                return method(self, request, *args, **kwargs)
+            profile = cProfile.Profile()
+            started_at = time.perf_counter()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiler is already running in this thread.
+                return method(self, request, *args, **kwargs)
+            try:
+                response = method(self, request, *args, **kwargs)
+            finally:
+                profile.disable()
+            save_profile(
+                profile,
+                {
+                    "endpoint": endpoint,
+                    "form": slug,
+                    "status": response.status_code,
+                    "payload_size": int(request.META.get("CONTENT_LENGTH") or 0),
+                    "duration": time.perf_counter() - started_at,
+                    "time": time.time(),
+                },
+            )
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def save_profile(profile, metadata):
+    directory = get_profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    # Names sort by time, which is the order profiles are rotated out in.
+    name = f"{time.time_ns()}-{os.getpid()}-{metadata['endpoint']}"
+    profile.dump_stats(os.path.join(directory, f"{name}.prof"))
+    with open(os.path.join(directory, f"{name}.json"), "w") as file:
+        json.dump(metadata, file)
+    rotate(directory, get_setting("PROFILE_MAX_FILES"))
+
+
+def rotate(directory, max_files):
+    names = sorted(
+        entry.name[: -len(".prof")]
+        for entry in os.scandir(directory)
+        if entry.name.endswith(".prof")
+    )
+    for name in names[: max(len(names) - max_files, 0)]:
+        for extension in (".prof", ".json"):
+            try:
+                os.remove(os.path.join(directory, name + extension))
+            except FileNotFoundError:
+                pass
+
+
+def read_profiles(directory):
+    """
+    Yields ``(path, metadata)`` for the profiles of ``directory``, oldest first.
+    """
+    for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+        if not entry.name.endswith(".prof"):
+            continue
+        try:
+            with open(entry.path[: -len(".prof")] + ".json") as file:
+                metadata = json.load(file)
+        except (FileNotFoundError, ValueError):
+            continue
+        yield entry.path, metadata
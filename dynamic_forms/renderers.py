@@ -0,0 +1,60 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z | orjson.OPT_SERIALIZE_NUMPY
+    if orjson
+    else 0
+)
+
+
+class JSONEncoder(encoders.JSONEncoder):
+    """
+    DRF's encoder, also encoding ``Money`` and ``PhoneNumber`` values.
+    """
+
+    def default(self, obj):
+        from djmoney.money import Money
+
+        if isinstance(obj, Money):
+            return {"amount": str(obj.amount), "currency": obj.currency.code}
+        # Checked by module so phonenumbers is not imported to encode anything.
+        if type(obj).__module__.startswith("phonenumber"):
+            return str(obj)
+        return super().default(obj)
+
+
+encode_default = JSONEncoder().default
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Renders JSON with orjson when it is installed, and like DRF otherwise.
+
+    Pretty printed output, as requested by the browsable API or an ``indent``
+    media type parameter, is left to DRF.
+    """
+
+    encoder_class = JSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if orjson is None or indent is not None or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+        try:
+            ret = orjson.dumps(data, default=encode_default, option=ORJSON_OPTIONS)
+        except TypeError:
+            # orjson.JSONEncodeError, raised on integers beyond 64 bits.
+            return super().render(data, accepted_media_type, renderer_context)
+        # Keep the output a strict javascript subset, as DRF does.
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028")
+            ret = ret.replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
@@ -0,0 +1,123 @@
+"""
+Routing of read only queries to read replicas.
+
+Reads only go to one of the ``READ_REPLICAS`` aliases inside ``use_replica()``,
+which wraps the read only paths: form details, schemas and option sets, the
+loading of forms compiled into plans and submission reads. Everything else,
+and every query of a request that writes or follows a write by the same client
+within ``REPLICA_STICKINESS`` seconds, uses the primary. Enable it with::
+
+    DATABASE_ROUTERS = ["dynamic_forms.routers.ReplicaRouter"]
+    MIDDLEWARE = [..., "dynamic_forms.routers.ReplicaPinningMiddleware"]
+    DYNAMIC_FORMS = {"READ_REPLICAS": ["replica"]}
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import DEFAULT_DB_ALIAS
+
+from dynamic_forms.conf import get_setting
+
+PIN_COOKIE = "dynamic_forms_pinned"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_read_only = ContextVar("dynamic_forms_read_only", default=False)
+_request_state = ContextVar("dynamic_forms_request_state", default=None)
+
+
+class RequestState:
+    """
+    Whether the current request must read from the primary, and whether it wrote.
+
+    Mutated in place, so the threads running sync code under ASGI share it.
+    """
+
+    def __init__(self, pinned):
+        self.pinned = pinned
+        self.wrote = False
+
+
+@contextmanager
+def use_replica():
+    """
+    Lets the queries of the block read from a replica. Usable as a decorator.
+    """
+    token = _read_only.set(True)
+    try:
+        yield
+    finally:
+        _read_only.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """
+    Reads from the primary within a ``use_replica()`` block.
+    """
+    token = _read_only.set(False)
+    try:
+        yield
+    finally:
+        _read_only.reset(token)
+
+
+def is_pinned():
+    state = _request_state.get()
+    return state is not None and state.pinned
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            # Relations are read from the database the instance came from, so a
+            # form and its fields are always loaded from the same snapshot.
+            return instance._state.db
+        replicas = get_setting("READ_REPLICAS")
+        if replicas and _read_only.get() and not is_pinned():
+            return random.choice(replicas)
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            # Later reads of the request must see this write.
+            state.pinned = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_setting("READ_REPLICAS")}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaPinningMiddleware:
+    """
+    Pins requests that may write, and the requests following a write by the
+    same client for ``REPLICA_STICKINESS`` seconds, to the primary.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RequestState(
+            pinned=request.method not in SAFE_METHODS or PIN_COOKIE in request.COOKIES
+        )
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        if state.wrote:
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=get_setting("REPLICA_STICKINESS"),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -0,0 +1,64 @@
+"""
+Parsing of the ``FieldProperty.validation`` rules.
+
+Rules are strings such as ``"min_length:5"`` or
+``"date_range:1980-01-01,2025-12-31"``. They are parsed once, when the form
+plan is compiled, into ``(name, argument)`` pairs shared by the server side
+validators of ``DynamicSerializer`` and the JSON Schema given to clients.
+"""
+
+import math
+import re
+
+LENGTH_RULES = ("min_length", "max_length")
+VALUE_RULES = ("min_value", "max_value")
+# Rules of ARRAY fields: the type of their items, bounds on their number, and
+# bounds applying to each item.
+ITEMS_RULE = "items"
+ITEM_TYPES = ("string", "int", "float", "date", "option")
+ITEM_COUNT_RULES = ("min_items", "max_items")
+ITEM_RULES = ("item_min_value", "item_max_value", "item_min_length", "item_max_length")
+RANGE_RULES = ("date_range", "time_range", "datetime_range")
+URL_RULES = ("validation_url", "evaluation_url")
+# Older spelling of "date_range", as the field type is stored.
+RULE_ALIASES = {"data_range": "date_range"}
+
+INTEGER_PATTERN = re.compile(r"\d+")
+
+
+def parse_rule(rule):
+    """
+    Returns ``(name, argument)`` for ``rule``, or ``None`` if it is malformed.
+
+    Lengths and values are integers, ranges a ``(start, end)`` pair of ISO
+    strings, URLs strings and flags such as ``"deferred"`` have no argument.
+    Bounds on the items of arrays may be negative or, for values, decimal.
+    """
+    name, _, argument = str(rule).partition(":")
+    name = RULE_ALIASES.get(name, name)
+    if name in LENGTH_RULES or name in VALUE_RULES or name in ITEM_COUNT_RULES:
+        if not INTEGER_PATTERN.fullmatch(argument):
+            return None
+        return name, int(argument)
+    if name in RANGE_RULES:
+        start, _, end = argument.partition(",")
+        if not start or not end:
+            return None
+        return name, (start, end)
+    if name in ITEM_RULES:
+        try:
+            value = float(argument)
+        except ValueError:
+            return None
+        if not math.isfinite(value):
+            return None
+        return name, int(value) if value.is_integer() else value
+    if name == ITEMS_RULE:
+        return (name, argument) if argument in ITEM_TYPES else None
+    if name in URL_RULES:
+        return (name, argument) if argument else None
+    return name, argument or None
+
+
+def parse_rules(validation):
+    return [rule for rule in map(parse_rule, validation or []) if rule is not None]
@@ -0,0 +1,209 @@
+"""
+JSON Schema of the payload of a form, for clients to validate before submitting.
+
+The schema is compiled from the parsed rules of the form plan, the ones the
+server validators are built from. Rules only the server can check, such as
+external validation endpoints, are left out.
+
+Date and time ranges use ``formatMinimum`` and ``formatMaximum``, which are not
+part of JSON Schema 2020-12 but an extension of ajv-formats. Validators that do
+not know them ignore them, and the server still checks the range.
+"""
+
+from dynamic_forms.choices import FormFieldChoices
+
+JSON_SCHEMA_DIALECT = "https://json-schema.org/draft/2020-12/schema"
+
+TIME_PATTERN = r"^\d{2}:\d{2}(:\d{2}(\.\d+)?)?$"
+DATE_TIME_PATTERN = r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?"
+
+STRING_FIELD_TYPES = (
+    FormFieldChoices.TEXT,
+    FormFieldChoices.PASSWORD,
+    FormFieldChoices.EXTERNAL_VALIDATION_ENDPOINT,
+    FormFieldChoices.EXTERNAL_EVALUATION_ENDPOINT,
+)
+NUMBER_FIELD_TYPES = (
+    FormFieldChoices.INTEGER,
+    FormFieldChoices.FLOAT,
+    FormFieldChoices.CURRENCY,
+)
+FIELD_TYPE_SCHEMAS = {
+    FormFieldChoices.EMAIL: {"type": "string", "format": "email", "minLength": 1},
+    FormFieldChoices.URL: {"type": "string", "format": "uri", "minLength": 1},
+    FormFieldChoices.UUID: {"type": "string", "format": "uuid"},
+    FormFieldChoices.CHECKBOX: {"type": "boolean"},
+    FormFieldChoices.INTEGER: {"type": "integer"},
+    FormFieldChoices.FLOAT: {"type": "number"},
+    FormFieldChoices.CURRENCY: {"type": ["number", "string"]},
+    FormFieldChoices.DATE: {"type": "string", "format": "date"},
+    FormFieldChoices.DATE_RANGE: {"type": "string", "format": "date"},
+    FormFieldChoices.TIME: {"type": "string", "pattern": TIME_PATTERN},
+    FormFieldChoices.DATE_TIME: {"type": "string", "pattern": DATE_TIME_PATTERN},
+    FormFieldChoices.DATE_TIME_RANGE: {
+        "type": "string",
+        "pattern": DATE_TIME_PATTERN,
+    },
+    FormFieldChoices.PHONE_NUMBER: {"type": "string", "minLength": 1},
+    FormFieldChoices.COUNTRY: {"type": "string", "minLength": 1},
+}
+ITEM_TYPE_SCHEMAS = {
+    "string": {"type": "string", "minLength": 1},
+    "int": {"type": "integer"},
+    "float": {"type": "number"},
+    "date": {"type": "string", "format": "date"},
+}
+ITEM_RULE_KEYWORDS = {
+    "item_min_value": "minimum",
+    "item_max_value": "maximum",
+    "item_min_length": "minLength",
+    "item_max_length": "maxLength",
+}
+
+
+def ref(key):
+    return {"$ref": f"#/$defs/{key}"}
+
+
+def option_set_ref(field, definitions):
+    """
+    References the option set of ``field``, defined when the schema is served.
+
+    Until then the definition holds the options of the field itself, which the
+    server falls back to when the option set is archived or deleted.
+    """
+    key = f"option-set-{field.option_set}"
+    definitions.setdefault(
+        key, {"enum": list(field.options)} if field.options else False
+    )
+    return ref(key)
+
+
+def field_schema(field, definitions):
+    if field.field_type == FormFieldChoices.NESTED:
+        if field.nested is None:
+            return {}
+        key = f"form-{field.nested.slug}"
+        if key not in definitions:
+            definitions[key] = {}
+            definitions[key] = object_schema(field.nested, definitions)
+        # A single object is accepted as a list of one.
+        return {
+            "title": field.label,
+            "anyOf": [{"type": "array", "items": ref(key)}, ref(key)],
+        }
+    if field.field_type in (FormFieldChoices.DROPDOWN, FormFieldChoices.RADIO):
+        if field.option_set:
+            # Filled in when the schema is served, option sets change on their own.
+            return {"title": field.label, **option_set_ref(field, definitions)}
+        return {"title": field.label, "enum": list(field.options)}
+
+    if field.field_type == FormFieldChoices.ARRAY:
+        return array_schema(field, definitions)
+
+    schema = {"title": field.label}
+    if field.field_type in STRING_FIELD_TYPES:
+        # DRF rejects blank strings unless told otherwise.
+        schema.update(type="string", minLength=1)
+    else:
+        schema.update(FIELD_TYPE_SCHEMAS.get(field.field_type, {}))
+    for name, argument in field.rules:
+        if name == "min_length":
+            # Blank strings stay invalid whatever the rule says.
+            schema["minLength"] = max(argument, schema.get("minLength", 0))
+        elif name == "max_length":
+            schema["maxLength"] = argument
+        elif name == "min_value" and field.field_type in NUMBER_FIELD_TYPES:
+            schema["minimum"] = argument
+        elif name == "max_value" and field.field_type in NUMBER_FIELD_TYPES:
+            schema["maximum"] = argument
+        elif name in ("date_range", "time_range", "datetime_range"):
+            schema["formatMinimum"], schema["formatMaximum"] = argument
+    return schema
+
+
+def array_schema(field, definitions):
+    options = field.array_options
+    item_type = options.get("item_type", "string")
+    if item_type == "option":
+        if field.option_set:
+            items = option_set_ref(field, definitions)
+        else:
+            items = {"enum": list(field.options)}
+    else:
+        items = dict(ITEM_TYPE_SCHEMAS[item_type])
+        for name, keyword in ITEM_RULE_KEYWORDS.items():
+            numeric = item_type in ("int", "float")
+            applies = numeric if "value" in name else item_type == "string"
+            if name in options and applies:
+                items[keyword] = options[name]
+    schema = {"title": field.label, "type": "array", "items": items}
+    if "min_items" in options:
+        schema["minItems"] = options["min_items"]
+    if "max_items" in options:
+        schema["maxItems"] = options["max_items"]
+    return schema
+
+
+def object_schema(form_plan, definitions):
+    """
+    The schema of the fields of ``form_plan``.
+
+    Fields with conditions are never required, whether they apply depends on
+    the rest of the payload.
+    """
+    properties = {}
+    required = []
+    for field in form_plan:
+        properties[field.name] = field_schema(field, definitions)
+        if field.required and not field.conditions:
+            required.append(field.name)
+    schema = {"type": "object", "title": form_plan.name, "properties": properties}
+    if required:
+        schema["required"] = required
+    return schema
+
+
+def option_sets_of(form_plan, _seen=None):
+    """
+    Returns the slugs of the option sets used by ``form_plan`` and its nested forms.
+    """
+    seen = set(_seen or ())
+    seen.add(form_plan.slug)
+    slugs = set()
+    for field in form_plan:
+        if field.option_set:
+            slugs.add(field.option_set)
+        if field.nested is not None and field.nested.slug not in seen:
+            slugs |= option_sets_of(field.nested, seen)
+    return slugs
+
+
+def compile_json_schema(form_plan):
+    """
+    Returns the JSON Schema of ``form_plan``, without its option sets.
+
+    ``add_option_sets`` completes it with the current version of each.
+    """
+    definitions = {}
+    schema = {"$schema": JSON_SCHEMA_DIALECT, **object_schema(form_plan, definitions)}
+    if definitions:
+        schema["$defs"] = definitions
+    return schema
+
+
+def add_option_sets(schema, option_sets):
+    """
+    Returns ``schema`` with a definition for each compiled option set.
+
+    Option sets missing from ``option_sets`` keep the definition they were
+    compiled with, so no reference dangles.
+    """
+    if not option_sets:
+        return schema
+    definitions = dict(schema.get("$defs", {}))
+    for option_set in option_sets:
+        definitions[f"option-set-{option_set.slug}"] = {
+            "enum": list(option_set.options)
+        }
+    return {**schema, "$defs": definitions}
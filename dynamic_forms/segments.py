@@ -0,0 +1,302 @@
+"""
+Cold storage of submissions in compressed segment files.
+
+Submissions are partitioned by form and month. Once a month ended more than
+``COLD_AFTER_DAYS`` ago, ``compact_partition`` moves its submissions, with the
+results of their evaluations, into a segment file and deletes them from the
+database. Submissions still waiting for an evaluation stay behind.
+
+A segment is a JSON lines file of submissions sorted by id, gzip compressed by
+blocks of ``SEGMENT_BLOCK_SIZE`` lines. The blocks are concatenated gzip
+members, so ``zcat`` reads the whole file, and ``SubmissionSegment.index``
+holds the offset of each block so a lookup by id decompresses a single one.
+Segments are never modified once written.
+"""
+
+import gzip
+import json
+import os
+import uuid
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from dynamic_forms.choices import EvaluationStatusChoices
+from dynamic_forms.conf import get_setting
+from dynamic_forms.models import (
+    Submission,
+    SubmissionSegment,
+    combined_evaluation_status,
+)
+
+UNFINISHED_STATUSES = (EvaluationStatusChoices.PENDING, EvaluationStatusChoices.RUNNING)
+
+
+def get_segment_root():
+    return get_setting("SEGMENT_ROOT") or os.path.join(settings.BASE_DIR, "segments")
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def next_month(month):
+    return month_start(month + timedelta(days=31))
+
+
+def encode_submission(submission):
+    """
+    Returns the record of ``submission``, as stored in segments.
+    """
+    record = {
+        "id": submission.pk,
+        "reference": submission.reference,
+        "form_version": submission.form_version,
+        "created_at": submission.created_at,
+        "updated_at": submission.updated_at,
+        "data": submission.data,
+        "metadata": submission.metadata,
+        "evaluations": [
+            {
+                "field_name": evaluation.field_name,
+                "status": evaluation.status,
+                "result": evaluation.result,
+                "error": evaluation.error,
+                "attempts": evaluation.attempts,
+                "updated_at": evaluation.updated_at,
+            }
+            for evaluation in submission.evaluations.all()
+        ],
+    }
+    return json.loads(json.dumps(record, cls=DjangoJSONEncoder))
+
+
+def write_segment(path, records, block_size):
+    """
+    Writes ``records``, sorted by id, to ``path`` and returns the block index.
+    """
+    index = []
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial_path = f"{path}.partial"
+    with open(partial_path, "wb") as file:
+        for start in range(0, len(records), block_size):
+            block = records[start : start + block_size]
+            content = gzip.compress(
+                b"".join(json.dumps(record).encode() + b"\n" for record in block),
+                mtime=0,
+            )
+            index.append([block[0]["id"], file.tell(), len(content)])
+            file.write(content)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(partial_path, path)
+    return index
+
+
+def read_block(path, offset, length):
+    with open(path, "rb") as file:
+        file.seek(offset)
+        content = gzip.decompress(file.read(length))
+    return [json.loads(line) for line in content.splitlines()]
+
+
+def iter_segment(segment):
+    path = os.path.join(get_segment_root(), segment.path)
+    with gzip.open(path, "rb") as file:
+        for line in file:
+            yield json.loads(line)
+
+
+@lru_cache(maxsize=1024)
+def get_segment_index(segment_id):
+    """
+    Returns the path and the first id of each block of a segment.
+
+    Segments never change, so their index is kept by each process.
+    """
+    path, index = SubmissionSegment.objects.values_list("path", "index").get(
+        pk=segment_id
+    )
+    return path, [block[0] for block in index], index
+
+
+def find_in_segment(segment_id, submission_id):
+    path, first_ids, index = get_segment_index(segment_id)
+    submission_id = str(submission_id)
+    position = bisect_right(first_ids, submission_id) - 1
+    if position < 0:
+        return None
+    _first_id, offset, length = index[position]
+    for record in read_block(os.path.join(get_segment_root(), path), offset, length):
+        if record["id"] == submission_id:
+            return record
+    return None
+
+
+class ColdEvaluation:
+    def __init__(self, record):
+        self.__dict__.update(record)
+
+
+class ColdSubmission:
+    """
+    A submission read from a segment, shaped like ``Submission`` for serializers.
+    """
+
+    def __init__(self, record, form):
+        self.__dict__.update(record)
+        self.pk = self.id
+        self.form = form
+        self.form_id = form.pk
+        self.evaluations = [
+            ColdEvaluation(evaluation) for evaluation in self.evaluations
+        ]
+
+    @property
+    def evaluation_status(self):
+        return combined_evaluation_status(
+            evaluation.status for evaluation in self.evaluations
+        )
+
+
+def find_cold_submission(form, submission_id):
+    """
+    Returns the submission ``submission_id`` of ``form`` from its segments.
+    """
+    segment_ids = SubmissionSegment.objects.filter(form=form).values_list(
+        "pk", flat=True
+    )
+    for segment_id in segment_ids:
+        record = find_in_segment(segment_id, submission_id)
+        if record is not None:
+            return ColdSubmission(record, form)
+    return None
+
+
+def cold_partitions(cutoff, form=None):
+    """
+    Returns the ``(form_id, month)`` partitions of months starting before
+    ``cutoff`` that still have submissions in the database.
+    """
+    queryset = Submission.objects.filter(created_at__lt=cutoff)
+    if form is not None:
+        queryset = queryset.filter(form=form)
+    partitions = (
+        queryset.annotate(month=TruncMonth("created_at"))
+        .values_list("form_id", "month")
+        .distinct()
+        .order_by("month")
+    )
+    return [(form_id, month_start(month)) for form_id, month in partitions]
+
+
+def month_datetime(month):
+    return timezone.make_aware(datetime.combine(month, time.min))
+
+
+def get_cutoff(days=None):
+    """
+    Returns the start of the oldest month ended less than ``days`` ago,
+    ``COLD_AFTER_DAYS`` by default.
+    """
+    if days is None:
+        days = get_setting("COLD_AFTER_DAYS")
+    return month_datetime(month_start(timezone.now() - timedelta(days=days)))
+
+
+def partition_queryset(form_id, month):
+    return Submission.objects.filter(
+        form_id=form_id,
+        created_at__gte=month_datetime(month),
+        created_at__lt=month_datetime(next_month(month)),
+    )
+
+
+def compact_partition(form_id, month):
+    """
+    Moves the finished submissions of a partition into new segments.
+
+    Returns the segments written. Files are written before the transaction
+    deleting the rows, and removed again if it fails, so a crash never loses
+    a submission; at worst it leaves an orphan file behind.
+    """
+    submissions = (
+        partition_queryset(form_id, month)
+        .exclude(evaluations__status__in=UNFINISHED_STATUSES)
+        .prefetch_related("evaluations")
+        .order_by("pk")
+    )
+    block_size = get_setting("SEGMENT_BLOCK_SIZE")
+    max_records = get_setting("SEGMENT_MAX_RECORDS")
+    segments = []
+    while True:
+        records = [
+            encode_submission(submission) for submission in submissions[:max_records]
+        ]
+        if not records:
+            return segments
+        relative_path = os.path.join(
+            str(form_id), f"{month:%Y-%m}", f"{uuid.uuid4()}.jsonl.gz"
+        )
+        path = os.path.join(get_segment_root(), relative_path)
+        index = write_segment(path, sorted(records, key=lambda r: r["id"]), block_size)
+        try:
+            with transaction.atomic():
+                segments.append(
+                    SubmissionSegment.objects.create(
+                        form_id=form_id,
+                        month=month,
+                        path=relative_path,
+                        count=len(records),
+                        size=os.path.getsize(path),
+                        index=index,
+                    )
+                )
+                Submission.objects.filter(
+                    pk__in=[record["id"] for record in records]
+                ).delete()
+        except Exception:
+            os.remove(path)
+            raise
+
+
+def iter_submissions(form, since=None, until=None):
+    """
+    Yields the records of the submissions of ``form``, hot and cold, month by
+    month and in order of creation within a month.
+
+    ``since`` and ``until`` are the first and the last month included.
+    """
+    segments = {}
+    for segment in SubmissionSegment.objects.filter(form=form):
+        segments.setdefault(segment.month, []).append(segment)
+    hot_months = {
+        month_start(month)
+        for month in Submission.objects.filter(form=form)
+        .annotate(month=TruncMonth("created_at"))
+        .values_list("month", flat=True)
+        .distinct()
+    }
+    for month in sorted(hot_months | set(segments)):
+        if (since and month < month_start(since)) or (
+            until and month > month_start(until)
+        ):
+            continue
+        records = [
+            record
+            for segment in segments.get(month, [])
+            for record in iter_segment(segment)
+        ]
+        records += [
+            encode_submission(submission)
+            for submission in partition_queryset(form.pk, month).prefetch_related(
+                "evaluations"
+            )
+        ]
+        yield from sorted(records, key=lambda record: record["created_at"])
@@ -0,0 +1,92 @@
+"""
+Gap tolerant, unique numbers allocated from the database in blocks.
+
+Each process reserves ``SEQUENCE_BLOCK_SIZE`` numbers of a sequence with one
+atomic UPDATE and hands them out from memory until the block is exhausted, so
+the sequence row is written once per block instead of once per number. Numbers
+are unique across processes and threads but not contiguous: the unused part of
+a block is lost when its process exits.
+"""
+
+import os
+import threading
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+
+from dynamic_forms.conf import get_setting
+from dynamic_forms.models import Sequence
+
+
+class Block:
+    def __init__(self, first, last):
+        self.next = first
+        self.last = last
+        # Blocks inherited by a forked process are shared with its parent.
+        self.pid = os.getpid()
+
+    @property
+    def exhausted(self):
+        return self.next > self.last or self.pid != os.getpid()
+
+    def take(self):
+        if self.exhausted:
+            return None
+        number = self.next
+        self.next += 1
+        return number
+
+
+_blocks = {}
+_blocks_lock = threading.Lock()
+
+
+def allocate_block(name, size):
+    """
+    Reserves the next ``size`` numbers of sequence ``name``.
+
+    Returns the first and the last number reserved.
+    """
+    with transaction.atomic():
+        if not Sequence.objects.filter(name=name).update(last=F("last") + size):
+            try:
+                with transaction.atomic():
+                    Sequence.objects.create(name=name, last=size)
+            except IntegrityError:
+                Sequence.objects.filter(name=name).update(last=F("last") + size)
+        last = Sequence.objects.values_list("last", flat=True).get(name=name)
+    return last - size + 1, last
+
+
+def next_number(name, block_size=None):
+    """
+    Returns the next number of sequence ``name``, reserving a block if needed.
+
+    Inside a transaction, a new block is only shared with other callers once
+    the transaction commits: a rollback would release its numbers in the
+    database, which must not be handed out again from memory.
+    """
+    with _blocks_lock:
+        block = _blocks.get(name)
+        number = block.take() if block is not None else None
+        if number is not None:
+            return number
+        size = block_size or get_setting("SEQUENCE_BLOCK_SIZE")
+        block = Block(*allocate_block(name, size))
+        number = block.take()
+        if connection.in_atomic_block:
+            transaction.on_commit(lambda: publish_block(name, block))
+        else:
+            _blocks[name] = block
+        return number
+
+
+def publish_block(name, block):
+    with _blocks_lock:
+        current = _blocks.get(name)
+        if current is None or current.exhausted:
+            _blocks[name] = block
+
+
+def submission_reference(form_id):
+    return next_number(f"submission:{form_id}")
@@ -1,5 +1,11 @@
 from rest_framework import serializers
-from dynamic_forms.models import Form, Field, FieldProperty
+from dynamic_forms.models import (
+    Form,
+    Field,
+    FieldProperty,
+    Submission,
+    SubmissionEvaluation,
+)
 
 
 class FieldSerializer(serializers.ModelSerializer):
@@ -10,6 +16,7 @@ class FieldSerializer(serializers.ModelSerializer):
 
 class FormFieldPropertiesSerializer(serializers.ModelSerializer):
     nested_form = serializers.SerializerMethodField()
+    option_set = serializers.SlugRelatedField(slug_field="slug", read_only=True)
 
     class Meta:
         model = FieldProperty
@@ -18,18 +25,29 @@ class FormFieldPropertiesSerializer(serializers.ModelSerializer):
             "field_type",
             "label",
             "options",
+            "option_set",
             "required",
             "validation",
             "style",
             "hidden",
+            "conditions",
             "index",
             "nested_form",
         ]
 
     def get_nested_form(self, obj):
-        nest = obj.field.nested_form
-        if nest:
-            return FormSerializer(nest).data
+        nested_id = obj.field.nested_form_id
+        if nested_id is None:
+            return None
+        # Forms nested more than once are rendered once, and taken from the
+        # forms already loaded in ``context["forms"]`` when given.
+        rendered = self.context.get("rendered_forms")
+        if rendered is None:
+            return FormSerializer(obj.field.nested_form).data
+        if nested_id not in rendered:
+            nest = self.context.get("forms", {}).get(nested_id) or obj.field.nested_form
+            rendered[nested_id] = FormSerializer(nest, context=self.context).data
+        return rendered[nested_id]
 
 
 class FormSerializer(serializers.ModelSerializer):
@@ -37,4 +55,76 @@ class FormSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Form
-        fields = ["id", "name", "slug", "fields"]
+        fields = ["id", "name", "slug", "fields", "validation"]
+
+
+class FormListSerializer(serializers.ModelSerializer):
+    """
+    Summary of a form in listings, restricted to the ``only`` fields if given.
+    """
+
+    class Meta:
+        model = Form
+        fields = ["id", "slug", "name", "version", "is_archived", "updated_at"]
+
+    def __init__(self, *args, only=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if only is not None:
+            for name in set(self.fields) - set(only):
+                self.fields.pop(name)
+
+
+class OptionSetSerializer(serializers.Serializer):
+    slug = serializers.CharField()
+    name = serializers.CharField()
+    version = serializers.IntegerField()
+    options = serializers.ListField()
+
+
+class PartialValidationSerializer(serializers.Serializer):
+    data = serializers.DictField()
+    previous = serializers.DictField(required=False)
+
+    def get_changed_data(self):
+        """
+        Returns the submitted values that differ from ``previous``, if given.
+        """
+        data = self.validated_data["data"]
+        previous = self.validated_data.get("previous")
+        if previous is None:
+            return data
+        return {
+            name: value
+            for name, value in data.items()
+            if name not in previous or previous[name] != value
+        }
+
+
+class DraftSerializer(serializers.Serializer):
+    data = serializers.DictField()
+
+
+class SubmissionEvaluationSerializer(serializers.ModelSerializer):
+    field = serializers.CharField(source="field_name")
+
+    class Meta:
+        model = SubmissionEvaluation
+        fields = ["field", "status", "result", "error", "attempts", "updated_at"]
+
+
+class SubmissionSerializer(serializers.ModelSerializer):
+    form = serializers.SlugRelatedField(slug_field="slug", read_only=True)
+    status = serializers.CharField(source="evaluation_status")
+    evaluations = SubmissionEvaluationSerializer(many=True)
+
+    class Meta:
+        model = Submission
+        fields = [
+            "id",
+            "reference",
+            "form",
+            "form_version",
+            "created_at",
+            "status",
+            "evaluations",
+        ]
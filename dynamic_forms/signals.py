@@ -0,0 +1,48 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from dynamic_forms.cache import bump_form_versions, bump_versions, forget, forget_form
+from dynamic_forms.models import Field, FieldProperty, Form, OptionSet
+
+
+def refresh_version(instance):
+    # Keeps the instance showing the version its save was bumped to.
+    instance.version = (
+        type(instance).objects.values_list("version", flat=True).get(pk=instance.pk)
+    )
+
+
+@receiver(post_save, sender=Form)
+def form_saved(sender, instance, **kwargs):
+    bump_form_versions([instance.pk])
+    refresh_version(instance)
+
+
+@receiver(post_delete, sender=Form)
+def form_deleted(sender, instance, **kwargs):
+    forget_form(instance.slug)
+
+
+@receiver(post_save, sender=Field)
+def field_saved(sender, instance, **kwargs):
+    bump_form_versions(
+        FieldProperty.objects.filter(field=instance).values_list("form_id", flat=True)
+    )
+
+
+@receiver(post_save, sender=FieldProperty)
+@receiver(post_delete, sender=FieldProperty)
+def field_property_changed(sender, instance, **kwargs):
+    bump_form_versions([instance.form_id])
+
+
+@receiver(post_save, sender=OptionSet)
+def option_set_saved(sender, instance, **kwargs):
+    # Forms only refer to the option set by slug, so their plans stay valid.
+    bump_versions(OptionSet, [instance.pk])
+    refresh_version(instance)
+
+
+@receiver(post_delete, sender=OptionSet)
+def option_set_deleted(sender, instance, **kwargs):
+    forget(OptionSet, instance.slug)
@@ -0,0 +1,74 @@
+import threading
+
+from django.core.cache import caches
+from django.db import connections
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from dynamic_forms.cache import local_cache
+from dynamic_forms.models import Field, FieldProperty
+
+# Tests never share the plans cached by a development server.
+TEST_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "dynamic_forms": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "dynamic_forms-tests",
+    },
+}
+
+
+class IsolatedCacheMixin:
+    def setUp(self):
+        super().setUp()
+        # Tests overriding ``DYNAMIC_FORMS`` fall back to the default cache.
+        for cache in caches.all():
+            cache.clear()
+        local_cache.clear()
+
+
+@override_settings(CACHES=TEST_CACHES)
+class FormsTestCase(IsolatedCacheMixin, TestCase):
+    pass
+
+
+@override_settings(CACHES=TEST_CACHES)
+class FormsTransactionTestCase(IsolatedCacheMixin, TransactionTestCase):
+    pass
+
+
+def add_field(form, name, field_type, nested_form=None, **kwargs):
+    """
+    Adds a field ``name`` to ``form`` and returns its ``FieldProperty``.
+    """
+    field = Field.objects.create(
+        name=name, label=name.title(), field_type=field_type, nested_form=nested_form
+    )
+    return FieldProperty.objects.create(form=form, field=field, **kwargs)
+
+
+def run_concurrently(function, threads):
+    """
+    Calls ``function`` from ``threads`` threads released at once, each with its
+    own database connection, and returns their results.
+    """
+    barrier = threading.Barrier(threads)
+    results = [None] * threads
+    errors = []
+
+    def target(index):
+        try:
+            barrier.wait()
+            results[index] = function()
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connections.close_all()
+
+    workers = [threading.Thread(target=target, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    if errors:
+        raise errors[0]
+    return results
@@ -0,0 +1,100 @@
+import threading
+import time
+
+from django.db import transaction
+
+from dynamic_forms.cache import (
+    form_version_key,
+    get_cache,
+    get_form_plan,
+    get_versioned,
+    local_cache,
+)
+from dynamic_forms.choices import FormFieldChoices
+from dynamic_forms.models import Form
+from dynamic_forms.tests.base import (
+    FormsTestCase,
+    FormsTransactionTestCase,
+    add_field,
+    run_concurrently,
+)
+
+
+class VersionTests(FormsTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.child = Form.objects.create(name="Child")
+            self.parent = Form.objects.create(name="Parent")
+            add_field(self.child, "name", FormFieldChoices.TEXT)
+            add_field(
+                self.parent, "child", FormFieldChoices.NESTED, nested_form=self.child
+            )
+
+    def version_of(self, form):
+        return Form.objects.values_list("version", flat=True).get(pk=form.pk)
+
+    def test_editing_a_nested_form_bumps_its_parents(self):
+        child_version = self.version_of(self.child)
+        parent_version = self.version_of(self.parent)
+        with self.captureOnCommitCallbacks(execute=True):
+            add_field(self.child, "age", FormFieldChoices.INTEGER)
+        self.assertEqual(self.version_of(self.child), child_version + 1)
+        self.assertEqual(self.version_of(self.parent), parent_version + 1)
+
+    def test_versions_are_published_on_commit(self):
+        key = form_version_key(self.child.slug)
+        version = self.version_of(self.child)
+        with self.captureOnCommitCallbacks() as callbacks:
+            add_field(self.child, "age", FormFieldChoices.INTEGER)
+        self.assertEqual(get_cache().get(key), version)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(get_cache().get(key), version + 1)
+
+    def test_rolled_back_edits_publish_nothing(self):
+        key = form_version_key(self.child.slug)
+        version = self.version_of(self.child)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    add_field(self.child, "age", FormFieldChoices.INTEGER)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.version_of(self.child), version)
+        self.assertEqual(get_cache().get(key), version)
+
+    def test_plans_are_rebuilt_after_an_edit(self):
+        plan = get_form_plan(self.parent.slug)
+        self.assertIs(get_form_plan(self.parent.slug), plan)
+        with self.captureOnCommitCallbacks(execute=True):
+            add_field(self.child, "age", FormFieldChoices.INTEGER)
+        rebuilt = get_form_plan(self.parent.slug)
+        self.assertEqual(rebuilt.version, plan.version + 1)
+        nested = rebuilt.fields[0].nested
+        self.assertEqual([field.name for field in nested.fields], ["name", "age"])
+
+
+class SingleFlightTests(FormsTransactionTestCase):
+    def test_concurrent_misses_build_once(self):
+        form = Form.objects.create(name="Busy")
+        calls = []
+        calls_lock = threading.Lock()
+
+        def builder(form):
+            with calls_lock:
+                calls.append(form.pk)
+            time.sleep(0.2)
+            return {"built": form.pk}
+
+        def lookup():
+            return get_versioned("test", form.slug, builder)
+
+        results = run_concurrently(lookup, 8)
+        self.assertEqual(calls, [form.pk])
+        self.assertEqual(results, [{"built": form.pk}] * 8)
+        local_cache.clear()
+        self.assertEqual(lookup(), {"built": form.pk})
+        self.assertEqual(calls, [form.pk])
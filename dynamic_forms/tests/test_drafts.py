@@ -0,0 +1,106 @@
+import time
+from unittest import mock
+
+from django.test import override_settings
+
+from dynamic_forms import drafts
+from dynamic_forms.drafts import discard_draft, flush_drafts, get_draft, save_draft
+from dynamic_forms.models import Draft, Form
+from dynamic_forms.tests.base import (
+    FormsTestCase,
+    FormsTransactionTestCase,
+    run_concurrently,
+)
+
+DRAFT_SETTINGS = {"DRAFT_FLUSH_INTERVAL": 30}
+
+
+@override_settings(DYNAMIC_FORMS=DRAFT_SETTINGS)
+@mock.patch("dynamic_forms.drafts.time")
+class DraftTests(FormsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.form = Form.objects.create(name="Long")
+
+    def save(self, time, at, data, replace=False):
+        time.time.return_value = at
+        return save_draft(self.form.pk, "user:1", data, replace=replace)
+
+    def test_autosaves_are_coalesced_in_the_cache(self, time):
+        for second, name in enumerate("abcde"):
+            draft = self.save(time, 1000 + second, {name: second})
+        self.assertEqual(draft["revision"], 5)
+        self.assertEqual(draft["data"], {"a": 0, "b": 1, "c": 2, "d": 3, "e": 4})
+        self.assertFalse(Draft.objects.exists())
+        self.assertEqual(get_draft(self.form.pk, "user:1"), draft)
+        # Logged once, when it first went unwritten.
+        self.assertEqual(flush_drafts(), 1)
+
+    def test_replacing_a_draft(self, time):
+        self.save(time, 1000, {"a": 1})
+        draft = self.save(time, 1001, {"b": 2}, replace=True)
+        self.assertEqual(draft["data"], {"b": 2})
+
+    def test_draft_is_written_once_its_oldest_change_is_due(self, time):
+        self.save(time, 1000, {"a": 1})
+        self.save(time, 1029, {"b": 2})
+        self.assertFalse(Draft.objects.exists())
+        self.save(time, 1030, {"c": 3})
+        draft = Draft.objects.get()
+        self.assertEqual(draft.revision, 3)
+        self.assertEqual(draft.data, {"a": 1, "b": 2, "c": 3})
+        # The interval starts over from the next change.
+        self.save(time, 1031, {"d": 4})
+        self.assertEqual(Draft.objects.get().revision, 3)
+        self.save(time, 1061, {"e": 5})
+        self.assertEqual(Draft.objects.get().revision, 5)
+
+    def test_flush_writes_unwritten_drafts_once(self, time):
+        self.save(time, 1000, {"a": 1})
+        save_draft(self.form.pk, "user:2", {"b": 2})
+        self.assertEqual(flush_drafts(), 2)
+        self.assertEqual(
+            dict(Draft.objects.values_list("owner", "data")),
+            {"user:1": {"a": 1}, "user:2": {"b": 2}},
+        )
+        self.assertEqual(flush_drafts(), 0)
+        self.save(time, 1001, {"c": 3})
+        self.assertEqual(flush_drafts(), 1)
+        self.assertEqual(Draft.objects.get(owner="user:1").revision, 2)
+
+    def test_flushed_drafts_outlive_the_cache(self, time):
+        self.save(time, 1000, {"a": 1})
+        flush_drafts()
+        drafts.get_cache().clear()
+        draft = get_draft(self.form.pk, "user:1")
+        self.assertEqual((draft["data"], draft["revision"]), ({"a": 1}, 1))
+        self.assertEqual(self.save(time, 1001, {"b": 2})["revision"], 2)
+
+    def test_discarded_drafts_are_gone(self, time):
+        self.save(time, 1000, {"a": 1})
+        flush_drafts()
+        discard_draft(self.form.pk, "user:1")
+        self.assertFalse(Draft.objects.exists())
+        self.assertEqual(get_draft(self.form.pk, "user:1")["revision"], 0)
+
+
+class ConcurrentDraftTests(FormsTransactionTestCase):
+    def test_concurrent_autosaves_are_all_merged(self):
+        form = Form.objects.create(name="Long")
+        names = iter(range(8))
+
+        def slow_get_draft(*args):
+            # Widens the window between reading and writing the draft.
+            draft = get_draft(*args)
+            time.sleep(0.02)
+            return draft
+
+        def autosave():
+            name = f"field_{next(names)}"
+            return save_draft(form.pk, "user:1", {name: name})
+
+        with mock.patch("dynamic_forms.drafts.get_draft", side_effect=slow_get_draft):
+            run_concurrently(autosave, 8)
+        draft = get_draft(form.pk, "user:1")
+        self.assertEqual(draft["revision"], 8)
+        self.assertEqual(len(draft["data"]), 8)
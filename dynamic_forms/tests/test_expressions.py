@@ -0,0 +1,146 @@
+import json
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from dynamic_forms.cache import get_form_plan
+from dynamic_forms.choices import FormFieldChoices
+from dynamic_forms.expressions import (
+    build_cross_field_rules,
+    compile_expression,
+    parse_expression,
+)
+from dynamic_forms.models import Field, Form
+from dynamic_forms.tests.base import FormsTestCase, add_field
+
+
+class CrossFieldRuleTests(FormsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.rows = Form.objects.create(name="Rows")
+        add_field(self.rows, "amount", FormFieldChoices.INTEGER)
+        self.form = Form.objects.create(
+            name="Budget",
+            validation=[
+                {"rule": "sum(rows.amount) == total", "field": "total"},
+                {"rule": "total <= limit", "field": "total"},
+            ],
+        )
+        add_field(self.form, "total", FormFieldChoices.INTEGER)
+        self.limit = add_field(self.form, "limit", FormFieldChoices.INTEGER, index=1)
+        add_field(
+            self.form, "rows", FormFieldChoices.NESTED, nested_form=self.rows, index=2
+        )
+
+    def submit(self, data):
+        url = reverse("form_submission", kwargs={"slug": self.form.slug})
+        return self.client.post(url, data, content_type="application/json")
+
+    def test_rules_are_checked_on_submit(self):
+        response = self.submit({"total": 5, "limit": 4, "rows": [{"amount": 5}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("total", response.json())
+
+    def test_rules_naming_a_deleted_field_are_dropped(self):
+        self.limit.delete()
+        with self.assertLogs("dynamic_forms.expressions", "WARNING"):
+            plan = get_form_plan(self.form.slug)
+        self.assertEqual(len(plan.cross_field_rules.rules), 1)
+        response = self.submit({"total": 5, "rows": [{"amount": 5}]})
+        self.assertEqual(response.status_code, 200)
+
+    def test_rules_naming_an_archived_nested_form_are_dropped(self):
+        self.rows.is_archived = True
+        self.rows.save()
+        with self.assertLogs("dynamic_forms.expressions", "WARNING"):
+            plan = get_form_plan(self.form.slug)
+        self.assertEqual(len(plan.cross_field_rules.rules), 1)
+        response = self.submit({"total": 5, "limit": 4})
+        self.assertEqual(response.status_code, 400)
+
+    def test_strict_rules_reject_unknown_fields(self):
+        with self.assertRaisesMessage(ValueError, "unknown field limit"):
+            build_cross_field_rules([{"rule": "total <= limit"}], {"total": None})
+
+
+class AdminCrossFieldRuleTests(FormsTestCase):
+    def setUp(self):
+        super().setUp()
+        user = User.objects.create_superuser("admin", "admin@example.com", "secret")
+        self.client.force_login(user)
+        self.total = Field.objects.create(
+            name="total", label="Total", field_type=FormFieldChoices.INTEGER
+        )
+        self.limit = Field.objects.create(
+            name="limit", label="Limit", field_type=FormFieldChoices.INTEGER
+        )
+
+    def post(self, url, validation, properties):
+        data = {
+            "name": "Budget",
+            "validation": json.dumps(validation),
+            "form_field_property-TOTAL_FORMS": len(properties),
+            "form_field_property-INITIAL_FORMS": 0,
+            "webhooks-TOTAL_FORMS": 0,
+            "webhooks-INITIAL_FORMS": 0,
+        }
+        for i, field in enumerate(properties):
+            prefix = f"form_field_property-{i}"
+            data.update(
+                {
+                    f"{prefix}-field": field.pk,
+                    f"{prefix}-index": i,
+                    f"{prefix}-conditions": "{}",
+                    f"{prefix}-validation": "[]",
+                    f"{prefix}-options": "[]",
+                }
+            )
+        return self.client.post(url, data)
+
+    def test_new_form_rules_are_checked_against_its_new_fields(self):
+        url = reverse("admin:dynamic_forms_form_add")
+        response = self.post(
+            url, [{"rule": "total <= limit"}], [self.total, self.limit]
+        )
+        self.assertEqual(response.status_code, 302)
+        form = Form.objects.get(name="Budget")
+        self.assertEqual(form.validation, [{"rule": "total <= limit"}])
+        self.assertEqual(form.form_field_property.count(), 2)
+
+    def test_rules_naming_unknown_fields_are_rejected(self):
+        url = reverse("admin:dynamic_forms_form_add")
+        response = self.post(url, [{"rule": "total <= limit"}], [self.total])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "unknown field limit")
+        self.assertFalse(Form.objects.filter(name="Budget").exists())
+
+    def test_invalid_rules_are_rejected(self):
+        url = reverse("admin:dynamic_forms_form_add")
+        response = self.post(url, [{"rule": "total <="}], [self.total])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Invalid rule")
+
+
+class ExpressionTests(SimpleTestCase):
+    def evaluate(self, source, **data):
+        return compile_expression(parse_expression(source))(data)
+
+    def test_arithmetic(self):
+        self.assertEqual(self.evaluate("a % 3 + b * 2", a=7, b=1.5), 4)
+        self.assertEqual(self.evaluate("a % b", a=Decimal("7.5"), b=2), 1.5)
+
+    def test_strings_cannot_be_formatted_or_repeated(self):
+        with self.assertRaises(TypeError):
+            self.evaluate("a % b", a="%999999999d", b=1)
+        with self.assertRaises(TypeError):
+            self.evaluate("a * b", a="x", b=10**9)
+
+    def test_failing_operations_do_not_satisfy_the_rule(self):
+        rules = build_cross_field_rules(
+            [{"rule": "a % b == 0", "field": "a"}], {"a": None, "b": None}
+        )
+        self.assertEqual(
+            rules.errors({"a": "%s", "b": "x"}), {"a": ["Does not satisfy a % b == 0."]}
+        )
@@ -0,0 +1,81 @@
+from datetime import date
+
+from django.test import SimpleTestCase
+from rest_framework import serializers
+
+from dynamic_forms.benchmarks import benchmark_arrays
+from dynamic_forms.fields import MAX_INT, ArrayField
+
+
+class ArrayFieldTests(SimpleTestCase):
+    def validate(self, data, **kwargs):
+        return ArrayField(**kwargs).run_validation(data)
+
+    def errors(self, data, **kwargs):
+        with self.assertRaises(serializers.ValidationError) as raised:
+            self.validate(data, **kwargs)
+        return raised.exception.detail
+
+    def test_typed_arrays(self):
+        self.assertEqual(self.validate([1, 2, 3], item_type="int"), [1, 2, 3])
+        self.assertEqual(self.validate([1, 2.5], item_type="float"), [1.0, 2.5])
+        self.assertEqual(self.validate(["1", 2.0], item_type="int"), [1, 2])
+        self.assertEqual(self.validate([" a ", 1], item_type="string"), ["a", "1"])
+        self.assertEqual(
+            self.validate(["2024-01-31"], item_type="date"), [date(2024, 1, 31)]
+        )
+        self.assertEqual(self.validate([], item_type="int"), [])
+
+    def test_invalid_items_are_reported_by_index(self):
+        errors = self.errors([1, True, "x", 2.5, None], item_type="int")
+        self.assertEqual(sorted(errors), [1, 2, 3, 4])
+        self.assertEqual(errors[1], ["Enter a valid int."])
+        errors = self.errors([1.5, float("inf"), float("nan")], item_type="float")
+        self.assertEqual(sorted(errors), [1, 2])
+
+    def test_ints_out_of_range_are_invalid(self):
+        for value in (MAX_INT + 1, float(2**64), -float(2**64), "1e30"):
+            with self.subTest(value=value):
+                errors = self.errors([1, value], item_type="int")
+                self.assertEqual(errors, {1: ["Enter a valid int."]})
+        self.assertEqual(self.validate([float(2**62)], item_type="int"), [2**62])
+
+    def test_item_rules(self):
+        errors = self.errors(
+            [0, 5, 11, 10], item_type="int", item_min_value=1, item_max_value=10
+        )
+        self.assertEqual(
+            errors,
+            {
+                0: ["Ensure this value is greater than or equal to 1."],
+                2: ["Ensure this value is less than or equal to 10."],
+            },
+        )
+        errors = self.errors(
+            ["a", "abc", "abcdef"],
+            item_type="string",
+            item_min_length=2,
+            item_max_length=5,
+        )
+        self.assertEqual(sorted(errors), [0, 2])
+        errors = self.errors(
+            ["red", "blue"], item_type="option", members=frozenset({"red"})
+        )
+        self.assertEqual(errors, {1: ['"blue" is not a valid choice.']})
+
+    def test_list_rules(self):
+        with self.assertRaisesMessage(serializers.ValidationError, 'type "dict"'):
+            self.validate({}, item_type="int")
+        with self.assertRaisesMessage(serializers.ValidationError, "at least 2"):
+            self.validate([1], item_type="int", min_items=2)
+        with self.assertRaisesMessage(serializers.ValidationError, "no more than 1"):
+            self.validate([1, 2], item_type="int", max_items=1)
+
+    def test_numbers_are_faster_than_with_list_field(self):
+        speedups = {
+            label: value
+            for label, value in benchmark_arrays(repeat=3)
+            if label.endswith("speedup")
+        }
+        self.assertGreater(speedups["10000 int items speedup"], 1)
+        self.assertGreater(speedups["10000 float items speedup"], 1)
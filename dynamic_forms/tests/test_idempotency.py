@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.response import Response
+
+from dynamic_forms.cache import get_cache
+from dynamic_forms.idempotency import REPLAYED_HEADER, idempotent
+from dynamic_forms.tests.base import FormsTestCase
+
+
+def make_request(data):
+    return SimpleNamespace(user=AnonymousUser(), data=data)
+
+
+class CountingHandler:
+    def __init__(self, status=201):
+        self.calls = 0
+        self.status = status
+
+    def __call__(self):
+        self.calls += 1
+        return Response(
+            {"call": self.calls}, status=self.status, headers={"Location": "/done/"}
+        )
+
+
+class InterleavingCache:
+    """
+    Runs ``interleave`` right after the first cache read, before the caller
+    takes the idempotency lock.
+    """
+
+    def __init__(self, cache, interleave):
+        self.cache = cache
+        self.interleave = interleave
+
+    def __getattr__(self, name):
+        return getattr(self.cache, name)
+
+    def get(self, key, *args, **kwargs):
+        value = self.cache.get(key, *args, **kwargs)
+        if self.interleave is not None:
+            interleave, self.interleave = self.interleave, None
+            interleave()
+        return value
+
+
+class IdempotencyTests(FormsTestCase):
+    def test_duplicates_replay_the_first_response(self):
+        handler = CountingHandler()
+        first = idempotent(make_request({"a": 1}), "form", "key", handler)
+        second = idempotent(make_request({"a": 1}), "form", "key", handler)
+        self.assertEqual(handler.calls, 1)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["Location"], "/done/")
+        self.assertEqual(second[REPLAYED_HEADER], "true")
+
+    def test_reused_key_with_another_payload_is_rejected(self):
+        handler = CountingHandler()
+        idempotent(make_request({"a": 1}), "form", "key", handler)
+        response = idempotent(make_request({"a": 2}), "form", "key", handler)
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(handler.calls, 1)
+
+    def test_server_errors_are_not_stored(self):
+        handler = CountingHandler(status=503)
+        idempotent(make_request({"a": 1}), "form", "key", handler)
+        idempotent(make_request({"a": 1}), "form", "key", handler)
+        self.assertEqual(handler.calls, 2)
+
+    def test_response_stored_before_the_lock_is_taken_is_replayed(self):
+        handler = CountingHandler()
+        first = {}
+
+        def first_request():
+            first["response"] = idempotent(
+                make_request({"a": 1}), "form", "key", handler
+            )
+
+        # The second request misses the cache, then the first one runs to
+        # completion and releases the lock before the second one takes it.
+        cache = InterleavingCache(get_cache(), first_request)
+        with mock.patch("dynamic_forms.idempotency.get_cache", return_value=cache):
+            second = idempotent(make_request({"a": 1}), "form", "key", handler)
+
+        self.assertEqual(handler.calls, 1)
+        self.assertEqual(first["response"].status_code, 201)
+        self.assertEqual(second.data, first["response"].data)
+        self.assertEqual(second[REPLAYED_HEADER], "true")
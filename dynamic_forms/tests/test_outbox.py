@@ -0,0 +1,133 @@
+import hashlib
+import hmac
+import json
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.test import override_settings
+from django.utils import timezone
+
+from dynamic_forms import outbox
+from dynamic_forms.choices import OutboxStatusChoices
+from dynamic_forms.models import Form, OutboxEvent, Webhook
+from dynamic_forms.tests.base import FormsTransactionTestCase
+
+
+class WebhookStub:
+    """
+    A local HTTP server answering each POST with the next of ``statuses``,
+    then 200, and recording the requests it gets.
+    """
+
+    def __init__(self, statuses=()):
+        self.statuses = list(statuses)
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                stub.requests.append((dict(self.headers), body))
+                self.send_response(stub.statuses.pop(0) if stub.statuses else 200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/hook"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class OutboxTests(FormsTransactionTestCase):
+    def setUp(self):
+        self.form = Form.objects.create(name="Signup")
+
+    def stub(self, statuses=()):
+        stub = WebhookStub(statuses)
+        self.addCleanup(stub.close)
+        return stub
+
+    def queue(self, stub, secret="", count=1):
+        webhook = Webhook.objects.create(form=self.form, url=stub.url, secret=secret)
+        return [
+            OutboxEvent.objects.create(
+                webhook=webhook, event=outbox.SUBMISSION_CREATED, payload={"n": n}
+            )
+            for n in range(count)
+        ]
+
+    def test_delivers_signed_batches(self):
+        stub = self.stub()
+        events = self.queue(stub, secret="s3cret", count=3)
+        self.assertEqual(outbox.deliver_events(), 3)
+        [(headers, body)] = stub.requests
+        expected = hmac.new(b"s3cret", body, hashlib.sha256).hexdigest()
+        self.assertEqual(headers[outbox.SIGNATURE_HEADER], f"sha256={expected}")
+        self.assertEqual(
+            [event["data"] for event in json.loads(body)["events"]],
+            [{"n": 0}, {"n": 1}, {"n": 2}],
+        )
+        for event in events:
+            event.refresh_from_db()
+            self.assertEqual(event.status, OutboxStatusChoices.DELIVERED)
+
+    def test_retries_with_backoff_then_delivers(self):
+        stub = self.stub(statuses=[503])
+        [event] = self.queue(stub)
+        outbox.deliver_events()
+        event.refresh_from_db()
+        self.assertEqual(event.status, OutboxStatusChoices.PENDING)
+        self.assertEqual(event.attempts, 1)
+        self.assertTrue(event.error.startswith("HTTP 503"))
+        self.assertGreater(event.next_attempt_at, timezone.now())
+        self.assertEqual(outbox.deliver_events(), 0)
+
+        OutboxEvent.objects.update(next_attempt_at=timezone.now() - timedelta(1))
+        outbox.deliver_events()
+        event.refresh_from_db()
+        self.assertEqual(event.status, OutboxStatusChoices.DELIVERED)
+        self.assertEqual(len(stub.requests), 2)
+
+    @override_settings(DYNAMIC_FORMS={"WEBHOOK_MAX_ATTEMPTS": 1})
+    def test_dead_letters_after_the_last_attempt(self):
+        [event] = self.queue(self.stub(statuses=[500]))
+        outbox.deliver_events()
+        event.refresh_from_db()
+        self.assertEqual(event.status, OutboxStatusChoices.DEAD)
+
+    def test_ignores_events_claimed_again(self):
+        stub = self.stub()
+        self.queue(stub)
+        [event] = outbox.claim_events(10)
+        # Requeued after the claim timeout and claimed by another worker.
+        OutboxEvent.objects.update(claim=None)
+        outbox.deliver(outbox.get_session(), event.webhook, [event])
+        self.assertEqual(
+            OutboxEvent.objects.get().status, OutboxStatusChoices.DELIVERING
+        )
+
+    def test_failing_batch_does_not_stop_the_others(self):
+        stub = self.stub()
+        broken = self.queue(stub)
+        delivered = self.queue(stub)
+        real_deliver = outbox.deliver
+
+        def deliver(session, webhook, events):
+            if events[0].pk == broken[0].pk:
+                raise RuntimeError("bad row")
+            return real_deliver(session, webhook, events)
+
+        with mock.patch.object(outbox, "deliver", deliver):
+            with self.assertLogs("dynamic_forms.outbox", "ERROR"):
+                self.assertEqual(outbox.deliver_events(), 2)
+        statuses = dict(OutboxEvent.objects.values_list("pk", "status"))
+        self.assertEqual(statuses[broken[0].pk], OutboxStatusChoices.PENDING)
+        self.assertEqual(statuses[delivered[0].pk], OutboxStatusChoices.DELIVERED)
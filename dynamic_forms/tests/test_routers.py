@@ -0,0 +1,72 @@
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from dynamic_forms.models import Form
+from dynamic_forms.routers import PIN_COOKIE, ReplicaPinningMiddleware, use_replica
+from dynamic_forms.tests.base import FormsTestCase
+
+
+def replicate(instance):
+    """
+    Writes ``instance`` to the replica only, as replication would, without signals.
+    """
+    type(instance).objects.using("replica").bulk_create([instance])
+    return instance
+
+
+@override_settings(
+    DYNAMIC_FORMS={"READ_REPLICAS": ["replica"], "REPLICA_STICKINESS": 5}
+)
+class ReplicaRoutingTests(FormsTestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        self.form = Form.objects.create(name="Survey")
+
+    def test_reads_go_to_the_replica_only_inside_use_replica(self):
+        self.assertTrue(Form.objects.filter(pk=self.form.pk).exists())
+        with use_replica():
+            self.assertFalse(Form.objects.filter(pk=self.form.pk).exists())
+        replicate(Form(name="Survey", slug="replicated"))
+        with use_replica():
+            self.assertTrue(Form.objects.filter(slug="replicated").exists())
+
+    def test_instances_are_read_from_their_database(self):
+        replicated = replicate(Form(name="Replicated", slug="replicated"))
+        with use_replica():
+            form = Form.objects.get(pk=replicated.pk)
+            self.assertEqual(form._state.db, "replica")
+            self.assertEqual(router.db_for_read(Form, instance=form), "replica")
+
+    def request(self, method, cookies=None):
+        def view(request):
+            if request.method == "POST":
+                Form.objects.create(name="Written")
+            with use_replica():
+                return HttpResponse(router.db_for_read(Form) or "default")
+
+        request = getattr(RequestFactory(), method)("/")
+        request.COOKIES.update(cookies or {})
+        return ReplicaPinningMiddleware(view)(request)
+
+    def test_safe_requests_read_from_the_replica(self):
+        response = self.request("get")
+        self.assertEqual(response.content, b"replica")
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_writes_pin_the_client_to_the_primary(self):
+        response = self.request("post")
+        self.assertEqual(response.content, b"default")
+        self.assertEqual(response.cookies[PIN_COOKIE]["max-age"], 5)
+        pinned = self.request("get", {PIN_COOKIE: response.cookies[PIN_COOKIE].value})
+        self.assertEqual(pinned.content, b"default")
+
+    def test_pin_expires_with_its_cookie(self):
+        with override_settings(
+            DYNAMIC_FORMS={"READ_REPLICAS": ["replica"], "REPLICA_STICKINESS": 1}
+        ):
+            response = self.request("post")
+        self.assertEqual(response.cookies[PIN_COOKIE]["max-age"], 1)
+        # Once the cookie expired the client sends none and reads go back.
+        self.assertEqual(self.request("get").content, b"replica")
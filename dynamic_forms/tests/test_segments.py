@@ -0,0 +1,116 @@
+import json
+import os
+import tempfile
+import uuid
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from dynamic_forms.models import Form, Submission, SubmissionSegment
+from dynamic_forms.segments import (
+    compact_partition,
+    get_cutoff,
+    get_segment_index,
+    get_segment_root,
+    month_datetime,
+    month_start,
+)
+from dynamic_forms.tests.base import FormsTestCase
+
+
+class SegmentTests(FormsTestCase):
+    def setUp(self):
+        super().setUp()
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        settings = override_settings(
+            DYNAMIC_FORMS={
+                "SEGMENT_ROOT": root.name,
+                "SEGMENT_BLOCK_SIZE": 2,
+                "SEGMENT_MAX_RECORDS": 3,
+            }
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        get_segment_index.cache_clear()
+
+        self.form = Form.objects.create(name="Archive")
+        now = timezone.now()
+        self.cold_month = month_start(get_cutoff() - timedelta(days=1))
+        self.cold = [
+            self.create_submission(
+                month_datetime(self.cold_month) + timedelta(days=day, hours=1),
+                reference=day,
+            )
+            for day in (3, 0, 4, 1, 2)
+        ]
+        self.hot = [
+            self.create_submission(now - timedelta(seconds=seconds), reference=seconds)
+            for seconds in (10, 20)
+        ]
+
+    def create_submission(self, created_at, reference):
+        submission = Submission.objects.create(
+            form=self.form,
+            form_version=1,
+            reference=reference,
+            data={"reference": reference},
+        )
+        Submission.objects.filter(pk=submission.pk).update(created_at=created_at)
+        return submission
+
+    def compact(self):
+        return compact_partition(self.form.pk, self.cold_month)
+
+    def test_compaction_moves_the_month_to_segments(self):
+        segments = self.compact()
+        self.assertEqual([segment.count for segment in segments], [3, 2])
+        self.assertEqual(
+            set(Submission.objects.values_list("pk", flat=True)),
+            {submission.pk for submission in self.hot},
+        )
+        for segment in segments:
+            path = os.path.join(get_segment_root(), segment.path)
+            self.assertEqual(segment.size, os.path.getsize(path))
+        self.assertEqual(len(segments[0].index), 2)
+        # Nothing is left to compact.
+        self.assertEqual(self.compact(), [])
+        self.assertEqual(SubmissionSegment.objects.count(), 2)
+
+    def test_compacted_submissions_are_still_served(self):
+        self.compact()
+        for submission in self.cold + self.hot:
+            url = reverse(
+                "form_submission_detail",
+                kwargs={"slug": self.form.slug, "pk": submission.pk},
+            )
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["id"], str(submission.pk))
+            self.assertEqual(response.json()["reference"], submission.reference)
+        url = reverse(
+            "form_submission_detail",
+            kwargs={"slug": self.form.slug, "pk": uuid.uuid4()},
+        )
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def export(self, *args):
+        stdout = StringIO()
+        call_command("export_submissions", self.form.slug, *args, stdout=stdout)
+        return [
+            json.loads(line)["reference"] for line in stdout.getvalue().splitlines()
+        ]
+
+    def test_exports_span_hot_and_cold_submissions_in_order(self):
+        before = self.export()
+        self.compact()
+        self.assertEqual(self.export(), before)
+        self.assertEqual(before, [0, 1, 2, 3, 4, 20, 10])
+        cold_month = f"{self.cold_month:%Y-%m}"
+        self.assertEqual(self.export("--until", cold_month), [0, 1, 2, 3, 4])
+        current_month = f"{timezone.now():%Y-%m}"
+        self.assertEqual(self.export("--since", current_month), [20, 10])
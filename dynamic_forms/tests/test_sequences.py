@@ -0,0 +1,50 @@
+from dynamic_forms import sequences
+from dynamic_forms.models import Sequence
+from dynamic_forms.tests.base import FormsTransactionTestCase, run_concurrently
+
+
+class SequenceTests(FormsTransactionTestCase):
+    threads = 8
+
+    def setUp(self):
+        sequences._blocks.clear()
+
+    def test_concurrent_blocks_are_disjoint_and_contiguous(self):
+        size, count = 10, 20
+
+        def allocate():
+            return [sequences.allocate_block("blocks", size) for _i in range(count)]
+
+        blocks = sorted(
+            block
+            for blocks in run_concurrently(allocate, self.threads)
+            for block in blocks
+        )
+        self.assertEqual(len(blocks), self.threads * count)
+        expected_first = 1
+        for first, last in blocks:
+            self.assertEqual(first, expected_first)
+            self.assertEqual(last, first + size - 1)
+            expected_first = last + 1
+        self.assertEqual(
+            Sequence.objects.get(name="blocks").last, self.threads * count * size
+        )
+
+    def test_concurrent_numbers_are_unique_without_gaps_beyond_a_block(self):
+        block_size, count = 7, 100
+
+        def draw():
+            return [sequences.next_number("numbers", block_size) for _i in range(count)]
+
+        numbers = [n for drawn in run_concurrently(draw, self.threads) for n in drawn]
+        self.assertEqual(len(numbers), len(set(numbers)))
+        reserved = Sequence.objects.get(name="numbers").last
+        self.assertLessEqual(max(numbers), reserved)
+        self.assertLess(reserved - len(numbers), block_size)
+        self.assertEqual(min(numbers), 1)
+
+    def test_blocks_are_not_shared_with_forked_processes(self):
+        block = sequences.Block(1, 10)
+        block.pid -= 1
+        self.assertTrue(block.exhausted)
+        self.assertIsNone(block.take())
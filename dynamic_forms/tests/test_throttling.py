@@ -0,0 +1,133 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import override_settings
+from django.urls import reverse
+
+from dynamic_forms.choices import FormFieldChoices
+from dynamic_forms.models import Form
+from dynamic_forms.tests.base import FormsTestCase, add_field
+from dynamic_forms.throttling import (
+    FormConcurrencyThrottle,
+    FormTokenBucketThrottle,
+    get_admission,
+)
+
+
+def make_view(slug):
+    return SimpleNamespace(kwargs={"slug": slug}, lookup_field="slug", admission=None)
+
+
+def admission_settings(**admission):
+    return {
+        "ADMISSION": {"rate": None, "burst": None, "concurrency": None, **admission}
+    }
+
+
+class AdmissionTests(FormsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.form = Form.objects.create(name="Checked")
+        add_field(
+            self.form,
+            "pin",
+            FormFieldChoices.TEXT,
+            validation=["validation_url:https://example.com/check"],
+        )
+
+    def concurrency(self, default, external):
+        settings = {
+            **admission_settings(concurrency=default),
+            "EXTERNAL_VALIDATION_CONCURRENCY": external,
+        }
+        with override_settings(DYNAMIC_FORMS=settings):
+            return get_admission(self.form.slug)["concurrency"]
+
+    def test_external_validation_tightens_the_concurrency(self):
+        self.assertEqual(self.concurrency(5, 2), 2)
+        self.assertEqual(self.concurrency(2, 5), 2)
+        self.assertEqual(self.concurrency(None, 3), 3)
+
+    def test_unset_external_concurrency_keeps_the_default(self):
+        self.assertEqual(self.concurrency(5, None), 5)
+        self.assertIsNone(self.concurrency(None, None))
+
+    def test_form_limits_win(self):
+        self.form.metadata = {"admission": {"concurrency": 8}}
+        self.form.save()
+        self.assertEqual(self.concurrency(5, 2), 8)
+
+
+@mock.patch("dynamic_forms.throttling.time")
+class TokenBucketTests(FormsTestCase):
+    def allow(self):
+        throttle = FormTokenBucketThrottle()
+        return throttle.allow_request(None, make_view("bucket")), throttle.wait()
+
+    @override_settings(DYNAMIC_FORMS=admission_settings(rate=1, burst=3))
+    def test_bursts_are_admitted_up_to_the_bucket_size(self, time):
+        time.time.return_value = 3000.0
+        for _request in range(3):
+            self.assertEqual(self.allow(), (True, None))
+        allowed, wait = self.allow()
+        self.assertFalse(allowed)
+        self.assertEqual(wait, 3)
+
+    @override_settings(DYNAMIC_FORMS=admission_settings(rate=1, burst=3))
+    def test_the_bucket_refills_at_the_rate(self, time):
+        time.time.return_value = 3000.0
+        for _request in range(3):
+            self.allow()
+        # Two thirds of the previous window are still inside the sliding window.
+        time.time.return_value = 3004.0
+        self.assertEqual(self.allow(), (True, None))
+        allowed, wait = self.allow()
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 1)
+        time.time.return_value = 3005.0
+        self.assertEqual(self.allow(), (True, None))
+
+    @override_settings(DYNAMIC_FORMS=admission_settings(rate=1, burst=2))
+    def test_rejected_requests_do_not_use_up_the_bucket(self, time):
+        time.time.return_value = 3000.0
+        for _request in range(10):
+            self.allow()
+        time.time.return_value = 3002.0
+        # Only the two admitted requests are carried over.
+        self.assertFalse(self.allow()[0])
+        time.time.return_value = 3003.0
+        self.assertTrue(self.allow()[0])
+
+
+@override_settings(DYNAMIC_FORMS=admission_settings(concurrency=2))
+class ConcurrencyTests(FormsTestCase):
+    def take(self):
+        throttle = FormConcurrencyThrottle()
+        return throttle, throttle.allow_request(None, make_view("busy"))
+
+    def test_slots_are_capped_and_released(self):
+        first, allowed = self.take()
+        self.assertTrue(allowed)
+        self.assertTrue(self.take()[1])
+        rejected, allowed = self.take()
+        self.assertFalse(allowed)
+        rejected.release()
+        self.assertFalse(self.take()[1])
+        first.release()
+        first.release()
+        self.assertTrue(self.take()[1])
+        self.assertFalse(self.take()[1])
+
+    @override_settings(DYNAMIC_FORMS=admission_settings(concurrency=1))
+    def test_submissions_release_their_slot(self):
+        form = Form.objects.create(name="Busy")
+        add_field(form, "name", FormFieldChoices.TEXT)
+        url = reverse("form_submission", kwargs={"slug": form.slug})
+        for name in ("a", "b", "c"):
+            response = self.client.post(
+                url, {"name": name}, content_type="application/json"
+            )
+            self.assertEqual(response.status_code, 200)
+        response = self.client.post(url, {}, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self.take()[1])
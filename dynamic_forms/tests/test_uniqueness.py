@@ -0,0 +1,68 @@
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from dynamic_forms.choices import FormFieldChoices
+from dynamic_forms.models import Form, Submission, UniqueValue
+from dynamic_forms.segments import compact_partition, month_start
+from dynamic_forms.tests.base import (
+    FormsTransactionTestCase,
+    add_field,
+    run_concurrently,
+)
+from dynamic_forms.uniqueness import TAKEN_MESSAGE
+
+
+class UniqueValueTests(FormsTransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.form = Form.objects.create(name="Signup")
+        add_field(self.form, "email", FormFieldChoices.EMAIL, validation=["unique"])
+        self.url = reverse("form_submission", kwargs={"slug": self.form.slug})
+
+    def submit(self, email, client=None):
+        return (client or self.client).post(
+            self.url, {"email": email}, content_type="application/json"
+        )
+
+    def assertTaken(self, response):
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"email": [TAKEN_MESSAGE]})
+
+    def test_values_are_taken_once_whatever_their_case(self):
+        self.assertEqual(self.submit("ann@example.com").status_code, 200)
+        self.assertTaken(self.submit(" Ann@Example.com"))
+        self.assertEqual(self.submit("bob@example.com").status_code, 200)
+
+    def test_concurrent_submissions_of_a_value(self):
+        responses = run_concurrently(
+            lambda: self.submit("ann@example.com", Client()), 2
+        )
+        responses.sort(key=lambda response: response.status_code)
+        self.assertEqual([r.status_code for r in responses], [200, 400])
+        self.assertTaken(responses[1])
+        self.assertEqual(Submission.objects.count(), 1)
+        self.assertEqual(UniqueValue.objects.count(), 1)
+
+    def test_value_taken_after_validation_is_rejected_by_the_claim(self):
+        # Both submissions pass validation, as when they run side by side.
+        with mock.patch("dynamic_forms.uniqueness.taken_fields", return_value=set()):
+            self.assertEqual(self.submit("ann@example.com").status_code, 200)
+            self.assertTaken(self.submit("ann@example.com"))
+        self.assertEqual(Submission.objects.count(), 1)
+
+    def test_claims_outlive_compacted_submissions(self):
+        self.assertEqual(self.submit("ann@example.com").status_code, 200)
+        month = month_start(timezone.now() - timedelta(days=62))
+        Submission.objects.update(created_at=timezone.now() - timedelta(days=62))
+        with tempfile.TemporaryDirectory() as root:
+            with override_settings(DYNAMIC_FORMS={"SEGMENT_ROOT": root}):
+                self.assertEqual(len(compact_partition(self.form.pk, month)), 1)
+        self.assertFalse(Submission.objects.exists())
+        claim = UniqueValue.objects.get()
+        self.assertIsNone(claim.submission_id)
+        self.assertTaken(self.submit("ann@example.com"))
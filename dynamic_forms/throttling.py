@@ -0,0 +1,148 @@
+import time
+
+from rest_framework.throttling import BaseThrottle
+
+from dynamic_forms.cache import KEY_PREFIX, get_cache, get_form_admission
+from dynamic_forms.conf import get_setting
+
+
+def get_admission(slug):
+    """
+    Returns the admission limits of a form.
+
+    Settings for the slug win over ``Form.metadata["admission"]``, which wins
+    over the defaults. The metadata is read from a small versioned cache entry
+    rather than the compiled plan, so no form is loaded to admit a request.
+    """
+    admission = dict(get_setting("ADMISSION"))
+    form_admission = get_form_admission(slug)
+    if form_admission is None:
+        return admission
+    external_concurrency = get_setting("EXTERNAL_VALIDATION_CONCURRENCY")
+    if form_admission["external_validation"] and external_concurrency is not None:
+        # Tightens the default concurrency, never lifts it.
+        concurrency = admission.get("concurrency")
+        admission["concurrency"] = (
+            min(concurrency, external_concurrency)
+            if concurrency
+            else external_concurrency
+        )
+    admission.update(form_admission["limits"])
+    admission.update(get_setting("ADMISSION_FORMS").get(slug, {}))
+    return admission
+
+
+def incr_counter(cache, key, timeout):
+    """
+    Atomically increments the counter ``key``, created at 0 if missing.
+
+    Raises ``ValueError`` if the counter keeps expiring between add and incr.
+    """
+    for _attempt in range(2):
+        cache.add(key, 0, timeout)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            continue
+    raise ValueError(f"Counter {key} could not be incremented.")
+
+
+class FormThrottle(BaseThrottle):
+    def get_admission(self, view):
+        # Shared by the throttles of a view, which is instantiated per request.
+        if getattr(view, "admission", None) is None:
+            view.admission = get_admission(view.kwargs.get(view.lookup_field))
+        return view.admission
+
+    def get_cache_key(self, view, name):
+        slug = view.kwargs.get(view.lookup_field)
+        return f"{KEY_PREFIX}:admission:{slug}:{name}"
+
+
+class FormTokenBucketThrottle(FormThrottle):
+    """
+    Admits ``rate`` requests per second per form, with bursts of up to ``burst``.
+
+    The bucket is approximated by counters of windows of ``burst / rate``
+    seconds in the shared cache, only ever changed with an atomic ``incr``, so
+    every worker draws from the same bucket without a lock. A request is shed
+    when the count of the current window, plus the share of the previous one
+    still inside the sliding window, goes over ``burst``, and whenever its
+    counter cannot be incremented.
+    """
+
+    def allow_request(self, request, view):
+        self.retry_after = None
+        admission = self.get_admission(view)
+        rate = admission.get("rate")
+        if not rate:
+            return True
+        burst = admission.get("burst") or rate
+        window = burst / rate
+        index, elapsed = divmod(time.time(), window)
+        key = self.get_cache_key(view, "bucket")
+        cache = get_cache()
+        current = f"{key}:{int(index)}"
+        try:
+            count = incr_counter(cache, current, 2 * window + 1)
+        except ValueError:
+            self.retry_after = window - elapsed
+            return False
+        previous = cache.get(f"{key}:{int(index) - 1}", 0)
+        excess = previous * (1 - elapsed / window) + count - burst
+        if excess <= 0:
+            return True
+        # Rejected requests do not use up the bucket.
+        try:
+            cache.decr(current)
+        except ValueError:
+            pass
+        self.retry_after = window - elapsed
+        if previous:
+            self.retry_after = min(self.retry_after, excess * window / previous)
+        return False
+
+    def wait(self):
+        return self.retry_after
+
+
+class FormConcurrencyThrottle(FormThrottle):
+    """
+    Caps the number of submissions of a form being processed at once.
+
+    The slot taken by ``allow_request`` must be given back with ``release`` once
+    the response is finalized.
+    """
+
+    retry_after = 1
+
+    def __init__(self):
+        self.key = None
+
+    def allow_request(self, request, view):
+        concurrency = self.get_admission(view).get("concurrency")
+        if not concurrency:
+            return True
+        cache = get_cache()
+        key = self.get_cache_key(view, "in_flight")
+        try:
+            in_flight = incr_counter(cache, key, get_setting("ADMISSION_SLOT_TIMEOUT"))
+        except ValueError:
+            return False
+        if in_flight > concurrency:
+            cache.decr(key)
+            return False
+        self.key = key
+        return True
+
+    def release(self):
+        if self.key is None:
+            return
+        try:
+            get_cache().decr(self.key)
+        except ValueError:
+            pass
+        self.key = None
+
+    def wait(self):
+        return self.retry_after
@@ -0,0 +1,83 @@
+"""
+Enforcement of the "unique" rule: a value of the field may only be submitted
+once per form.
+
+Taken values are kept in ``UniqueValue`` as the SHA-256 of their normalized
+form. Validation checks them with one indexed lookup, and accepting a
+submission inserts them in its transaction: of two concurrent submissions of
+the same value, the database unique constraint rejects the second.
+"""
+
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+
+from dynamic_forms.models import UniqueValue
+
+TAKEN_MESSAGE = "This value has already been submitted."
+
+
+class ValueTaken(Exception):
+    def __init__(self, field_name):
+        super().__init__(field_name)
+        self.field_name = field_name
+
+
+def normalize(value):
+    """
+    Returns the text identifying ``value``, case and surrounding spaces aside.
+    """
+    if isinstance(value, (dict, list)):
+        text = json.dumps(value, cls=DjangoJSONEncoder, sort_keys=True)
+    else:
+        text = str(value)
+    return text.strip().casefold()
+
+
+def value_hash(value):
+    return hashlib.sha256(normalize(value).encode()).hexdigest()
+
+
+def unique_hashes(form_plan, data):
+    """
+    Returns ``{field_name: hash}`` for the unique fields given a value in ``data``.
+    """
+    return {
+        name: value_hash(data[name])
+        for name in form_plan.unique_fields
+        if data.get(name) not in (None, "")
+    }
+
+
+def taken_fields(form_plan, hashes):
+    """
+    Returns the names of the fields whose value in ``hashes`` is already taken.
+    """
+    if not hashes:
+        return set()
+    taken = UniqueValue.objects.filter(
+        form_id=form_plan.id, value_hash__in=set(hashes.values())
+    ).values_list("field_name", "value_hash")
+    return {name for name, taken_hash in taken if hashes.get(name) == taken_hash}
+
+
+def claim_values(submission, form_plan, hashes):
+    """
+    Takes the values of ``hashes`` for ``submission``, in its transaction.
+
+    Raises ``ValueTaken`` if one was taken since the submission was validated.
+    """
+    for name, taken_hash in hashes.items():
+        try:
+            # A savepoint per value tells which field was already taken.
+            with transaction.atomic():
+                UniqueValue.objects.create(
+                    form_id=form_plan.id,
+                    field_name=name,
+                    value_hash=taken_hash,
+                    submission=submission,
+                )
+        except IntegrityError:
+            raise ValueTaken(name)
@@ -1,11 +1,49 @@
 from django.urls import path
-from dynamic_forms.views import FormDetailView, FormSubmissionView
+from dynamic_forms.views import (
+    DraftView,
+    FormBatchView,
+    FormDetailView,
+    FormListView,
+    FormPartialValidationView,
+    FormSchemaView,
+    FormSubmissionView,
+    OptionSetDetailView,
+    SubmissionDetailView,
+)
 
 urlpatterns = [
+    path("forms/", FormListView.as_view(), name="form_list"),
+    # Before "forms/<slug>/", which would take "batch" for a slug.
+    path("forms/batch/", FormBatchView.as_view(), name="form_batch"),
     path("forms/<slug:slug>/", FormDetailView.as_view(), name="form_detail"),
     path(
         "forms/<slug:slug>/submit/",
         FormSubmissionView.as_view(),
         name="form_submission",
     ),
+    path(
+        "forms/<slug:slug>/validate/",
+        FormPartialValidationView.as_view(),
+        name="form_partial_validation",
+    ),
+    path(
+        "forms/<slug:slug>/draft/",
+        DraftView.as_view(),
+        name="form_draft",
+    ),
+    path(
+        "forms/<slug:slug>/schema/",
+        FormSchemaView.as_view(),
+        name="form_schema",
+    ),
+    path(
+        "forms/<slug:slug>/submissions/<uuid:pk>/",
+        SubmissionDetailView.as_view(),
+        name="form_submission_detail",
+    ),
+    path(
+        "option-sets/<slug:slug>/",
+        OptionSetDetailView.as_view(),
+        name="option_set_detail",
+    ),
 ]
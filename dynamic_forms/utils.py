@@ -1,14 +1,7 @@
-import re
-import zoneinfo
+from collections.abc import Mapping
 from secrets import compare_digest
-from datetime import date, datetime, time
-import requests
-from djmoney.contrib.django_rest_framework import MoneyField
-from djmoney.money import Money
-from phonenumbers.phonenumberutil import format_number, PhoneNumberFormat
+from datetime import date, datetime, time, timezone
 from rest_framework import serializers
-from django_countries.serializer_fields import CountryField
-from phonenumber_field.serializerfields import PhoneNumberField
 from django.core.validators import (
     MaxLengthValidator,
     MaxValueValidator,
@@ -17,20 +10,27 @@ from django.core.validators import (
 )
 from .models import FormFieldChoices
 
+# Validators of the rules ArrayField applies itself, see FieldPlan.array_options.
+ARRAY_OPTION_VALIDATORS = (
+    MinLengthValidator,
+    MaxLengthValidator,
+    MinValueValidator,
+    MaxValueValidator,
+)
+
+# requests, djmoney, phonenumbers and django_countries are imported where they
+# are used, the first time a form needs them, to keep them off worker startup.
+
 
 class NestedFormSerializer(serializers.ListSerializer):
 
-    def __init__(self, nested_form_instance, field, *args, **kwargs):
-        self.nested_form_instance = nested_form_instance
+    def __init__(self, nested_form_plan, field, *args, **kwargs):
+        self.nested_form_plan = nested_form_plan
         self.field = field
         child_serializer_class, serializer_kwargs = build_dynamic_serializer(
-            self.nested_form_instance
-        )
-        serializer_fields = serializer_kwargs.pop("form_fields")
-        form_instance = serializer_kwargs.pop("form_instance")
-        kwargs["child"] = child_serializer_class(
-            data={}, form_fields=serializer_fields, form_instance=form_instance
+            self.nested_form_plan
         )
+        kwargs["child"] = child_serializer_class(data={}, **serializer_kwargs)
         super().__init__(*args, **kwargs)
 
     def to_internal_value(self, data):
@@ -42,20 +42,16 @@ class NestedFormSerializer(serializers.ListSerializer):
         errors = []
         cleaned_data_list = []
         serializer_class, serializer_kwargs = build_dynamic_serializer(
-            self.nested_form_instance
+            self.nested_form_plan
         )
-        serializer_fields = serializer_kwargs.pop("form_fields")
-        form_instance = serializer_kwargs.pop("form_instance")
+        serializer_kwargs["partial"] = getattr(self.root, "partial", False)
+        serializer_kwargs["nested"] = True
         if not data:
-            nested_form = serializer_class(
-                data={}, form_fields=serializer_fields, form_instance=form_instance
-            )
+            nested_form = serializer_class(data={}, **serializer_kwargs)
             if not nested_form.is_valid():
                 errors.append({self.field.name: [nested_form.errors]})
         for value in data:
-            nested_serializer = serializer_class(
-                data=value, form_fields=serializer_fields, form_instance=form_instance
-            )
+            nested_serializer = serializer_class(data=value, **serializer_kwargs)
             missing_fields = []
             for field_name, field in nested_serializer.fields.items():
                 if field.required and field_name not in value:
@@ -73,75 +69,111 @@ class NestedFormSerializer(serializers.ListSerializer):
 
 class DynamicSerializer(serializers.Serializer):
     def __init__(self, *args, **kwargs):
-        form_fields = kwargs.pop("form_fields")
-        form_instance = kwargs.pop("form_instance")
+        self.form_plan = kwargs.pop("form_plan")
+        # Names of the fields to build, all of them when None.
+        only = kwargs.pop("only", None)
+        # Payload deciding which conditional fields apply, the data by default.
+        condition_data = kwargs.pop("condition_data", None)
+        # Leaves the evaluation of "deferred" fields to SubmissionEvaluation jobs.
+        defer_evaluations = kwargs.pop("defer_evaluations", False)
+        # Rows of a nested form, whose "unique" rules only apply to its own
+        # submissions.
+        self.nested = kwargs.pop("nested", False)
         super(DynamicSerializer, self).__init__(*args, **kwargs)
 
-        for field in form_fields:
-            field_property = (
-                field.form_field_property.select_related("form")
-                .filter(form=form_instance)
-                .first()
+        active = None
+        if self.form_plan.condition_graph:
+            if condition_data is None:
+                condition_data = getattr(self, "initial_data", None)
+            if not isinstance(condition_data, Mapping):
+                condition_data = {}
+            active = self.form_plan.condition_graph.active_fields(condition_data)
+
+        for field in self.form_plan.fields:
+            if only is not None and field.name not in only:
+                continue
+            if active is not None and field.name not in active:
+                continue
+            field_validators = self.get_validators(
+                field.rules, deferred=defer_evaluations and field.is_deferred
             )
-            field_validators = self.get_validators(field_property.validation)
 
             if field.field_type == FormFieldChoices.TEXT:
                 self.fields[field.name] = serializers.CharField(
                     label=field.label,
-                    required=field_property.required,
+                    required=field.required,
                     validators=field_validators,
                 )
             elif field.field_type == FormFieldChoices.EMAIL:
                 self.fields[field.name] = serializers.EmailField(
                     label=field.label,
-                    required=field_property.required,
+                    required=field.required,
                     validators=field_validators,
                 )
             elif compare_digest(field.field_type, FormFieldChoices.PASSWORD):
                 self.fields[field.name] = serializers.CharField(
                     label=field.label,
-                    required=field_property.required,
+                    required=field.required,
                     style={"input_type": "password"},
                     validators=field_validators,
                 )
             elif field.field_type == FormFieldChoices.CHECKBOX:
                 self.fields[field.name] = serializers.BooleanField(
-                    label=field.label, required=field_property.required
+                    label=field.label, required=field.required
                 )
-            elif field.field_type == FormFieldChoices.DROPDOWN:
-                self.fields[field.name] = serializers.ChoiceField(
+            elif field.field_type in [
+                FormFieldChoices.DROPDOWN,
+                FormFieldChoices.RADIO,
+            ]:
+                from dynamic_forms.fields import OptionField
+
+                self.fields[field.name] = OptionField(
                     label=field.label,
-                    required=field_property.required,
-                    choices=[(option, option) for option in field_property.options],
+                    required=field.required,
+                    members=field.option_members,
+                    option_set=field.option_set,
                 )
             elif field.field_type == FormFieldChoices.FILE:
                 self.fields[field.name] = serializers.FileField(
-                    label=field.label, required=field_property.required
+                    label=field.label, required=field.required
                 )
             elif field.field_type == FormFieldChoices.NESTED:
                 self.fields[field.name] = NestedFormSerializer(
-                    nested_form_instance=field.nested_form,
+                    nested_form_plan=field.nested,
                     field=field,
                     label=field.label,
-                    required=field_property.required,
+                    required=field.required,
                 )
 
             elif field.field_type == FormFieldChoices.ARRAY:
-                self.fields[field.name] = serializers.ListField(
-                    child=serializers.CharField(),
-                    required=field_property.required,
-                    validators=field_validators,
+                from dynamic_forms.fields import ArrayField
+
+                self.fields[field.name] = ArrayField(
+                    label=field.label,
+                    required=field.required,
+                    validators=[
+                        validator
+                        for validator in field_validators
+                        if not isinstance(validator, ARRAY_OPTION_VALIDATORS)
+                    ],
+                    members=field.option_members,
+                    option_set=field.option_set,
+                    **field.array_options,
                 )
             elif field.field_type == FormFieldChoices.COUNTRY:
+                from django_countries.serializer_fields import CountryField
+
                 self.fields[field.name] = CountryField(
                     label=field.label,
-                    required=field_property.required,
+                    required=field.required,
                     validators=field_validators,
                 )
             elif field.field_type == FormFieldChoices.CURRENCY:
+                from djmoney.contrib.django_rest_framework import MoneyField
+
                 self.fields[field.name] = MoneyField(
                     label=field.label,
-                    required=field_property.required,
+                    required=field.required,
                     validators=field_validators,
                     decimal_places=2,
                     max_digits=10,
@@ -151,7 +183,7 @@ class DynamicSerializer(serializers.Serializer):
                 FormFieldChoices.DATE_RANGE,
             ]:
                 self.fields[field.name] = serializers.DateField(
-                    required=field_property.required,
+                    required=field.required,
                     validators=field_validators,
                     label=field.label,
                     format="%Y-%m-%d",
@@ -159,7 +191,7 @@ class DynamicSerializer(serializers.Serializer):
 
             elif field.field_type == FormFieldChoices.TIME:
                 self.fields[field.name] = serializers.TimeField(
-                    required=field_property.required,
+                    required=field.required,
                     validators=field_validators,
                     format="%H:%M:%S",
                 )
@@ -168,111 +200,100 @@ class DynamicSerializer(serializers.Serializer):
                 FormFieldChoices.DATE_TIME_RANGE,
             ]:
                 self.fields[field.name] = serializers.DateTimeField(
-                    required=field_property.required,
+                    required=field.required,
                     validators=field_validators,
                     format="%Y-%m-%d %H:%M:%S",
                 )
             elif field.field_type == FormFieldChoices.EXTERNAL_VALIDATION_ENDPOINT:
                 self.fields[field.name] = serializers.CharField(
                     label=field.label,
-                    required=field_property.required,
+                    required=field.required,
                     validators=field_validators,
                 )
-            elif field.field_type == FormFieldChoices.EXTERNAL_VALIDATION_ENDPOINT:
-                field_validators = self.get_validators(
-                    field_property.validation_endpoint
-                )
+            elif field.field_type == FormFieldChoices.EXTERNAL_EVALUATION_ENDPOINT:
                 self.fields[field.name] = serializers.CharField(
                     label=field.label,
-                    required=field_property.required,
+                    required=field.required,
                     validators=field_validators,
                 )
             elif field.field_type == FormFieldChoices.FLOAT:
                 self.fields[field.name] = serializers.FloatField(
                     label=field.label,
-                    required=field_property.required,
+                    required=field.required,
                     validators=field_validators,
                 )
             elif field.field_type == FormFieldChoices.INTEGER:
                 self.fields[field.name] = serializers.IntegerField(
                     label=field.label,
-                    required=field_property.required,
+                    required=field.required,
                     validators=field_validators,
                 )
             elif field.field_type == FormFieldChoices.UUID:
                 self.fields[field.name] = serializers.UUIDField(
-                    required=field_property.required,
+                    required=field.required,
                     validators=field_validators,
                 )
-            if field.field_type == FormFieldChoices.RADIO:
-                self.fields[field.name] = serializers.ChoiceField(
-                    label=field.label,
-                    required=field_property.required,
-                    choices=[(option, option) for option in field_property.options],
-                )
             elif field.field_type == FormFieldChoices.URL:
                 self.fields[field.name] = serializers.URLField(
-                    required=field_property.required,
+                    required=field.required,
                     validators=field_validators,
                 )
             elif field.field_type == FormFieldChoices.PHONE_NUMBER:
+                from dynamic_forms.phone_numbers import PhoneNumberField
+
                 self.fields[field.name] = PhoneNumberField(
-                    required=field_property.required,
+                    required=field.required,
                     validators=field_validators,
                 )
 
-    def get_validators(self, validations=[]):  # noqa
-        validators = []
-        _max_length = "max_length"
-        _min_length = "min_length"
-        _max_value = "max_value"
-        _min_value = "min_value"
-        max_length_pattern = rf"{_max_length}:\d+"
-        min_length_pattern = rf"{_min_length}:\d+"
-        max_value_pattern = rf"{_max_value}:\d+"
-        min_value_pattern = rf"{_min_value}:\d+"
-        for validation in validations:
-            if isinstance(validation, None):
-                validators.append(self.resource_validation(validation.url))
-            if validation.startswith("data_range"):
-                start_date, end_date = validation.split(":")[1].split(",")
-                validators.append(self.date_range_validator(start_date, end_date))
-            if validation.startswith("time_range"):
-                start_time, end_time = validation.split(":")[1].split(",")
-                validators.append(self.time_range_validator(start_time, end_time))
-            if validation.startswith("datetime_range"):
-                start_datetime, end_datetime = validation.split("datetime_range:")[
-                    1
-                ].split(",")
-                validators.append(
-                    self.datetime_range_validator(start_datetime, end_datetime)
-                )
-            if validation.startswith("validation_url"):
-                validation_url = validation.split("validation_url:")[1]
-                validators.append(self.resource_validation(validation_url))
-            if validation.startswith("evaluation_url"):
-                evaluation_url = validation.split("evaluation_url:")[1]
-                validators.append(self.resource_evaluation(evaluation_url))
-            min_length_pattern_checker = self.check_regex(
-                min_length_pattern, validation
-            )
-            max_length_pattern_checker = self.check_regex(
-                max_length_pattern, validation
+    def validate(self, attrs):
+        """
+        Checks the cross-field rules of the form, then rejects values of
+        "unique" fields already submitted to it.
+
+        The hashes of unique values are kept in ``unique_hashes`` for the view
+        to claim them along with the submission.
+        """
+        from dynamic_forms.uniqueness import TAKEN_MESSAGE, taken_fields, unique_hashes
+
+        self.unique_hashes = {}
+        errors = self.form_plan.cross_field_rules.errors(attrs)
+        if errors:
+            raise serializers.ValidationError(errors, code="invalid")
+        if self.nested or not self.form_plan.unique_fields:
+            return attrs
+        self.unique_hashes = unique_hashes(self.form_plan, attrs)
+        taken = taken_fields(self.form_plan, self.unique_hashes)
+        if taken:
+            raise serializers.ValidationError(
+                {name: [TAKEN_MESSAGE] for name in sorted(taken)}, code="unique"
             )
-            min_value_pattern_checker = self.check_regex(min_value_pattern, validation)
-            max_value_pattern_checker = self.check_regex(max_value_pattern, validation)
-            if min_length_pattern_checker:
-                min_length_ = int(validation.split(f"{_min_length}:")[1])
-                validators.append(MinLengthValidator(min_length_))
-            if max_length_pattern_checker:
-                max_length_ = int(validation.split(f"{_max_length}:")[1])
-                validators.append(MaxLengthValidator(max_length_))
-            if min_value_pattern_checker:
-                min_value_ = int(validation.split(f"{_min_value}:")[1])
-                validators.append(MinValueValidator(min_value_))
-            if max_value_pattern_checker:
-                max_value_ = int(validation.split(f"{_max_value}:")[1])
-                validators.append(MaxValueValidator(max_value_))
+        return attrs
+
+    def get_validators(self, rules=(), deferred=False):
+        """
+        Returns the validators of a field from its parsed ``FieldPlan.rules``.
+        """
+        validators = []
+        for name, argument in rules:
+            if name == "date_range":
+                validators.append(self.date_range_validator(*argument))
+            elif name == "time_range":
+                validators.append(self.time_range_validator(*argument))
+            elif name == "datetime_range":
+                validators.append(self.datetime_range_validator(*argument))
+            elif name == "validation_url":
+                validators.append(self.resource_validation(argument))
+            elif name == "evaluation_url" and not deferred:
+                validators.append(self.resource_evaluation(argument))
+            elif name == "min_length":
+                validators.append(MinLengthValidator(argument))
+            elif name == "max_length":
+                validators.append(MaxLengthValidator(argument))
+            elif name == "min_value":
+                validators.append(MinValueValidator(argument))
+            elif name == "max_value":
+                validators.append(MaxValueValidator(argument))
         return validators
 
     def date_range_validator(self, start_date_str, end_date_str):
@@ -300,10 +321,10 @@ class DynamicSerializer(serializers.Serializer):
     def datetime_range_validator(self, start_datetime_str, end_datetime_str):
         def validator(value):
             start_datetime = datetime.fromisoformat(start_datetime_str).replace(
-                tzinfo=zoneinfo.ZoneInfo(key="UTC")
+                tzinfo=timezone.utc
             )
             end_datetime = datetime.fromisoformat(end_datetime_str).replace(
-                tzinfo=zoneinfo.ZoneInfo(key="UTC")
+                tzinfo=timezone.utc
             )
             if not (start_datetime <= value <= end_datetime):
                 raise serializers.ValidationError(
@@ -314,6 +335,8 @@ class DynamicSerializer(serializers.Serializer):
 
     def resource_validation(self, base_url):
         def validator(value):
+            import requests
+
             if not base_url:
                 raise serializers.ValidationError(
                     "Validation service is not configured."
@@ -334,6 +357,8 @@ class DynamicSerializer(serializers.Serializer):
 
     def resource_evaluation(self, base_url):
         def validator(value):
+            import requests
+
             if not base_url:
                 raise serializers.ValidationError(
                     "Evaluation service is not configured."
@@ -354,40 +379,45 @@ class DynamicSerializer(serializers.Serializer):
 
     @property
     def validated_data(self):
+        """
+        The validated data converted for the output, computed once.
+
+        Only the fields listed in ``FormPlan.output_fields`` are converted.
+        """
         cleaned_data = super().validated_data
-        for field_name, field_value in cleaned_data.items():
-            field = self.fields.get(field_name)
-            if isinstance(field, MoneyField):
-                if isinstance(cleaned_data[field_name], Money):
-                    cleaned_data[field_name] = {
-                        "amount": str(cleaned_data[field_name].amount),
-                        "currency": cleaned_data[field_name].currency.code,
-                    }
-                else:
-                    cleaned_data[field_name] = {
-                        "amount": cleaned_data[field_name],
-                        "currency": None,
-                    }
-            if isinstance(field, PhoneNumberField):
-                # Ensure the value is a string before trying to convert it to a phone number
-                if isinstance(field_value, int):
-                    field_value = str(field_value)
-                    cleaned_data[field_name] = field_value  # Update the cleaned data
-                cleaned_data[field_name] = format_number(
-                    field_value, PhoneNumberFormat.INTERNATIONAL
-                )
+        if getattr(self, "_output_source", None) is not cleaned_data:
+            output_data = dict(cleaned_data)
+            for field_name, field_type in self.form_plan.output_fields:
+                if field_name in output_data:
+                    output_data[field_name] = OUTPUT_CONVERTERS[field_type](
+                        output_data[field_name]
+                    )
+            self._output_source = cleaned_data
+            self._output_data = output_data
+        return self._output_data
+
+
+def money_output(value):
+    from djmoney.money import Money
+
+    if isinstance(value, Money):
+        return {"amount": str(value.amount), "currency": value.currency.code}
+    return {"amount": value, "currency": None}
+
+
+def phone_number_output(value):
+    from dynamic_forms.phone_numbers import format_phone_number
+
+    if not value:
+        return value
+    return format_phone_number(value)
 
-        return cleaned_data
 
-    @staticmethod
-    def check_regex(pattern, validation):
-        if re.search(pattern, validation):
-            return True
-        return False
+OUTPUT_CONVERTERS = {
+    FormFieldChoices.CURRENCY: money_output,
+    FormFieldChoices.PHONE_NUMBER: phone_number_output,
+}
 
 
-def build_dynamic_serializer(form_instance):
-    return DynamicSerializer, {
-        "form_fields": form_instance.fields.all(),
-        "form_instance": form_instance,
-    }
+def build_dynamic_serializer(form_plan):
+    return DynamicSerializer, {"form_plan": form_plan}
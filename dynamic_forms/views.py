@@ -1,29 +1,411 @@
+from django.db import transaction
+from django.http import Http404
+from django.urls import reverse
+from django.utils.dateparse import parse_datetime
 from rest_framework import generics, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from django.shortcuts import get_object_or_404
-from dynamic_forms.models import Form
-from dynamic_forms.serializers import FormSerializer
+from dynamic_forms.cache import (
+    get_form_detail,
+    get_form_details,
+    get_form_plan,
+    get_form_schema,
+    get_form_version,
+    get_option_set,
+    get_version,
+    get_versions,
+)
+from dynamic_forms.conf import get_setting
+from dynamic_forms.drafts import discard_draft, get_draft, get_owner, save_draft
+from dynamic_forms.idempotency import IDEMPOTENCY_HEADER, idempotent
+from dynamic_forms.evaluations import queue_evaluations
+from dynamic_forms.outbox import queue_submission_events
+from dynamic_forms.pagination import ORDERING, KeysetPagination
+from dynamic_forms.models import Form, OptionSet, Submission
+from dynamic_forms.profiling import profiled
+from dynamic_forms.routers import use_replica
+from dynamic_forms.schema import add_option_sets
+from dynamic_forms.segments import find_cold_submission
+from dynamic_forms.sequences import submission_reference
+from dynamic_forms.serializers import (
+    DraftSerializer,
+    FormListSerializer,
+    FormSerializer,
+    OptionSetSerializer,
+    PartialValidationSerializer,
+    SubmissionSerializer,
+)
+from dynamic_forms.throttling import FormConcurrencyThrottle, FormTokenBucketThrottle
+from dynamic_forms.uniqueness import TAKEN_MESSAGE, ValueTaken, claim_values
 from dynamic_forms.utils import build_dynamic_serializer, DynamicSerializer
 
 
+class FormListView(generics.ListAPIView):
+    """
+    Lists forms by order of last change, a page after the other.
+
+    ``updated_since`` and ``archived`` (``true``, ``false`` or ``all``, active
+    forms by default) filter the forms, and ``fields`` picks the fields of
+    each, as in ``?fields=slug,version&archived=all`` for a client syncing
+    from the ``cursor`` of its last page.
+    """
+
+    serializer_class = FormListSerializer
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        params = self.request.query_params
+        archived = params.get("archived", "false")
+        if archived not in ("true", "false", "all"):
+            raise ValidationError({"archived": "Expected true, false or all."})
+        queryset = Form.objects.all()
+        if archived != "all":
+            queryset = queryset.filter(is_archived=archived == "true")
+        if "updated_since" in params:
+            updated_since = parse_datetime(params["updated_since"])
+            if updated_since is None:
+                raise ValidationError({"updated_since": "Expected an ISO 8601 date."})
+            queryset = queryset.filter(updated_at__gte=updated_since)
+        return queryset.only(*self.get_only(), *ORDERING)
+
+    def get_only(self):
+        fields = FormListSerializer.Meta.fields
+        if "fields" not in self.request.query_params:
+            return fields
+        only = self.request.query_params["fields"].split(",")
+        unknown = set(only) - set(fields)
+        if unknown:
+            raise ValidationError({"fields": f"Unknown fields {sorted(unknown)}."})
+        return only
+
+    def get_serializer(self, *args, **kwargs):
+        return super().get_serializer(*args, only=self.get_only(), **kwargs)
+
+    @use_replica()
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+
 class FormDetailView(generics.RetrieveAPIView):
-    queryset = Form.objects.all()
+    queryset = Form.objects.active()
     serializer_class = FormSerializer
     lookup_field = "slug"
 
+    @profiled("detail")
+    @use_replica()
+    def retrieve(self, request, *args, **kwargs):
+        data = get_form_detail(kwargs[self.lookup_field])
+        if data is None:
+            raise Http404
+        return Response(data)
+
+
+class FormBatchView(generics.GenericAPIView):
+    """
+    Serves the details of many forms at once, as clients load them on startup.
+
+    ``?slugs=a,b,c`` lists the forms wanted and ``versions=a:3,b:7`` the ones
+    the client already has. Forms still at that version are only listed as
+    ``unchanged``, the others are returned with their version.
+    """
+
+    @use_replica()
+    def get(self, request, *args, **kwargs):
+        slugs = list(
+            dict.fromkeys(
+                filter(None, request.query_params.get("slugs", "").split(","))
+            )
+        )
+        if not slugs:
+            raise ValidationError({"slugs": "Expected a list of form slugs."})
+        max_size = get_setting("FORM_BATCH_MAX_SIZE")
+        if len(slugs) > max_size:
+            raise ValidationError({"slugs": f"At most {max_size} forms at once."})
+        known = {}
+        for item in filter(None, request.query_params.get("versions", "").split(",")):
+            slug, _, version = item.partition(":")
+            if not version.isdigit():
+                raise ValidationError({"versions": "Expected slug:version pairs."})
+            known[slug] = int(version)
+
+        versions = get_versions(Form, slugs)
+        changed = [slug for slug in versions if known.get(slug) != versions[slug]]
+        details = get_form_details(changed) if changed else {}
+        return Response(
+            {
+                "forms": {
+                    slug: {"version": version, "form": detail}
+                    for slug, (version, detail) in details.items()
+                },
+                "unchanged": [
+                    slug for slug in slugs if slug in versions and slug not in changed
+                ],
+                "missing": [slug for slug in slugs if slug not in versions],
+            }
+        )
+
+
+class FormSchemaView(generics.GenericAPIView):
+    """
+    Serves the JSON Schema of a form for clients to validate payloads locally.
+
+    The ``ETag`` is made of the versions of the form and of its option sets,
+    so revalidating with ``If-None-Match`` only reads version counters.
+    """
+
+    lookup_field = "slug"
+
+    @use_replica()
+    def get(self, request, *args, **kwargs):
+        slug = kwargs[self.lookup_field]
+        version = get_form_version(slug)
+        compiled = get_form_schema(slug) if version is not None else None
+        if compiled is None:
+            raise Http404
+        versions = [version] + [
+            get_version(OptionSet, option_set) for option_set in compiled["option_sets"]
+        ]
+        etag = f'"{slug}-{"-".join(map(str, versions))}"'
+        if etag in request.headers.get("If-None-Match", ""):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        option_sets = [
+            get_option_set(option_set) for option_set in compiled["option_sets"]
+        ]
+        schema = add_option_sets(
+            compiled["schema"], [option_set for option_set in option_sets if option_set]
+        )
+        return Response(schema, headers={"ETag": etag})
+
+
+class OptionSetDetailView(generics.RetrieveAPIView):
+    """
+    Serves a shared option set, cacheable by clients through its ``ETag``.
+
+    Form details only carry the slug of the option sets their fields use, so
+    long lists are downloaded once and revalidated with ``If-None-Match``.
+    """
+
+    serializer_class = OptionSetSerializer
+    lookup_field = "slug"
+
+    @use_replica()
+    def retrieve(self, request, *args, **kwargs):
+        slug = kwargs[self.lookup_field]
+        version = get_version(OptionSet, slug)
+        if version is None:
+            raise Http404
+        etag = f'"{slug}-{version}"'
+        if etag in request.headers.get("If-None-Match", ""):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        option_set = get_option_set(slug)
+        if option_set is None:
+            raise Http404
+        etag = f'"{slug}-{option_set.version}"'
+        return Response(self.get_serializer(option_set).data, headers={"ETag": etag})
+
 
 class FormSubmissionView(generics.GenericAPIView):
     lookup_field = "slug"
     erializer_class = DynamicSerializer
+    throttle_classes = [FormTokenBucketThrottle, FormConcurrencyThrottle]
 
+    def get_throttles(self):
+        # Kept so the slots taken by the throttles can be released afterwards.
+        if not hasattr(self, "throttles"):
+            self.throttles = super().get_throttles()
+        return self.throttles
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        for throttle in getattr(self, "throttles", []):
+            if hasattr(throttle, "release"):
+                throttle.release()
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    @profiled("submit")
     def post(self, request, *args, **kwargs):
-        form_instance = get_object_or_404(Form, slug=kwargs["slug"])
-        serializer_class, form_kwargs = build_dynamic_serializer(form_instance)
-        serializer_fields = form_kwargs.pop("form_fields")
+        form_plan = get_form_plan(kwargs["slug"])
+        if form_plan is None:
+            raise Http404
+        idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+        if idempotency_key:
+            return idempotent(
+                request,
+                form_plan.slug,
+                idempotency_key,
+                lambda: self.submit(request, form_plan),
+            )
+        return self.submit(request, form_plan)
+
+    def submit(self, request, form_plan):
+        """
+        Validates and stores a submission.
+
+        Deferred evaluations are queued with it and answered with a 202; the
+        ``Location`` header points at the submission's status either way.
+        """
+        serializer_class, form_kwargs = build_dynamic_serializer(form_plan)
         serializer = serializer_class(
-            data=request.data,
-            form_fields=serializer_fields,
-            form_instance=form_instance,
+            data=request.data, defer_evaluations=True, **form_kwargs
+        )
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        reference = submission_reference(form_plan.id)
+        try:
+            with transaction.atomic():
+                submission = Submission.objects.create(
+                    form_id=form_plan.id,
+                    form_version=form_plan.version,
+                    reference=reference,
+                    data=serializer.validated_data,
+                )
+                claim_values(submission, form_plan, serializer.unique_hashes)
+                evaluations = queue_evaluations(submission, form_plan)
+                queue_submission_events(submission, form_plan)
+        except ValueTaken as e:
+            return Response(
+                {e.field_name: [TAKEN_MESSAGE]}, status=status.HTTP_400_BAD_REQUEST
+            )
+        owner = get_owner(request)
+        if owner is not None:
+            discard_draft(form_plan.id, owner)
+        location = reverse(
+            "form_submission_detail",
+            kwargs={"slug": form_plan.slug, "pk": submission.pk},
+        )
+        return Response(
+            serializer.validated_data,
+            status=status.HTTP_202_ACCEPTED if evaluations else status.HTTP_200_OK,
+            headers={"Location": request.build_absolute_uri(location)},
+        )
+
+
+class FormPartialValidationView(generics.GenericAPIView):
+    """
+    Validates a subset of the fields of a form, as live form UIs do on blur.
+
+    Only the fields present in ``data``, or changed since ``previous`` when it
+    is given, are built and validated; absent fields are never required.
+    """
+
+    lookup_field = "slug"
+    serializer_class = PartialValidationSerializer
+
+    def post(self, request, *args, **kwargs):
+        form_plan = get_form_plan(kwargs["slug"])
+        if form_plan is None:
+            raise Http404
+        partial = self.get_serializer(data=request.data)
+        partial.is_valid(raise_exception=True)
+        changed_data = partial.get_changed_data()
+        serializer_class, form_kwargs = build_dynamic_serializer(form_plan)
+        serializer = serializer_class(
+            data=changed_data,
+            partial=True,
+            defer_evaluations=True,
+            only=set(changed_data),
+            condition_data=partial.validated_data["data"],
+            **form_kwargs,
         )
         serializer.is_valid(raise_exception=True)
         return Response(serializer.validated_data, status=status.HTTP_200_OK)
+
+
+class DraftView(generics.GenericAPIView):
+    """
+    The draft of a form kept for the current user, or session.
+
+    ``PATCH`` merges the fields of ``data`` into the draft and ``PUT`` replaces
+    it. Either answers with the draft, its revision and the errors of the
+    fields sent, validated as by the partial validation endpoint.
+    """
+
+    lookup_field = "slug"
+    serializer_class = DraftSerializer
+
+    def get(self, request, *args, **kwargs):
+        form_plan = self.get_form_plan()
+        owner = get_owner(request)
+        if owner is None:
+            raise Http404
+        draft = get_draft(form_plan.id, owner)
+        if not draft["revision"]:
+            raise Http404
+        return Response({"data": draft["data"], "revision": draft["revision"]})
+
+    def put(self, request, *args, **kwargs):
+        return self.save(request, replace=True)
+
+    def patch(self, request, *args, **kwargs):
+        return self.save(request, replace=False)
+
+    def delete(self, request, *args, **kwargs):
+        form_plan = self.get_form_plan()
+        owner = get_owner(request)
+        if owner is not None:
+            discard_draft(form_plan.id, owner)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def get_form_plan(self):
+        form_plan = get_form_plan(self.kwargs["slug"])
+        if form_plan is None:
+            raise Http404
+        return form_plan
+
+    def save(self, request, replace):
+        form_plan = self.get_form_plan()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data["data"]
+        draft = save_draft(
+            form_plan.id, get_owner(request, create=True), data, replace=replace
+        )
+        serializer_class, form_kwargs = build_dynamic_serializer(form_plan)
+        partial = serializer_class(
+            data=data,
+            partial=True,
+            defer_evaluations=True,
+            only=set(data),
+            condition_data=draft["data"],
+            **form_kwargs,
+        )
+        partial.is_valid()
+        return Response(
+            {
+                "data": draft["data"],
+                "revision": draft["revision"],
+                "errors": partial.errors,
+            }
+        )
+
+
+class SubmissionDetailView(generics.RetrieveAPIView):
+    """
+    The status of a submission and the results of its deferred evaluations.
+    """
+
+    serializer_class = SubmissionSerializer
+
+    def get_queryset(self):
+        return (
+            Submission.objects.active()
+            .filter(form__slug=self.kwargs["slug"], form__is_archived=False)
+            .prefetch_related("evaluations")
+        )
+
+    def get_object(self):
+        # Clients polling right after submitting may be ahead of the replica.
+        try:
+            with use_replica():
+                return super().get_object()
+        except Http404:
+            pass
+        try:
+            return super().get_object()
+        except Http404:
+            pass
+        # Compacted submissions are only found in the segments of their form.
+        form = Form.objects.active().filter(slug=self.kwargs["slug"]).first()
+        submission = form and find_cold_submission(form, self.kwargs["pk"])
+        if submission is None:
+            raise Http404
+        return submission
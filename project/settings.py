@@ -53,6 +53,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "dynamic_forms.routers.ReplicaPinningMiddleware",
 ]
 
 ROOT_URLCONF = "project.urls"
@@ -83,9 +84,21 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
-    }
+        # A file rather than shared memory, so tests running threads can write
+        # from several connections at once.
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
+    },
+    # Only read from once listed in DYNAMIC_FORMS["READ_REPLICAS"]. Locally the
+    # primary stands in for it; tests give it a database of its own.
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "db.sqlite3",
+        "TEST": {"NAME": BASE_DIR / "test_replica.sqlite3"},
+    },
 }
 
+DATABASE_ROUTERS = ["dynamic_forms.routers.ReplicaRouter"]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -135,3 +148,38 @@ CURRENCIES = ("KES",)
 
 PHONENUMBER_DEFAULT_REGION = "KE"
 PHONENUMBER_DB_FORMAT = "NATIONAL"
+
+# Django REST framework
+# https://www.django-rest-framework.org/api-guide/settings/
+
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "dynamic_forms.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "dynamic_forms.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+}
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Shared by every worker on the node, holds compiled form plans. Fine for
+    # a single worker; deployments running several need memcached or redis,
+    # see the dynamic_forms.W001 check.
+    "dynamic_forms": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(BASE_DIR, "cache", "dynamic_forms"),
+    },
+}
+
+DYNAMIC_FORMS = {
+    "CACHE_ALIAS": "dynamic_forms",
+}